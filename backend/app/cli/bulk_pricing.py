@@ -0,0 +1,282 @@
+"""
+Bulk Pricing
+
+Offline repricing of many scenarios with the cost engine, without the API:
+
+    python -m app.cli.bulk_pricing scenarios.csv -o priced.jsonl --workers 8
+
+Scenarios are read one at a time from CSV (a column per CostCalculatorRequest
+field; JSON for llm_mix, mcp_tools and other nested fields; empty cells take
+the default) or JSONL (one request object per line). customer and tenant
+(request fields that identify the scenario) and any other columns are
+copied to the output. Rows are sent to a process pool in
+chunks, at most a few chunks per worker at a time, and results are written
+in input order as soon as they are ready, as JSONL or CSV (by the output
+extension): row number, copied columns, quote_id, totals, and the error of
+rows that could not be priced. Progress and throughput go to stderr.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.routers.cost_calculator_v2 import (
+    PRICING_VERSION,
+    CostCalculatorRequest,
+    calculation_key,
+    canonical_request,
+    compute_costs,
+    request_pricing_version,
+)
+from app.routers.exports import TOTAL_FIELDS
+
+REQUEST_FIELDS = frozenset(CostCalculatorRequest.model_fields)
+
+# Request fields echoed in every output record (None when not given)
+ECHOED_REQUEST_FIELDS = ("customer", "tenant")
+
+# Rows per work unit sent to a worker process
+DEFAULT_CHUNK_ROWS = 64
+
+# Chunks queued per worker (bounds memory while keeping every worker busy)
+CHUNKS_PER_WORKER = 2
+
+# Per-row errors echoed to stderr (all of them are in the output)
+MAX_REPORTED_ERRORS = 20
+
+# ===========================
+# READING
+# ===========================
+
+def _csv_value(value: str) -> Any:
+    """CSV cell as a request value: JSON for nested fields, otherwise the text (pydantic coerces it)"""
+    value = value.strip()
+    if value[:1] in ("{", "["):
+        return json.loads(value)
+    return value
+
+Scenario = Tuple[int, Dict[str, Any], Optional[str]]
+
+def read_scenarios(path: str) -> Iterator[Scenario]:
+    """
+    (row number, fields, parse error) for every scenario, streamed from a
+    .csv or .jsonl file ("-" reads JSONL from stdin)
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row, record in enumerate(csv.DictReader(f), start=1):
+                fields = {key: value for key, value in record.items() if key and value not in (None, "")}
+                try:
+                    yield row, {key: _csv_value(value) for key, value in fields.items()}, None
+                except ValueError as e:
+                    yield row, fields, f"Invalid JSON cell: {e}"
+        return
+
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        row = 0
+        for line in f:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row, {}, f"Invalid JSON: {e}"
+                continue
+            if isinstance(record, dict):
+                yield row, record, None
+            else:
+                yield row, {}, "Each line must be a JSON object"
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def _chunks(scenarios: Iterator[Scenario], size: int) -> Iterator[List[Scenario]]:
+    chunk = []
+    for scenario in scenarios:
+        chunk.append(scenario)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ===========================
+# PRICING (worker processes)
+# ===========================
+
+def price_scenario(row: int, fields: Dict[str, Any], error: Optional[str] = None) -> Dict[str, Any]:
+    """Output record of one scenario: row, copied columns, quote_id, totals and error"""
+    record = {
+        "row": row,
+        **{key: fields.get(key) for key in ECHOED_REQUEST_FIELDS},
+        **{key: value for key, value in fields.items() if key not in REQUEST_FIELDS},
+        "quote_id": None,
+    }
+    if error:
+        return {**record, "error": error}
+    try:
+        params = CostCalculatorRequest(**{key: value for key, value in fields.items() if key in REQUEST_FIELDS})
+        # Canonicalize before the calculation applies tier overrides to params
+        record["quote_id"] = calculation_key(canonical_request(params), request_pricing_version(params))
+        response = compute_costs(params)
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        return {**record, "error": errors}
+    except HTTPException as e:
+        return {**record, "error": str(e.detail)}
+    except Exception as e:
+        return {**record, "error": f"{type(e).__name__}: {e}"}
+    for name in TOTAL_FIELDS:
+        record[name] = getattr(response, name)
+    record["error"] = None
+    return record
+
+def price_chunk(chunk: List[Scenario]) -> List[Dict[str, Any]]:
+    return [price_scenario(*scenario) for scenario in chunk]
+
+# ===========================
+# WRITING
+# ===========================
+
+class ResultWriter:
+    """Writes records as JSONL, or as CSV with the columns of the first record"""
+
+    def __init__(self, f, fmt: str):
+        self.f = f
+        self.fmt = fmt
+        self.csv: Optional[csv.DictWriter] = None
+
+    def write(self, records: List[Dict[str, Any]]):
+        if self.fmt == "jsonl":
+            self.f.writelines(json.dumps(record) + "\n" for record in records)
+        else:
+            if self.csv is None:
+                columns = [key for key in records[0] if key not in TOTAL_FIELDS and key != "error"]
+                self.csv = csv.DictWriter(
+                    self.f, [*columns, *TOTAL_FIELDS, "error"], restval="", extrasaction="ignore"
+                )
+                self.csv.writeheader()
+            self.csv.writerows(
+                {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in record.items()}
+                for record in records
+            )
+        self.f.flush()
+
+class Progress:
+    """Rows priced, errors and throughput, reported to stderr at most every interval seconds"""
+
+    def __init__(self, interval: float, quiet: bool = False):
+        self.interval = interval
+        self.quiet = quiet
+        self.started = self.reported = time.monotonic()
+        self.rows = 0
+        self.errors = 0
+
+    def add(self, records: List[Dict[str, Any]]):
+        self.rows += len(records)
+        for record in records:
+            if record["error"]:
+                self.errors += 1
+                if self.errors <= MAX_REPORTED_ERRORS and not self.quiet:
+                    print(f"row {record['row']}: {record['error']}", file=sys.stderr)
+        now = time.monotonic()
+        if now - self.reported >= self.interval:
+            self.reported = now
+            self.report("Priced")
+
+    def report(self, label: str):
+        if self.quiet:
+            return
+        elapsed = time.monotonic() - self.started
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        print(
+            f"{label} {self.rows:,} rows ({self.errors:,} errors) in {elapsed:,.1f}s, {rate:,.0f} rows/s",
+            file=sys.stderr,
+        )
+
+# ===========================
+# DRIVER
+# ===========================
+
+def run(input_path: str, output, fmt: str, workers: int, chunk_rows: int, progress: Progress) -> Progress:
+    """
+    Price every scenario of the input and write the records in input order.
+    With workers=0 everything runs in this process.
+    """
+    writer = ResultWriter(output, fmt)
+    chunks = _chunks(read_scenarios(input_path), chunk_rows)
+
+    if workers == 0:
+        for chunk in chunks:
+            records = price_chunk(chunk)
+            writer.write(records)
+            progress.add(records)
+        return progress
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending, done_chunks = {}, {}
+        next_submit = next_write = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) + len(done_chunks) < workers * CHUNKS_PER_WORKER:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending[pool.submit(price_chunk, chunk)] = next_submit
+                next_submit += 1
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done_chunks[pending.pop(future)] = future.result()
+            # Write completed chunks in input order
+            while next_write in done_chunks:
+                records = done_chunks.pop(next_write)
+                writer.write(records)
+                progress.add(records)
+                next_write += 1
+    return progress
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli.bulk_pricing",
+        description="Price scenarios from CSV/JSONL with the cost engine, across a process pool",
+    )
+    parser.add_argument("input", help="Scenarios (.csv, or .jsonl; - for JSONL on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Results (.csv or .jsonl; default JSONL on stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (0 prices in this process; default: CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per work unit")
+    parser.add_argument("--progress-seconds", type=float, default=5.0, help="Seconds between progress reports")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress or error reporting")
+    args = parser.parse_args(argv)
+    if args.workers < 0 or args.chunk_rows < 1:
+        parser.error("--workers must be >= 0 and --chunk-rows >= 1")
+    if args.input != "-" and not os.path.exists(args.input):
+        parser.error(f"{args.input} not found")
+
+    fmt = "csv" if args.output.endswith(".csv") else "jsonl"
+    progress = Progress(args.progress_seconds, args.quiet)
+    if not args.quiet:
+        print(f"Pricing {args.input} with {args.workers} worker(s), pricing version {PRICING_VERSION}", file=sys.stderr)
+    if args.output == "-":
+        run(args.input, sys.stdout, fmt, args.workers, args.chunk_rows, progress)
+    else:
+        with open(args.output, "w", newline="" if fmt == "csv" else None, encoding="utf-8") as output:
+            run(args.input, output, fmt, args.workers, args.chunk_rows, progress)
+    progress.report("Done:")
+    return 1 if progress.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
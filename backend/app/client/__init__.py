@@ -0,0 +1,3 @@
+from app.client.cost_client import CostClient, CostClientError, parse_calculation
+
+__all__ = ["CostClient", "CostClientError", "parse_calculation"]
@@ -0,0 +1,260 @@
+"""
+Cost API Client
+
+Async client for the cost calculator API, typed with the API's own request
+and response models. One client holds a pool of keep-alive connections and
+is meant to be shared by a whole service.
+
+- calculate() and calculate_agent() calls made within batch_window seconds
+  of each other are sent together to /calculate/batch or
+  /calculate-agent/batch; each caller still gets its own response.
+- At most max_concurrency HTTP requests are in flight at once.
+- Every call is idempotent (calculations are pure and their quotes are keyed
+  by content hash), so connection errors, timeouts, 429 and 502/503/504 are
+  retried with exponential backoff and jitter, honouring Retry-After.
+- CostClient.in_process(app) talks to an ASGI app directly, without a server.
+"""
+
+import asyncio
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+from pydantic import BaseModel
+
+from app.routers.cost_calculator_v2 import (
+    MAX_BATCH_CALCULATIONS,
+    AgentCostRequest,
+    AgentCostResponse,
+    CostBreakdown,
+    CostCalculatorRequest,
+    CostCalculatorResponse,
+)
+
+API_PREFIX = "/api/cost"
+
+# Responses worth retrying: throttled, or the server (or a proxy) is unavailable
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+BREAKDOWN_FIELDS = tuple(name for name in CostCalculatorResponse.model_fields if name.endswith("_breakdown"))
+
+
+class CostClientError(Exception):
+    """Request the API rejected, or that still failed after every retry"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, detail: Any = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def parse_calculation(data: Dict[str, Any]) -> CostCalculatorResponse:
+    """CostCalculatorResponse from its JSON, with the breakdown items as CostBreakdown models"""
+    response = CostCalculatorResponse.model_validate(data)
+    for name in BREAKDOWN_FIELDS:
+        setattr(response, name, [CostBreakdown.model_validate(item) for item in getattr(response, name)])
+    return response
+
+
+class _Batcher:
+    """
+    Collects single requests for one batch endpoint and sends them together
+    once batch_window has passed since the first, or max_batch_size are waiting
+    """
+
+    def __init__(self, client: "CostClient", path: str, parse):
+        self.client = client
+        self.path = path
+        self.parse = parse
+        self.pending: List[tuple] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set = set()
+
+    async def submit(self, params: BaseModel):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((params, future))
+        if len(self.pending) >= self.client.max_batch_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.client.batch_window, self.flush)
+        return await future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _send(self, batch: List[tuple]):
+        try:
+            if len(batch) == 1:
+                results = [await self.client._post(self.path, batch[0][0])]
+            else:
+                results = await self.client._post(f"{self.path}/batch", [params for params, _ in batch])
+        except CostClientError as e:
+            if len(batch) == 1 or e.status_code is None or e.status_code in RETRY_STATUS_CODES:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            # The batch was rejected: send its requests one by one so only the bad ones fail
+            await asyncio.gather(*(self._send([item]) for item in batch))
+            return
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        for (_, future), data in zip(batch, results):
+            if not future.done():
+                future.set_result(self.parse(data))
+
+
+class CostClient:
+    """
+    Async client for the cost calculator API.
+
+        async with CostClient("http://localhost:8000") as client:
+            response = await client.calculate(CostCalculatorRequest(num_users=250))
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        *,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+        max_concurrency: int = 8,
+        batch_window: float = 0.005,
+        max_batch_size: int = MAX_BATCH_CALCULATIONS,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.1,
+        max_backoff_seconds: float = 5.0,
+    ):
+        if not 1 <= max_batch_size <= MAX_BATCH_CALCULATIONS:
+            raise ValueError(f"max_batch_size must be between 1 and {MAX_BATCH_CALCULATIONS}")
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._calculations = _Batcher(self, f"{API_PREFIX}/calculate", parse_calculation)
+        self._agent_calculations = _Batcher(self, f"{API_PREFIX}/calculate-agent", AgentCostResponse.model_validate)
+
+    @classmethod
+    def in_process(cls, app, **kwargs) -> "CostClient":
+        """Client calling an ASGI app (e.g. app.main.app) in this process, for tests"""
+        return cls("http://testserver", transport=httpx.ASGITransport(app=app), **kwargs)
+
+    async def __aenter__(self) -> "CostClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Send waiting batches, wait for them, and close the connection pool"""
+        for batcher in (self._calculations, self._agent_calculations):
+            batcher.flush()
+            if batcher.tasks:
+                await asyncio.gather(*batcher.tasks, return_exceptions=True)
+        await self.http.aclose()
+
+    # ===========================
+    # CALCULATIONS
+    # ===========================
+
+    async def calculate(self, params: CostCalculatorRequest) -> CostCalculatorResponse:
+        """POST /calculate (batched with concurrent calls)"""
+        return await self._calculations.submit(params)
+
+    async def calculate_agent(self, params: AgentCostRequest) -> AgentCostResponse:
+        """POST /calculate-agent (batched with concurrent calls)"""
+        return await self._agent_calculations.submit(params)
+
+    async def calculate_many(self, items: Sequence[CostCalculatorRequest]) -> List[CostCalculatorResponse]:
+        """Calculate a known list of requests, in batch-endpoint sized chunks sent concurrently"""
+        return await self._many(f"{API_PREFIX}/calculate/batch", items, parse_calculation)
+
+    async def calculate_agents_many(self, items: Sequence[AgentCostRequest]) -> List[AgentCostResponse]:
+        """Calculate a known list of single-agent requests, in chunks sent concurrently"""
+        return await self._many(f"{API_PREFIX}/calculate-agent/batch", items, AgentCostResponse.model_validate)
+
+    # ===========================
+    # CATALOG AND QUOTES
+    # ===========================
+
+    async def tiers(self) -> Dict[str, Any]:
+        return await self._request("GET", f"{API_PREFIX}/tiers")
+
+    async def tier_models(self, tier_id: str) -> Dict[str, Any]:
+        return await self._request("GET", f"{API_PREFIX}/tiers/{tier_id}/models")
+
+    async def agents(self) -> Dict[str, Any]:
+        return await self._request("GET", f"{API_PREFIX}/agents")
+
+    async def quote(self, quote_id: str) -> Dict[str, Any]:
+        return await self._request("GET", f"{API_PREFIX}/quotes/{quote_id}")
+
+    # ===========================
+    # TRANSPORT
+    # ===========================
+
+    async def _many(self, path: str, items: Sequence[BaseModel], parse) -> List:
+        chunks = [items[i:i + self.max_batch_size] for i in range(0, len(items), self.max_batch_size)]
+        results = await asyncio.gather(*(self._post(path, list(chunk)) for chunk in chunks))
+        return [parse(data) for chunk in results for data in chunk]
+
+    async def _post(self, path: str, body):
+        if isinstance(body, list):
+            content = "[" + ",".join(params.model_dump_json() for params in body) + "]"
+        else:
+            content = body.model_dump_json()
+        return await self._request("POST", path, content=content, headers={"Content-Type": "application/json"})
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Retry-After when the server sends one (in seconds), else exponential backoff with full jitter"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff_seconds)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_seconds * 2 ** attempt, self.max_backoff_seconds))
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._slots:
+                    response = await self.http.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise CostClientError(f"{method} {path} failed after {attempt + 1} attempts: {e}") from e
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    try:
+                        detail = response.json()
+                    except ValueError:
+                        detail = response.text
+                    if isinstance(detail, dict):
+                        detail = detail.get("detail", detail)
+                    raise CostClientError(
+                        f"{method} {path} returned {response.status_code}: {detail}",
+                        status_code=response.status_code, detail=detail,
+                    )
+            await asyncio.sleep(self._delay(attempt, response))
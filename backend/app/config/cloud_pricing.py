@@ -0,0 +1,122 @@
+"""
+Cloud Rate Cards loaded from pricing.yaml
+
+Normalizes the azure / aws / gcp sections of pricing.yaml into one rate-card
+shape, with every price converted to AUD:
+- compute SKUs (vCPUs, memory, GPUs) with payg / reserved_1yr / reserved_3yr hourly rates
+- managed SQL price per vCore-hour
+- object storage hot / cool price per GB-month
+"""
+
+import os
+from typing import Dict, List, Any, Optional
+
+import yaml
+
+PRICING_YAML_PATH = os.path.join(os.path.dirname(__file__), 'pricing.yaml')
+
+CLOUD_PROVIDERS = ("azure", "aws", "gcp")
+
+# Commitment options, in the order they are reported
+COMMITMENT_TERMS = ("payg", "reserved_1yr", "reserved_3yr")
+
+# Pricing key prefixes used by each provider -> commitment term
+_TERM_PREFIXES = {
+    "payg": "payg",
+    "on_demand": "payg",
+    "reserved_1yr": "reserved_1yr",
+    "committed_1yr": "reserved_1yr",
+    "reserved_3yr": "reserved_3yr",
+    "committed_3yr": "reserved_3yr",
+}
+
+# vCPUs of the managed database instances priced per instance in pricing.yaml
+_DATABASE_INSTANCE_VCPUS = {
+    "db_m6i_xlarge": 4,
+    "db_n1_standard_4": 4,
+}
+
+def load_pricing_yaml() -> Dict[str, Any]:
+    """Load pricing.yaml"""
+    try:
+        with open(PRICING_YAML_PATH, 'r') as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        print(f"Error loading pricing.yaml: {e}")
+        return {}
+
+def _to_aud(key: str, value: float, usd_to_aud: float) -> float:
+    return value * usd_to_aud if key.endswith("_usd") else value
+
+def _compute_rates(pricing: Dict[str, float], usd_to_aud: float) -> Dict[str, Optional[float]]:
+    rates: Dict[str, Optional[float]] = {term: None for term in COMMITMENT_TERMS}
+    for key, value in pricing.items():
+        for prefix, term in _TERM_PREFIXES.items():
+            if key.startswith(prefix):
+                rates[term] = _to_aud(key, value, usd_to_aud)
+    return rates
+
+def _find_rate(section: Dict[str, Any], suffix: str, usd_to_aud: float) -> Optional[float]:
+    """First '<name>_<suffix>_{aud,usd}' price in a flat pricing section"""
+    for key, value in (section or {}).items():
+        if key.startswith(suffix):
+            return _to_aud(key, value, usd_to_aud)
+    return None
+
+def _sql_vcore_rate(database: Dict[str, Any], usd_to_aud: float) -> Optional[float]:
+    if "azure_sql" in database:
+        return _find_rate(database["azure_sql"], "gen5_vcore_per_hour", usd_to_aud)
+
+    for engine in ("rds_postgresql", "cloud_sql_postgresql"):
+        for key, value in database.get(engine, {}).items():
+            instance = key.split("_per_hour")[0]
+            if instance in _DATABASE_INSTANCE_VCPUS:
+                return _to_aud(key, value, usd_to_aud) / _DATABASE_INSTANCE_VCPUS[instance]
+    return None
+
+def _storage_rates(storage: Dict[str, Any], usd_to_aud: float) -> Dict[str, Optional[float]]:
+    if "blob_storage" in storage:
+        section, hot, cool = storage["blob_storage"], "hot", "cool"
+    elif "s3" in storage:
+        section, hot, cool = storage["s3"], "standard", "infrequent_access"
+    else:
+        section, hot, cool = storage.get("cloud_storage", {}), "standard", "nearline"
+    return {
+        "hot": _find_rate(section, f"{hot}_per_gb_month", usd_to_aud),
+        "cool": _find_rate(section, f"{cool}_per_gb_month", usd_to_aud),
+    }
+
+def build_cloud_rate_cards(pricing: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normalize the provider sections of pricing.yaml into AUD rate cards"""
+    usd_to_aud = pricing.get("metadata", {}).get("exchange_rates", {}).get("usd_to_aud", 1.54)
+
+    cards = []
+    for provider in CLOUD_PROVIDERS:
+        section = pricing.get(provider)
+        if not section:
+            continue
+
+        compute_lists = section.get("compute", {})
+        skus = []
+        for entries in compute_lists.values():
+            if not isinstance(entries, list):
+                continue
+            for entry in entries:
+                skus.append({
+                    "sku": entry.get("sku") or entry.get("type"),
+                    "vcpus": entry.get("vcpus", 0),
+                    "memory_gb": entry.get("memory_gb", 0),
+                    "gpus": entry.get("gpus", 0),
+                    "gpu_model": entry.get("gpu_model"),
+                    "rates": _compute_rates(entry.get("pricing", {}), usd_to_aud),
+                })
+
+        cards.append({
+            "provider": provider,
+            "region": section.get("region", "default"),
+            "last_verified": section.get("last_verified"),
+            "compute": skus,
+            "sql_vcore_hourly": _sql_vcore_rate(section.get("database", {}), usd_to_aud),
+            "storage_gb_month": _storage_rates(section.get("storage", {}), usd_to_aud),
+        })
+    return cards
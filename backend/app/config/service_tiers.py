@@ -80,6 +80,16 @@ LLM_CATEGORIES = {
     }
 }
 
+# Typical serving latency per LLM category (used for capacity planning)
+# - time_to_first_token: seconds before the first output token
+# - prefill_tokens_per_second: input tokens processed per second
+# - output_tokens_per_second: generation speed
+LLM_LATENCY_PROFILES = {
+    "cheap": {"time_to_first_token": 0.4, "prefill_tokens_per_second": 8000, "output_tokens_per_second": 150},
+    "mid_range": {"time_to_first_token": 0.8, "prefill_tokens_per_second": 4000, "output_tokens_per_second": 80},
+    "expensive": {"time_to_first_token": 2.0, "prefill_tokens_per_second": 2000, "output_tokens_per_second": 40},
+}
+
 # ==========================================
 # INFRASTRUCTURE CONFIGURATION
 # ==========================================
@@ -477,6 +487,31 @@ GPU_COSTS = {
     }
 }
 
+# Architecture of self-hosted models, for GPU memory planning: parameters
+# (billions), transformer layers, KV heads (grouped-query attention), head
+# dimension and maximum context length in tokens
+ON_PREMISE_MODEL_SPECS = {
+    "llama-3-8b": {"params_b": 8.0, "layers": 32, "kv_heads": 8, "head_dim": 128, "max_context": 8192},
+    "llama-3.1-8b": {"params_b": 8.0, "layers": 32, "kv_heads": 8, "head_dim": 128, "max_context": 131072},
+    "mistral-7b": {"params_b": 7.2, "layers": 32, "kv_heads": 8, "head_dim": 128, "max_context": 32768},
+    "phi-3-mini": {"params_b": 3.8, "layers": 32, "kv_heads": 32, "head_dim": 96, "max_context": 4096},
+    "gemma-7b": {"params_b": 8.5, "layers": 28, "kv_heads": 16, "head_dim": 256, "max_context": 8192},
+    "llama-3-70b": {"params_b": 70.6, "layers": 80, "kv_heads": 8, "head_dim": 128, "max_context": 8192},
+    "llama-3.1-70b": {"params_b": 70.6, "layers": 80, "kv_heads": 8, "head_dim": 128, "max_context": 131072},
+    "mistral-medium": {"params_b": 70.0, "layers": 80, "kv_heads": 8, "head_dim": 128, "max_context": 32768},
+    "mixtral-8x7b": {"params_b": 46.7, "layers": 32, "kv_heads": 8, "head_dim": 128, "max_context": 32768},
+    "llama-3-405b": {"params_b": 405.0, "layers": 126, "kv_heads": 8, "head_dim": 128, "max_context": 131072},
+    "mixtral-8x22b": {"params_b": 141.0, "layers": 56, "kv_heads": 8, "head_dim": 128, "max_context": 65536},
+}
+
+# Bytes per weight at each serving precision (KV cache stays at fp16)
+MODEL_PRECISION_BYTES = {
+    "fp16": 2.0,
+    "fp8": 1.0,
+    "int8": 1.0,
+    "int4": 0.5,
+}
+
 # Additional on-premise operational costs
 ON_PREMISE_OPEX = {
     "basic": {
@@ -520,6 +555,23 @@ def get_llm_models_for_tier(tier: str, deployment_type: str = "cloud_api") -> Li
                 models.append(model)
     return models
 
+def get_model_provider(model_id: str) -> str:
+    """Get the provider of a model from LLM_CATEGORIES ("default" if unknown)"""
+    for category in LLM_CATEGORIES.values():
+        for models in category.values():
+            for model in models:
+                if model["id"] == model_id:
+                    return model["provider"]
+    return "default"
+
+def get_model_category(model_id: str) -> str:
+    """Get the LLM_CATEGORIES bucket of a cloud or on-premise model ("mid_range" if unknown)"""
+    for category, deployments in LLM_CATEGORIES.items():
+        for models in deployments.values():
+            if any(model["id"] == model_id for model in models):
+                return category
+    return "mid_range"
+
 def calculate_on_premise_cost(gpu_type: str, tier: str, num_gpus: int = 1) -> float:
     """Calculate monthly cost for on-premise deployment"""
     gpu_cost = GPU_COSTS[gpu_type]["monthly_cost"] * num_gpus
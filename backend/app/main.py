@@ -1,24 +1,77 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import cost_calculator_v2
+from app.routers import (
+    cost_calculator_v2,
+    usage,
+    reconciliation,
+    cache_simulator,
+    workload_profiler,
+    cloud_comparison,
+    commitment_optimizer,
+    autoscaling,
+    capacity_planner,
+    quotes,
+    exports,
+    tier_comparison,
+    profitability,
+    gpu_placement,
+    batch_routing,
+    cascade_simulator,
+    agent_pipeline,
+    admission,
+    tenants,
+)
+from app.middleware.admission import AdmissionMiddleware, QUEUE_WAIT_HEADER
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker pool of the workload profiler, created before the first request
+    workload_profiler.get_profiler_pool()
+    yield
+    workload_profiler.shutdown_profiler_pool()
 
 app = FastAPI(
     title="Sales AI Agent API",
     description="Backend API for Sales AI Agent - AI-Powered Sales Coach",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# CORS configuration
+# Admission control: per-client rate limit, interactive/bulk concurrency pools
+app.add_middleware(AdmissionMiddleware)
+
+# CORS configuration (outermost, so 429 responses carry CORS headers too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", QUEUE_WAIT_HEADER],
 )
 
-# Include routers
+# Include routers (tier_comparison first: /tiers/compare must win over /tiers/{tier_id})
+app.include_router(tier_comparison.router, prefix="/api/cost", tags=["Tier Comparison"])
 app.include_router(cost_calculator_v2.router, prefix="/api/cost", tags=["Cost Calculator"])
+app.include_router(usage.router, prefix="/api/cost", tags=["Usage"])
+app.include_router(reconciliation.router, prefix="/api/cost", tags=["Reconciliation"])
+app.include_router(cache_simulator.router, prefix="/api/cost", tags=["Cache Simulator"])
+app.include_router(workload_profiler.router, prefix="/api/cost", tags=["Workload Profiler"])
+app.include_router(cloud_comparison.router, prefix="/api/cost", tags=["Cloud Comparison"])
+app.include_router(commitment_optimizer.router, prefix="/api/cost", tags=["Commitment Optimizer"])
+app.include_router(autoscaling.router, prefix="/api/cost", tags=["Autoscaling"])
+app.include_router(capacity_planner.router, prefix="/api/cost", tags=["Capacity Planner"])
+app.include_router(quotes.router, prefix="/api/cost", tags=["Quotes"])
+app.include_router(exports.router, prefix="/api/cost", tags=["Exports"])
+app.include_router(profitability.router, prefix="/api/cost", tags=["Profitability"])
+app.include_router(gpu_placement.router, prefix="/api/cost", tags=["GPU Placement"])
+app.include_router(batch_routing.router, prefix="/api/cost", tags=["Batch Routing"])
+app.include_router(cascade_simulator.router, prefix="/api/cost", tags=["Cascade Simulator"])
+app.include_router(agent_pipeline.router, prefix="/api/cost", tags=["Agent Pipeline"])
+app.include_router(admission.router, prefix="/api/cost", tags=["Admission Control"])
+app.include_router(tenants.router, prefix="/api/cost", tags=["Tenant Pricing"])
 
 @app.get("/")
 async def root():
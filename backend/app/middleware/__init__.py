@@ -0,0 +1,3 @@
+from app.middleware.admission import AdmissionController, AdmissionMiddleware, get_admission_controller
+
+__all__ = ["AdmissionController", "AdmissionMiddleware", "get_admission_controller"]
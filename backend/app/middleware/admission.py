@@ -0,0 +1,337 @@
+"""
+Admission Control
+
+ASGI middleware that protects the cost API from overload:
+
+- Per-client token bucket: each client (its X-API-Key when the key is one of
+  ADMISSION_API_KEYS, else its address) may make RATE_LIMIT_PER_SECOND
+  requests on average, in bursts of up to RATE_LIMIT_BURST. Over the limit:
+  429 with Retry-After. Unknown keys and other self-declared headers are
+  ignored, so a client cannot get fresh buckets by changing them.
+- Separate concurrency pools. "interactive" (GET catalog and quote reads,
+  POST /calculate and /calculate-agent) and "bulk" (batches, exports,
+  sweeps, simulators, ingestion: every other POST) each run at most
+  `concurrency` requests at once, so bulk jobs can never take the slots
+  the UI needs.
+- Bounded FIFO queues: a request waits for a slot of its pool for at most
+  max_wait_seconds, behind at most max_queue others. A full queue or a
+  timed-out wait is rejected with 429 and a Retry-After estimated from the
+  queue length and recent service times.
+- Every admitted response carries its queue wait in X-Queue-Wait-Ms;
+  GET /api/cost/admission reports per-pool wait percentiles and counters.
+
+Paths outside /api/ (health, docs) are not limited. Limits are per process:
+with several uvicorn workers each enforces its own. Set ADMISSION_CONTROL=0
+to disable.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, FrozenSet, Optional
+
+import numpy as np
+
+API_PREFIX = "/api/"
+
+# POST paths served by the interactive pool (every GET is interactive too)
+INTERACTIVE_POST_PATHS = frozenset({"/api/cost/calculate", "/api/cost/calculate-agent"})
+
+# Token buckets kept (least recently used clients are forgotten first)
+MAX_TRACKED_CLIENTS = 10000
+
+# Recent queue waits per pool used for the reported percentiles
+WAIT_SAMPLES = 2048
+
+QUEUE_WAIT_HEADER = "X-Queue-Wait-Ms"
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class TokenBucket:
+    """Refills at rate tokens/second up to burst; a request takes one token"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1.0) -> float:
+        """Take cost tokens; 0 when granted, else seconds until they will be available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token bucket per client ID, bounded to the most recently seen clients"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.limited = 0
+
+    def check(self, client: str, now: float) -> float:
+        """0 when the client may proceed, else seconds until it may"""
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            bucket = self.buckets[client] = TokenBucket(self.rate, self.burst, now)
+            if len(self.buckets) > self.max_clients:
+                # Forgotten clients start again with a full bucket
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(client)
+        wait = bucket.take(now)
+        if wait:
+            self.limited += 1
+        return wait
+
+
+class PoolFull(Exception):
+    """Request not admitted: the pool's queue is full or the wait timed out"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyPool:
+    """
+    At most `concurrency` requests in flight; others wait in a bounded FIFO
+    queue. A released slot is handed straight to the oldest waiter, so a
+    newcomer can never overtake the queue.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, max_wait_seconds: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.service_seconds = 0.0  # EWMA of admitted request durations
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def retry_after(self) -> float:
+        """Seconds until a request arriving now would likely get a slot"""
+        rounds = (len(self.waiters) + 1) / self.concurrency
+        return max(1.0, math.ceil(rounds * max(self.service_seconds, 0.1)))
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the seconds waited (PoolFull if not admitted)"""
+        if self.in_flight < self.concurrency and not self.waiters:
+            self.in_flight += 1
+            self._admit(0.0)
+            return 0.0
+        if len(self.waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise PoolFull(f"Too many queued {self.name} requests", self.retry_after())
+
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ended: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self.waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected_timeout += 1
+            raise PoolFull(f"Timed out waiting for a {self.name} slot", self.retry_after())
+        waited = time.monotonic() - started
+        self._admit(waited)
+        return waited
+
+    def _admit(self, waited: float):
+        self.admitted += 1
+        self.waits.append(waited)
+
+    def release(self, duration: Optional[float] = None):
+        """Free a slot (handing it to the oldest waiter); duration updates the service-time estimate"""
+        if duration is not None:
+            self.service_seconds = duration if not self.service_seconds else 0.9 * self.service_seconds + 0.1 * duration
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot stays in flight, now the waiter's
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        waits = np.array(self.waits) * 1000 if self.waits else np.zeros(1)
+        p50, p95, p99 = np.percentile(waits, [50, 95, 99])
+        return {
+            "pool": self.name,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queue_wait_ms": {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(waits.max())},
+            "mean_service_ms": self.service_seconds * 1000,
+        }
+
+
+class AdmissionController:
+    """Rate limiter and concurrency pools of one process"""
+
+    def __init__(
+        self,
+        rate_per_second: float = 20.0,
+        burst: float = 40.0,
+        interactive_concurrency: int = 16,
+        interactive_queue: int = 64,
+        interactive_wait_seconds: float = 5.0,
+        bulk_concurrency: int = 2,
+        bulk_queue: int = 16,
+        bulk_wait_seconds: float = 30.0,
+        enabled: bool = True,
+        api_keys: FrozenSet[str] = frozenset(),
+    ):
+        self.enabled = enabled
+        self.api_keys = api_keys
+        self.limiter = RateLimiter(rate_per_second, burst)
+        self.pools = {
+            "interactive": ConcurrencyPool("interactive", interactive_concurrency, interactive_queue, interactive_wait_seconds),
+            "bulk": ConcurrencyPool("bulk", bulk_concurrency, bulk_queue, bulk_wait_seconds),
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            rate_per_second=_env_number("RATE_LIMIT_PER_SECOND", 20.0),
+            burst=_env_number("RATE_LIMIT_BURST", 40.0),
+            interactive_concurrency=int(_env_number("INTERACTIVE_CONCURRENCY", 16)),
+            interactive_queue=int(_env_number("INTERACTIVE_QUEUE", 64)),
+            interactive_wait_seconds=_env_number("INTERACTIVE_MAX_WAIT_SECONDS", 5.0),
+            bulk_concurrency=int(_env_number("BULK_CONCURRENCY", 2)),
+            bulk_queue=int(_env_number("BULK_QUEUE", 16)),
+            bulk_wait_seconds=_env_number("BULK_MAX_WAIT_SECONDS", 30.0),
+            enabled=os.environ.get("ADMISSION_CONTROL", "1") != "0",
+            api_keys=frozenset(key.strip() for key in os.environ.get("ADMISSION_API_KEYS", "").split(",") if key.strip()),
+        )
+
+    @staticmethod
+    def classify(method: str, path: str) -> Optional[str]:
+        """Pool of a request, or None when it is not admission-controlled"""
+        if not path.startswith(API_PREFIX) or method in ("OPTIONS", "HEAD"):
+            return None
+        if method == "GET" or path.rstrip("/") in INTERACTIVE_POST_PATHS:
+            return "interactive"
+        return "bulk"
+
+    def client_id(self, scope: Dict[str, Any]) -> str:
+        """Rate-limit key of a request: a known API key, else the client address"""
+        for name, value in scope.get("headers") or []:
+            if name == b"x-api-key":
+                key = value.decode("latin-1")
+                if key in self.api_keys:
+                    return f"key:{key}"
+                break
+        client = scope.get("client")
+        return f"addr:{client[0]}" if client else "addr:unknown"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "rate_limit": {
+                "per_second": self.limiter.rate,
+                "burst": self.limiter.burst,
+                "clients_tracked": len(self.limiter.buckets),
+                "limited": self.limiter.limited,
+            },
+            "pools": [pool.stats() for pool in self.pools.values()],
+        }
+
+
+async def _reject(send, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Applies the process-wide AdmissionController to every HTTP request"""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller or get_admission_controller()
+        pool_name = controller.classify(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if pool_name is None or not controller.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = controller.limiter.check(controller.client_id(scope), time.monotonic())
+        if retry_after:
+            await _reject(send, "Rate limit exceeded", retry_after)
+            return
+
+        pool = controller.pools[pool_name]
+        try:
+            waited = await pool.acquire()
+        except PoolFull as e:
+            await _reject(send, e.reason, e.retry_after)
+            return
+
+        wait_header = (QUEUE_WAIT_HEADER.lower().encode(), f"{waited * 1000:.1f}".encode())
+
+        async def send_with_wait(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), wait_header]}
+            await send(message)
+
+        started = time.monotonic()
+        try:
+            # Holds the slot until the response (streamed or not) has been sent
+            await self.app(scope, receive, send_with_wait)
+        finally:
+            pool.release(time.monotonic() - started)
+
+
+# Shared controller instance (configured from the environment on first use)
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController.from_env()
+    return _admission_controller
@@ -0,0 +1,411 @@
+"""
+Pricing Catalog
+
+Read-only binary form of the pricing parsed from data files
+(LLM_Pricing.json token rates and the pricing.yaml cloud rate cards),
+memory-mapped by every worker process: the OS shares its pages, and
+worker start-up is a hash of the source files plus an mmap instead of
+JSON and YAML parsing.
+
+Layout (little-endian):
+- header: magic, format version, SHA-256 of the source files, build time,
+  section count, then (name, offset, length) per section
+- "strings": UTF-8 text referenced by the records
+- "llm": one record per model, sorted by model ID (binary searched in place)
+- "cards" / "skus": cloud rate cards, each pointing at its run of SKUs
+
+A record is a row of fixed-size value slots (tag, length, 8-byte payload),
+so a field keeps its JSON type: missing, null, int, float, string or a
+JSON document for nested values.
+
+The catalog is rebuilt when the source files change and written to a
+temporary file renamed over the old one, so a process maps either the old
+or the new catalog, never a partial one. Processes keep the catalog they
+mapped at start-up (quotes carry the pricing version they were computed
+with); restarted workers pick up a rebuilt file.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+CATALOG_MAGIC = b"SCPRCAT\0"
+CATALOG_FORMAT = 1
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), "..", "config")
+LLM_PRICING_JSON_PATH = os.path.join(CONFIG_DIR, "LLM_Pricing.json")
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "pricing_catalog.bin")
+
+_HEADER = struct.Struct("<8sI32sdI")    # magic, format, source hash, built at, section count
+_SECTION = struct.Struct("<8sQQ")       # name, offset, length
+_SLOT = struct.Struct("<BxxxI8s")       # tag, string length, payload
+_FLOAT = struct.Struct("<d")
+_INT = struct.Struct("<q")
+_OFFSET = struct.Struct("<Q")
+
+# Value slot tags
+_MISSING, _NULL, _INT_TAG, _FLOAT_TAG, _STR, _JSON = range(6)
+MISSING = object()
+
+# Record fields, in slot order
+LLM_FIELDS = ("model", "provider", "input", "output", "cachedInput", "batchProcessingDiscount")
+CARD_FIELDS = ("provider", "region", "last_verified", "sql_vcore_hourly", "storage_hot", "storage_cool", "sku_start", "sku_count")
+SKU_FIELDS = ("sku", "vcpus", "memory_gb", "gpus", "gpu_model", "payg", "reserved_1yr", "reserved_3yr")
+
+
+def source_paths() -> Tuple[str, ...]:
+    from app.config.cloud_pricing import PRICING_YAML_PATH
+    return (LLM_PRICING_JSON_PATH, PRICING_YAML_PATH)
+
+
+def source_fingerprint(paths: Sequence[str]) -> Optional[bytes]:
+    """SHA-256 over the catalog format and the source files, or None if a source is missing"""
+    digest = hashlib.sha256(f"{CATALOG_FORMAT}".encode())
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            return None
+    return digest.digest()
+
+
+# ===========================
+# ENCODING
+# ===========================
+
+class _StringTable:
+    """Deduplicated UTF-8 blob; a string is (offset, length)"""
+
+    def __init__(self):
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        self.blob = bytearray()
+
+    def add(self, text: str) -> Tuple[int, int]:
+        ref = self.offsets.get(text)
+        if ref is None:
+            data = text.encode("utf-8")
+            ref = self.offsets[text] = (len(self.blob), len(data))
+            self.blob += data
+        return ref
+
+
+def _encode_value(value: Any, strings: _StringTable) -> bytes:
+    if value is MISSING:
+        return _SLOT.pack(_MISSING, 0, bytes(8))
+    if value is None:
+        return _SLOT.pack(_NULL, 0, bytes(8))
+    if isinstance(value, int) and not isinstance(value, bool):
+        return _SLOT.pack(_INT_TAG, 0, _INT.pack(value))
+    if isinstance(value, float):
+        return _SLOT.pack(_FLOAT_TAG, 0, _FLOAT.pack(value))
+    tag, text = (_STR, value) if isinstance(value, str) else (_JSON, json.dumps(value, default=str))
+    offset, length = strings.add(text)
+    return _SLOT.pack(tag, length, _OFFSET.pack(offset))
+
+
+def _encode_records(rows: List[Sequence[Any]], strings: _StringTable) -> bytes:
+    return b"".join(_encode_value(value, strings) for row in rows for value in row)
+
+
+def encode_catalog(llm_pricing: Dict[str, Tuple[str, Dict[str, Any]]], cloud_rate_cards: List[Dict[str, Any]],
+                   source_hash: bytes) -> bytes:
+    """
+    Catalog bytes. llm_pricing maps model ID to (provider, raw LLM_Pricing.json
+    entry); cloud_rate_cards is the output of build_cloud_rate_cards.
+    """
+    strings = _StringTable()
+    llm_rows = [
+        (model, provider, *(entry.get(field, MISSING) for field in LLM_FIELDS[2:]))
+        for model, (provider, entry) in sorted(llm_pricing.items())
+    ]
+    card_rows, sku_rows = [], []
+    for card in cloud_rate_cards:
+        storage = card["storage_gb_month"]
+        card_rows.append((
+            card["provider"], card["region"], card["last_verified"], card["sql_vcore_hourly"],
+            storage["hot"], storage["cool"], len(sku_rows), len(card["compute"]),
+        ))
+        for sku in card["compute"]:
+            sku_rows.append((
+                sku["sku"], sku["vcpus"], sku["memory_gb"], sku["gpus"], sku["gpu_model"],
+                *(sku["rates"][term] for term in SKU_FIELDS[5:]),
+            ))
+
+    # Records first: encoding them fills the string table
+    records = [
+        (b"llm", _encode_records(llm_rows, strings)),
+        (b"cards", _encode_records(card_rows, strings)),
+        (b"skus", _encode_records(sku_rows, strings)),
+    ]
+    sections = [(b"strings", bytes(strings.blob)), *records]
+
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table, bodies = [], []
+    for name, body in sections:
+        table.append(_SECTION.pack(name, offset, len(body)))
+        bodies.append(body)
+        offset += len(body)
+    header = _HEADER.pack(CATALOG_MAGIC, CATALOG_FORMAT, source_hash, time.time(), len(sections))
+    return header + b"".join(table) + b"".join(bodies)
+
+
+def write_catalog(path: str, data: bytes):
+    """Write the catalog next to path and rename it into place (atomic on POSIX and Windows)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# ===========================
+# DECODING
+# ===========================
+
+class PricingCatalog:
+    """Catalog over a buffer (normally an mmap of the catalog file); values are decoded on access"""
+
+    def __init__(self, buffer, path: Optional[str] = None):
+        self.buffer = memoryview(buffer)
+        self.path = path
+        magic, fmt, self.source_hash, self.built_at, count = _HEADER.unpack_from(self.buffer, 0)
+        if magic != CATALOG_MAGIC or fmt != CATALOG_FORMAT:
+            raise ValueError(f"{path or 'buffer'} is not a format {CATALOG_FORMAT} pricing catalog")
+        self.sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            name, offset, length = _SECTION.unpack_from(self.buffer, _HEADER.size + i * _SECTION.size)
+            self.sections[name.rstrip(b"\0").decode()] = (offset, length)
+        self._strings = self.sections["strings"][0]
+
+    @property
+    def version(self) -> str:
+        """Short hash identifying the sources the catalog was built from"""
+        return self.source_hash.hex()[:16]
+
+    def _value(self, position: int) -> Any:
+        tag, length, payload = _SLOT.unpack_from(self.buffer, position)
+        if tag == _FLOAT_TAG:
+            return _FLOAT.unpack(payload)[0]
+        if tag == _INT_TAG:
+            return _INT.unpack(payload)[0]
+        if tag in (_STR, _JSON):
+            start = self._strings + _OFFSET.unpack(payload)[0]
+            text = str(self.buffer[start:start + length], "utf-8")
+            return text if tag == _STR else json.loads(text)
+        return None if tag == _NULL else MISSING
+
+    def _record(self, section: str, fields: Sequence[str], index: int) -> List[Any]:
+        position = self.sections[section][0] + index * len(fields) * _SLOT.size
+        return [self._value(position + i * _SLOT.size) for i in range(len(fields))]
+
+    def _count(self, section: str, fields: Sequence[str]) -> int:
+        return self.sections[section][1] // (len(fields) * _SLOT.size)
+
+    def llm_pricing(self, batch_api_pricing: Dict[str, Dict[str, Any]]) -> "LlmPricingView":
+        return LlmPricingView(self, batch_api_pricing)
+
+    def cloud_rate_cards(self) -> List[Dict[str, Any]]:
+        """Rate cards as build_cloud_rate_cards returns them"""
+        cards = []
+        for i in range(self._count("cards", CARD_FIELDS)):
+            provider, region, verified, sql_vcore, hot, cool, sku_start, sku_count = self._record("cards", CARD_FIELDS, i)
+            compute = []
+            for j in range(sku_start, sku_start + sku_count):
+                sku, vcpus, memory_gb, gpus, gpu_model, *rates = self._record("skus", SKU_FIELDS, j)
+                compute.append({
+                    "sku": sku, "vcpus": vcpus, "memory_gb": memory_gb, "gpus": gpus, "gpu_model": gpu_model,
+                    "rates": dict(zip(SKU_FIELDS[5:], rates)),
+                })
+            cards.append({
+                "provider": provider,
+                "region": region,
+                "last_verified": verified,
+                "compute": compute,
+                "sql_vcore_hourly": sql_vcore,
+                "storage_gb_month": {"hot": hot, "cool": cool},
+            })
+        return cards
+
+
+def llm_model_pricing(provider: str, rate_in: Any, rate_out: Any, cached: Any, discount: Any,
+                      batch_api_pricing: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pricing entry of one model from its LLM_Pricing.json values (MISSING when
+    absent). Models of providers with a batch API get its default discount
+    unless they list their own.
+    """
+    pricing = {
+        "input": 0.0 if rate_in is MISSING else rate_in,
+        "output": 0.0 if rate_out is MISSING else rate_out,
+        "cache_read": 0.0 if cached is MISSING else cached,
+    }
+    if provider in batch_api_pricing:
+        pricing["provider"] = provider
+        pricing["batch_discount"] = batch_api_pricing[provider]["discount"] if discount is MISSING else discount
+    return pricing
+
+
+class LlmPricingView(Mapping):
+    """
+    Read-only model ID -> {input, output, cache_read[, provider, batch_discount]}
+    mapping (USD per 1M tokens) over the catalog's LLM records. A model's
+    entry is decoded on its first lookup and kept, so only the models a
+    process prices are copied out of the shared pages.
+    """
+
+    def __init__(self, catalog: PricingCatalog, batch_api_pricing: Dict[str, Dict[str, Any]]):
+        self.catalog = catalog
+        self.batch_api_pricing = batch_api_pricing
+        self._size = catalog._count("llm", LLM_FIELDS)
+        self._start = catalog.sections["llm"][0]
+        self._stride = len(LLM_FIELDS) * _SLOT.size
+        # Catalog models looked up by this process (unknown IDs are not kept: they come from requests)
+        self._decoded: Dict[str, Dict[str, Any]] = {}
+
+    def _model(self, index: int) -> bytes:
+        """UTF-8 model ID of a record (byte order is code point order, so the records stay sorted)"""
+        catalog = self.catalog
+        _, length, payload = _SLOT.unpack_from(catalog.buffer, self._start + index * self._stride)
+        start = catalog._strings + _OFFSET.unpack(payload)[0]
+        return catalog.buffer[start:start + length].tobytes()
+
+    def _find(self, model: str) -> int:
+        """Index of the model's record (binary search over the sorted model IDs)"""
+        key = model.encode("utf-8")
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._model(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._size or self._model(low) != key:
+            raise KeyError(model)
+        return low
+
+    def _lookup(self, model: str) -> Optional[Dict[str, Any]]:
+        pricing = self._decoded.get(model)
+        if pricing is None and isinstance(model, str):
+            pricing = self._decode(model)
+            if pricing is not None:
+                self._decoded[model] = pricing
+        return pricing
+
+    def __getitem__(self, model: str) -> Dict[str, Any]:
+        pricing = self._lookup(model)
+        if pricing is None:
+            raise KeyError(model)
+        return pricing
+
+    # get / in without Mapping's KeyError round trip (they sit on the pricing hot path)
+    def get(self, model: str, default: Any = None) -> Any:
+        pricing = self._lookup(model)
+        return default if pricing is None else pricing
+
+    def __contains__(self, model: object) -> bool:
+        return self._lookup(model) is not None
+
+    def _decode(self, model: str) -> Optional[Dict[str, Any]]:
+        try:
+            index = self._find(model)
+        except KeyError:
+            return None
+        _, provider, *rates = self.catalog._record("llm", LLM_FIELDS, index)
+        return llm_model_pricing(provider, *rates, batch_api_pricing=self.batch_api_pricing)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._model(i).decode("utf-8") for i in range(self._size))
+
+    def __len__(self) -> int:
+        return self._size
+
+
+# ===========================
+# BUILD / OPEN
+# ===========================
+
+def load_llm_pricing_source(path: str = LLM_PRICING_JSON_PATH) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """model ID -> (provider, entry) from LLM_Pricing.json (a later provider wins on duplicate IDs)"""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Error loading LLM_Pricing.json: {e}")
+        return {}
+    return {
+        model_id: (provider, model_data)
+        for provider, models in data.get("providers", {}).items()
+        for model_id, model_data in models.items()
+    }
+
+
+def build_catalog(path: Optional[str], source_hash: Optional[bytes] = None) -> bytes:
+    """Parse the source files into catalog bytes, written to path when given"""
+    from app.config.cloud_pricing import build_cloud_rate_cards, load_pricing_yaml
+
+    source_hash = source_hash or source_fingerprint(source_paths()) or bytes(32)
+    data = encode_catalog(load_llm_pricing_source(), build_cloud_rate_cards(load_pricing_yaml()), source_hash)
+    if path:
+        write_catalog(path, data)
+    return data
+
+
+def open_catalog(path: str) -> PricingCatalog:
+    """
+    Map the catalog at path, rebuilding it first when it is missing, from
+    another format, or older than the source files. When the file cannot be
+    written the catalog is kept in this process's memory instead.
+    """
+    source_hash = source_fingerprint(source_paths())
+    for _ in range(2):
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            catalog = PricingCatalog(buffer, path)
+            # Without the sources (e.g. a deployment shipping only the catalog) any valid catalog is used
+            if source_hash is None or catalog.source_hash == source_hash:
+                return catalog
+            catalog.buffer.release()
+            buffer.close()
+        except (OSError, ValueError, struct.error):
+            pass
+        try:
+            build_catalog(path, source_hash)
+        except OSError as e:
+            print(f"Pricing catalog {path} not writable ({e}); using an in-memory catalog", file=sys.stderr)
+            break
+    return PricingCatalog(build_catalog(None, source_hash))
+
+
+# Shared catalog instance (opened on first use)
+_pricing_catalog: Optional[PricingCatalog] = None
+_pricing_catalog_lock = threading.Lock()
+
+
+def get_pricing_catalog() -> PricingCatalog:
+    """Get the process-wide pricing catalog at PRICING_CATALOG_PATH"""
+    global _pricing_catalog
+    with _pricing_catalog_lock:
+        if _pricing_catalog is None:
+            _pricing_catalog = open_catalog(os.environ.get("PRICING_CATALOG_PATH", DEFAULT_CATALOG_PATH))
+    return _pricing_catalog
+
+
+if __name__ == "__main__":
+    # python -m app.pricing.catalog [path]: rebuild the catalog (e.g. before a rolling restart)
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("PRICING_CATALOG_PATH", DEFAULT_CATALOG_PATH)
+    built = PricingCatalog(build_catalog(target))
+    print(f"Wrote {target}: catalog {built.version}, {len(built.buffer):,} bytes")
@@ -0,0 +1,297 @@
+"""
+Cost Expressions
+
+Each cost line is declared once as a symbolic expression over request
+inputs and rate-card values. Compiling a declaration against a rate card
+produces, from the same expression tree:
+- an evaluator (generated Python with rates inlined as constants; works on
+  scalars and numpy arrays alike)
+- the exact partial derivative with respect to every input
+- the str.format template of the displayed calculation formula
+
+so the formula shown next to a cost can never disagree with the number.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Display symbols of binary operators
+_SYMBOLS = {"+": "+", "-": "−", "*": "×", "/": "÷"}
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _shown(value: Any) -> Any:
+    """Value as displayed: whole floats without the trailing .0 (10.0 -> 10)"""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+class Expr(ABC):
+    """Node of a cost expression; combine nodes with + - * /"""
+
+    def __add__(self, other): return BinOp("+", self, lift(other))
+    def __radd__(self, other): return BinOp("+", lift(other), self)
+    def __sub__(self, other): return BinOp("-", self, lift(other))
+    def __rsub__(self, other): return BinOp("-", lift(other), self)
+    def __mul__(self, other): return BinOp("*", self, lift(other))
+    def __rmul__(self, other): return BinOp("*", lift(other), self)
+    def __truediv__(self, other): return BinOp("/", self, lift(other))
+    def __rtruediv__(self, other): return BinOp("/", lift(other), self)
+
+    def bind(self, rate_card: Dict[str, Any]) -> "Expr":
+        """Copy with every Rate resolved against the rate card"""
+        return self
+
+    def input_names(self) -> List[str]:
+        return []
+
+    @abstractmethod
+    def source(self) -> str:
+        """Python source evaluating the expression"""
+
+    @abstractmethod
+    def template(self, index: Dict[str, int]) -> str:
+        """str.format template of the displayed formula (inputs by position)"""
+
+    @abstractmethod
+    def symbolic(self) -> str:
+        """Displayed formula with input names instead of values"""
+
+    @abstractmethod
+    def diff(self, name: str) -> "Expr":
+        """Exact derivative with respect to an input"""
+
+
+class Const(Expr):
+    """Fixed number with its display text, e.g. Const(730, "{} hours")"""
+
+    def __init__(self, value: float, display: str = "{}"):
+        self.value = value
+        self.text = display.format(_shown(value))
+
+    def source(self) -> str:
+        return repr(self.value)
+
+    def template(self, index: Dict[str, int]) -> str:
+        return _escape(self.text)
+
+    def symbolic(self) -> str:
+        return self.text
+
+    def diff(self, name: str) -> Expr:
+        return Const(0)
+
+
+class Rate(Expr):
+    """
+    Rate-card value at a key path, resolved when compiled. The value is
+    displayed as listed and evaluated multiplied by scale (e.g. 1e-6 to
+    price single tokens from a per-1M-token rate).
+    """
+
+    def __init__(self, path: Sequence[str], display: str = "${}", scale: float = 1.0):
+        self.path = tuple(path)
+        self.display = display
+        self.scale = scale
+
+    def bind(self, rate_card: Dict[str, Any]) -> Expr:
+        value = rate_card
+        for key in self.path:
+            value = value[key]
+        bound = Const(value * self.scale if self.scale != 1.0 else value)
+        bound.text = self.display.format(_shown(value))
+        return bound
+
+    # An unbound rate has no value: compile the expression (compile_cost) to bind it
+    def _unbound(self):
+        return ValueError(f"Rate {self.path} is not bound to a rate card")
+
+    def source(self) -> str:
+        raise self._unbound()
+
+    def template(self, index: Dict[str, int]) -> str:
+        raise self._unbound()
+
+    def symbolic(self) -> str:
+        raise self._unbound()
+
+    def diff(self, name: str) -> Expr:
+        raise self._unbound()
+
+
+class Input(Expr):
+    """Request input, e.g. Input("cosmos_ru", "{:,.0f} RU/s")"""
+
+    divisor = 1
+
+    def __init__(self, name: str, display: str = "{}"):
+        self.name = name
+        self.display = display
+
+    def input_names(self) -> List[str]:
+        return [self.name]
+
+    def source(self) -> str:
+        return self.name
+
+    def template(self, index: Dict[str, int]) -> str:
+        return self.display.replace("{", "{" + str(index[self.name]), 1)
+
+    def symbolic(self) -> str:
+        return self.display.split("{", 1)[0] + self.name + self.display.split("}", 1)[1]
+
+    def diff(self, name: str) -> Expr:
+        if name != self.name:
+            return Const(0)
+        return Const(1 / self.divisor if self.divisor != 1 else 1)
+
+
+class Percent(Input):
+    """Input given in percent (e.g. 60.0), evaluated as a fraction"""
+
+    divisor = 100
+
+    def __init__(self, name: str, display: str = "{}%"):
+        super().__init__(name, display)
+
+    def source(self) -> str:
+        return f"({self.name} / 100)"
+
+
+class BinOp(Expr):
+    def __init__(self, op: str, left: Expr, right: Expr):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def bind(self, rate_card: Dict[str, Any]) -> Expr:
+        return BinOp(self.op, self.left.bind(rate_card), self.right.bind(rate_card))
+
+    def input_names(self) -> List[str]:
+        names = self.left.input_names()
+        return names + [n for n in self.right.input_names() if n not in names]
+
+    def source(self) -> str:
+        return f"({self.left.source()} {self.op} {self.right.source()})"
+
+    def _display(self, left: str, right: str) -> str:
+        # Parenthesize operands that are a different operation (or the right side of - and ÷)
+        if isinstance(self.left, BinOp) and self.left.op != self.op:
+            left = f"({left})"
+        if isinstance(self.right, BinOp) and (self.right.op != self.op or self.op in "-/"):
+            right = f"({right})"
+        return f"{left} {_SYMBOLS[self.op]} {right}"
+
+    def template(self, index: Dict[str, int]) -> str:
+        return self._display(self.left.template(index), self.right.template(index))
+
+    def symbolic(self) -> str:
+        return self._display(self.left.symbolic(), self.right.symbolic())
+
+    def diff(self, name: str) -> Expr:
+        a, b = self.left, self.right
+        da, db = a.diff(name), b.diff(name)
+        if self.op == "+":
+            return _add(da, db)
+        if self.op == "-":
+            return _sub(da, db)
+        if self.op == "*":
+            return _add(_mul(da, b), _mul(a, db))
+        # Quotient rule
+        if _is(db, 0):
+            return _div(da, b)
+        return _div(_sub(_mul(da, b), _mul(a, db)), _mul(b, b))
+
+
+def lift(value: Any) -> Expr:
+    return value if isinstance(value, Expr) else Const(value)
+
+
+def _is(expr: Expr, value: float) -> bool:
+    return isinstance(expr, Const) and expr.value == value
+
+
+def _plain(*exprs: Expr) -> bool:
+    """Unlabelled numbers (not rates or units), which can be folded"""
+    return all(isinstance(e, Const) and e.text == str(_shown(e.value)) for e in exprs)
+
+
+# Simplifying constructors used by differentiation
+def _add(a: Expr, b: Expr) -> Expr:
+    if _plain(a, b):
+        return Const(a.value + b.value)
+    return b if _is(a, 0) else a if _is(b, 0) else BinOp("+", a, b)
+
+
+def _sub(a: Expr, b: Expr) -> Expr:
+    if _plain(a, b):
+        return Const(a.value - b.value)
+    return a if _is(b, 0) else BinOp("-", a, b)
+
+
+def _mul(a: Expr, b: Expr) -> Expr:
+    if _is(a, 0) or _is(b, 0):
+        return Const(0)
+    if _plain(a, b):
+        return Const(a.value * b.value)
+    return b if _is(a, 1) else a if _is(b, 1) else BinOp("*", a, b)
+
+
+def _div(a: Expr, b: Expr) -> Expr:
+    if _plain(a, b) and not _is(a, 0):
+        return Const(a.value / b.value)
+    return a if _is(a, 0) or _is(b, 1) else BinOp("/", a, b)
+
+
+def _generate(inputs: Sequence[str], body: str, **names: Any) -> Callable:
+    return eval(f"lambda {', '.join(inputs)}: {body}", {"__builtins__": {}, **names})
+
+
+class CompiledCost:
+    """A cost expression compiled against one rate card"""
+
+    def __init__(self, expr: Expr, result_format: str = "${:,.2f}/month", suffix: str = "",
+                 intern: Optional[Callable[[str], Any]] = None):
+        self.expression = expr
+        self.inputs: Tuple[str, ...] = tuple(expr.input_names())
+        self.evaluate = _generate(self.inputs, expr.source())
+        self.derivatives = {name: expr.diff(name) for name in self.inputs}
+        self.partials = {name: _generate(self.inputs, d.source()) for name, d in self.derivatives.items()}
+
+        index = {name: i for i, name in enumerate(self.inputs)}
+        result = result_format.replace("{", "{" + str(len(self.inputs)), 1)
+        self.template = f"{expr.template(index)} = {result}{_escape(suffix)}"
+
+        # line(**inputs) -> (cost, formula reference): the reference is (template tag, *inputs, cost),
+        # where the tag is intern(template) (or the template itself); unused keyword inputs are ignored
+        self.template_tag = intern(self.template) if intern else self.template
+        args = "".join(f"{name}, " for name in self.inputs)
+        self.line = _generate(
+            self.inputs + ("**_",), f"((_cost := {expr.source()}), (_tag, {args}_cost))", _tag=self.template_tag
+        )
+
+    def __call__(self, *args):
+        return self.evaluate(*args)
+
+    def formula(self, *args) -> str:
+        """Displayed formula for the given inputs, ending with the computed value"""
+        return self.template.format(*args, self.evaluate(*args))
+
+    def gradient(self, *args) -> Dict[str, Any]:
+        """Partial derivatives of the cost with respect to each input"""
+        return {name: partial(*args) for name, partial in self.partials.items()}
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "inputs": list(self.inputs),
+            "formula": self.expression.symbolic(),
+            "partial_derivatives": {name: d.symbolic() for name, d in self.derivatives.items()},
+        }
+
+
+def compile_cost(expr: Expr, rate_card: Dict[str, Any], result_format: str = "${:,.2f}/month",
+                 suffix: str = "", intern: Optional[Callable[[str], Any]] = None) -> CompiledCost:
+    """Bind an expression's rates to a rate card and compile it"""
+    return CompiledCost(expr.bind(rate_card), result_format, suffix, intern)
@@ -0,0 +1,202 @@
+"""
+GPU Packing
+
+Memory-fit placement of self-hosted models onto GPUs. A model needs its
+weights (parameters × bytes per parameter at the serving precision) plus a
+KV cache for each concurrent sequence. A replica runs on one GPU, or on
+2/4/8 GPUs of one type with the weights sharded (tensor parallel); a model
+that fits no single node of any GPU type is split over 2/4/8 full nodes as
+pipeline stages (e.g. llama-3-405b at fp16).
+Replicas that fit on a single GPU are bin-packed, several models to a GPU,
+and the GPU type of every model is chosen to minimize the cost of the
+whole fleet.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Share of GPU memory available to weights and KV cache (the rest holds the
+# CUDA context and activations)
+GPU_MEMORY_UTILIZATION = 0.9
+
+# GPUs of one node a replica may span (tensor parallel)
+TENSOR_PARALLEL_DEGREES = (1, 2, 4, 8)
+
+# Whole nodes a larger replica may span (pipeline stages of a full tensor-parallel node each)
+GPUS_PER_NODE = TENSOR_PARALLEL_DEGREES[-1]
+PIPELINE_STAGES = (2, 4, 8)
+
+# Number of GPUs a multi-node replica may span
+MULTI_NODE_GPU_COUNTS = tuple(GPUS_PER_NODE * stages for stages in PIPELINE_STAGES)
+
+
+def kv_cache_gb_per_token(layers: int, kv_heads: int, head_dim: int, bytes_per_value: float = 2.0) -> float:
+    """KV cache of one token: a key and a value vector per layer and KV head"""
+    return 2 * layers * kv_heads * head_dim * bytes_per_value / 1e9
+
+
+class ModelDemand:
+    """GPU memory one model needs: weights per replica plus KV cache per sequence"""
+
+    __slots__ = ("model", "weights_gb", "kv_gb_per_sequence", "sequences")
+
+    def __init__(self, model: str, weights_gb: float, kv_gb_per_sequence: float, sequences: int):
+        self.model = model
+        self.weights_gb = weights_gb
+        self.kv_gb_per_sequence = kv_gb_per_sequence
+        self.sequences = max(1, sequences)
+
+
+class ModelPlacement:
+    """Replicas of one model on one GPU type"""
+
+    __slots__ = ("model", "gpu_type", "gpus_per_replica", "replicas", "sequences_per_replica", "memory_gb", "shared")
+
+    def __init__(self, model: str, gpu_type: str, gpus_per_replica: int, replicas: int,
+                 sequences_per_replica: int, memory_gb: float, shared: bool):
+        self.model = model
+        self.gpu_type = gpu_type
+        self.gpus_per_replica = gpus_per_replica
+        self.replicas = replicas
+        self.sequences_per_replica = sequences_per_replica
+        self.memory_gb = memory_gb
+        self.shared = shared
+
+    @property
+    def nodes_per_replica(self) -> int:
+        """Nodes a replica spans (pipeline stages; 1 within a node)"""
+        return max(1, self.gpus_per_replica // GPUS_PER_NODE)
+
+
+class GpuFleetPlan:
+    """
+    GPUs to buy per type, where each model runs, and the single GPUs shared
+    by several models as (gpu_type, models, used GB)
+    """
+
+    def __init__(self, gpus: Dict[str, int], placements: List[ModelPlacement],
+                 shared_gpus: List[Tuple[str, List[str], float]], hourly_cost: float):
+        self.gpus = gpus
+        self.placements = placements
+        self.shared_gpus = shared_gpus
+        self.hourly_cost = hourly_cost
+
+
+def _replica_option(demand: ModelDemand, memory_gb: float,
+                    degrees: Sequence[int] = TENSOR_PARALLEL_DEGREES) -> Optional[Tuple[int, int, int]]:
+    """
+    (GPUs per replica, sequences per replica, replicas) serving the demand on
+    the fewest GPUs of one type, or None if a replica does not fit on any degree
+    """
+    usable = memory_gb * GPU_MEMORY_UTILIZATION
+    best = None
+    for degree in degrees:
+        free = degree * usable - demand.weights_gb
+        if free < demand.kv_gb_per_sequence:
+            continue
+        per_replica = min(int(free // demand.kv_gb_per_sequence), demand.sequences)
+        replicas = math.ceil(demand.sequences / per_replica)
+        if best is None or degree * replicas < best[0] * best[2]:
+            best = (degree, per_replica, replicas)
+    return best
+
+
+def _first_fit_decreasing(items: List[Tuple[float, str]], capacity: float) -> List[Tuple[float, List[str]]]:
+    """Pack (size, model) items into bins of the capacity; returns (used, models) per bin"""
+    bins: List[Tuple[float, List[str]]] = []
+    for size, model in sorted(items, reverse=True):
+        for i, (used, models) in enumerate(bins):
+            if used + size <= capacity:
+                bins[i] = (used + size, models + [model])
+                break
+        else:
+            bins.append((size, [model]))
+    return bins
+
+
+def plan_gpu_fleet(demands: Sequence[ModelDemand], gpu_costs: Dict[str, Dict]) -> GpuFleetPlan:
+    """
+    Cheapest fleet serving every demand. gpu_costs maps GPU type to its
+    hourly_cost and memory_gb.
+
+    Replicas needing several GPUs get them to themselves; a model spans
+    several nodes only when it fits no single node of any type. Of a single-GPU
+    model, all replicas but the last fill a GPU each; the last (partly
+    filled) replicas of all models on a type are first-fit-decreasing packed.
+    Each model starts on its cheapest type on its own, then models are moved
+    between types while that lowers the fleet cost.
+    """
+    options = []
+    for demand in demands:
+        for degrees in (TENSOR_PARALLEL_DEGREES, MULTI_NODE_GPU_COUNTS):
+            by_type = {}
+            for gpu_type, gpu in gpu_costs.items():
+                option = _replica_option(demand, gpu["memory_gb"], degrees)
+                if option:
+                    by_type[gpu_type] = option
+            if by_type:
+                break
+        else:
+            raise ValueError(
+                f"{demand.model} needs {demand.weights_gb:,.1f} GB of weights plus "
+                f"{demand.kv_gb_per_sequence:,.2f} GB per sequence, which fits no GPU type "
+                f"on up to {MULTI_NODE_GPU_COUNTS[-1]} GPUs ({PIPELINE_STAGES[-1]} nodes of {GPUS_PER_NODE})"
+            )
+        options.append(by_type)
+
+    def last_replica_gb(i: int, gpu_type: str) -> float:
+        degree, per_replica, replicas = options[i][gpu_type]
+        demand = demands[i]
+        return demand.weights_gb + (demand.sequences - (replicas - 1) * per_replica) * demand.kv_gb_per_sequence
+
+    def fleet(assignment: List[str]) -> Tuple[Dict[str, int], Dict[str, list], float]:
+        gpus = {gpu_type: 0 for gpu_type in gpu_costs}
+        items: Dict[str, List[Tuple[float, str]]] = {gpu_type: [] for gpu_type in gpu_costs}
+        for i, gpu_type in enumerate(assignment):
+            degree, _, replicas = options[i][gpu_type]
+            if degree == 1:
+                gpus[gpu_type] += replicas - 1
+                items[gpu_type].append((last_replica_gb(i, gpu_type), demands[i].model))
+            else:
+                gpus[gpu_type] += degree * replicas
+        bins = {}
+        for gpu_type, type_items in items.items():
+            bins[gpu_type] = _first_fit_decreasing(type_items, gpu_costs[gpu_type]["memory_gb"] * GPU_MEMORY_UTILIZATION)
+            gpus[gpu_type] += len(bins[gpu_type])
+        return gpus, bins, sum(count * gpu_costs[gpu_type]["hourly_cost"] for gpu_type, count in gpus.items())
+
+    def cost_alone(i: int, gpu_type: str) -> float:
+        degree, _, replicas = options[i][gpu_type]
+        return degree * replicas * gpu_costs[gpu_type]["hourly_cost"]
+
+    assignment = [min(by_type, key=lambda gpu_type: cost_alone(i, gpu_type)) for i, by_type in enumerate(options)]
+    gpus, bins, cost = fleet(assignment)
+
+    improved = True
+    while improved:
+        improved = False
+        for i, by_type in enumerate(options):
+            for gpu_type in by_type:
+                if gpu_type == assignment[i]:
+                    continue
+                moved = assignment[:i] + [gpu_type] + assignment[i + 1:]
+                moved_gpus, moved_bins, moved_cost = fleet(moved)
+                if moved_cost < cost - 1e-9:
+                    assignment, gpus, bins, cost = moved, moved_gpus, moved_bins, moved_cost
+                    improved = True
+
+    placements = []
+    for i, gpu_type in enumerate(assignment):
+        demand = demands[i]
+        degree, per_replica, replicas = options[i][gpu_type]
+        shared = degree == 1 and any(
+            demand.model in models and len(models) > 1 for _, models in bins[gpu_type]
+        )
+        placements.append(ModelPlacement(
+            demand.model, gpu_type, degree, replicas, per_replica,
+            replicas * demand.weights_gb + demand.sequences * demand.kv_gb_per_sequence, shared,
+        ))
+    shared_gpus = [
+        (gpu_type, models, used) for gpu_type, type_bins in bins.items() for used, models in type_bins if len(models) > 1
+    ]
+    return GpuFleetPlan({t: n for t, n in gpus.items() if n}, placements, shared_gpus, cost)
@@ -0,0 +1,286 @@
+"""
+Pricing History
+
+Effective-dated LLM token rates, so a calculation can be priced with the
+rates in force on any past date. pricing_history.jsonl holds one snapshot
+per line, each a delta against the previous one:
+
+    {"effective": "2025-10-17", "set": {"gpt-4o": ["openai", {...}]}, "remove": ["gpt-3.5"]}
+
+where set holds the LLM_Pricing.json entry (under its provider key) of every
+model added or repriced, and remove the models dropped. The first snapshot
+sets every model.
+
+Loaded, the deltas become one timeline per model (snapshot index -> entry),
+so the rates of a date are found by binary search over the effective dates
+and over the model's own changes: O(log n) for n snapshots, and memory grows
+with the number of price changes, not the number of snapshots. The current
+LLM_Pricing.json is always the latest snapshot (from its lastUpdated date),
+whether or not it has been recorded yet.
+
+Record the current LLM_Pricing.json (before editing it for a price change):
+
+    python -m app.pricing.history
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from bisect import bisect_right
+from datetime import date
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from app.pricing.catalog import LLM_PRICING_JSON_PATH, MISSING, llm_model_pricing, load_llm_pricing_source
+
+PRICING_HISTORY_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "pricing_history.jsonl")
+
+# (provider, LLM_Pricing.json entry) of one model
+ModelEntry = Tuple[str, Dict[str, Any]]
+
+
+def snapshot_delta(previous: Dict[str, ModelEntry], current: Dict[str, ModelEntry]) -> Tuple[Dict[str, ModelEntry], List[str]]:
+    """Models set (added or changed) and removed going from one full snapshot to the next"""
+    changed = {model: entry for model, entry in current.items() if previous.get(model) != entry}
+    removed = sorted(model for model in previous if model not in current)
+    return changed, removed
+
+
+def current_pricing_source(path: str = LLM_PRICING_JSON_PATH) -> Tuple[Optional[date], Dict[str, ModelEntry]]:
+    """lastUpdated date and model entries of LLM_Pricing.json"""
+    try:
+        with open(path, "r") as f:
+            updated = json.load(f).get("lastUpdated")
+    except Exception:
+        updated = None
+    return (date.fromisoformat(updated) if updated else None), load_llm_pricing_source(path)
+
+
+class LlmRatesAsOf(Mapping):
+    """
+    Read-only model ID -> {input, output, cache_read[, provider, batch_discount]}
+    mapping (USD per 1M tokens) of the rates in force from one snapshot on,
+    with the same shape as LLM_PRICING_USD
+    """
+
+    def __init__(self, history: "PricingHistory", index: int, batch_api_pricing: Dict[str, Dict[str, Any]]):
+        self.history = history
+        self.index = index
+        self.effective = history.dates[index]
+        self.batch_api_pricing = batch_api_pricing
+        # Models priced in this snapshot that were looked up (unknown IDs are not kept: they come from requests)
+        self._decoded: Dict[str, Dict[str, Any]] = {}
+
+    def _lookup(self, model: str) -> Optional[Dict[str, Any]]:
+        pricing = self._decoded.get(model)
+        if pricing is None:
+            entry = self.history.entry(model, self.index)
+            if entry is None:
+                return None
+            pricing = self._decoded[model] = llm_model_pricing(
+                entry[0], *(entry[1].get(field, MISSING) for field in ("input", "output", "cachedInput", "batchProcessingDiscount")),
+                batch_api_pricing=self.batch_api_pricing,
+            )
+        return pricing
+
+    def __getitem__(self, model: str) -> Dict[str, Any]:
+        pricing = self._lookup(model)
+        if pricing is None:
+            raise KeyError(model)
+        return pricing
+
+    def get(self, model: str, default: Any = None) -> Any:
+        pricing = self._lookup(model)
+        return default if pricing is None else pricing
+
+    def __contains__(self, model: object) -> bool:
+        return self._lookup(model) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (model for model in self.history.timelines if self.history.entry(model, self.index) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class PricingHistory:
+    """Effective dates of the snapshots and, per model, the snapshots that changed it"""
+
+    def __init__(self):
+        self.dates: List[date] = []
+        # model -> (snapshot indices, entry from that snapshot on; None once removed)
+        self.timelines: Dict[str, Tuple[List[int], List[Optional[ModelEntry]]]] = {}
+        self._views: Dict[Tuple[int, int], LlmRatesAsOf] = {}
+
+    def add(self, effective: date, changed: Dict[str, ModelEntry], removed: List[str]):
+        """Append a snapshot delta (effective dates must increase)"""
+        if self.dates and effective <= self.dates[-1]:
+            raise ValueError(f"Snapshot effective {effective} is not after the latest ({self.dates[-1]})")
+        index = len(self.dates)
+        self.dates.append(effective)
+        for model, entry in [*changed.items(), *((model, None) for model in removed)]:
+            indices, entries = self.timelines.setdefault(model, ([], []))
+            indices.append(index)
+            entries.append(entry)
+
+    def entry(self, model: str, index: int) -> Optional[ModelEntry]:
+        """Entry of a model in force at a snapshot (None if absent)"""
+        timeline = self.timelines.get(model)
+        if timeline is None:
+            return None
+        position = bisect_right(timeline[0], index) - 1
+        return timeline[1][position] if position >= 0 else None
+
+    def snapshot(self, index: int) -> Dict[str, ModelEntry]:
+        """Full model entries at a snapshot"""
+        return {model: entry for model in self.timelines if (entry := self.entry(model, index)) is not None}
+
+    def index_on(self, as_of: date) -> int:
+        """Snapshot in force on a date (ValueError before the first one)"""
+        index = bisect_right(self.dates, as_of) - 1
+        if index < 0:
+            first = self.dates[0] if self.dates else None
+            raise ValueError(f"No LLM pricing in force on {as_of}; pricing history starts {first}")
+        return index
+
+    def rates(self, index: int, batch_api_pricing: Dict[str, Dict[str, Any]]) -> LlmRatesAsOf:
+        """Rate mapping of a snapshot (one shared view per snapshot)"""
+        key = (index, id(batch_api_pricing))
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = LlmRatesAsOf(self, index, batch_api_pricing)
+        return view
+
+
+class LlmRatesByDate(Mapping):
+    """
+    Rate-card section of the process-wide history: effective date (ISO) ->
+    rates in force from that date, for cost expressions keyed by snapshot
+    """
+
+    def __init__(self, batch_api_pricing: Dict[str, Dict[str, Any]]):
+        self.batch_api_pricing = batch_api_pricing
+
+    def __getitem__(self, effective: str) -> LlmRatesAsOf:
+        history = get_pricing_history()
+        try:
+            index = history.index_on(date.fromisoformat(effective))
+        except ValueError:
+            raise KeyError(effective)
+        return history.rates(index, self.batch_api_pricing)
+
+    def __iter__(self) -> Iterator[str]:
+        return (effective.isoformat() for effective in get_pricing_history().dates)
+
+    def __len__(self) -> int:
+        return len(get_pricing_history().dates)
+
+
+def read_history(path: str = PRICING_HISTORY_PATH) -> List[Tuple[date, Dict[str, ModelEntry], List[str]]]:
+    """Snapshot deltas of the history file, oldest first"""
+    snapshots = []
+    if not os.path.exists(path):
+        return snapshots
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                changed = {model: (provider, entry) for model, (provider, entry) in record.get("set", {}).items()}
+                snapshots.append((date.fromisoformat(record["effective"]), changed, record.get("remove", [])))
+    return snapshots
+
+
+def load_history(path: str = PRICING_HISTORY_PATH, source_path: str = LLM_PRICING_JSON_PATH) -> PricingHistory:
+    """
+    Recorded snapshots, followed by the current LLM_Pricing.json when it
+    differs from the latest one (effective from its lastUpdated, or from the
+    latest snapshot's date if lastUpdated is not later, replacing it)
+    """
+    history = PricingHistory()
+    snapshots = read_history(path)
+    updated, current = current_pricing_source(source_path)
+    if snapshots:
+        latest = PricingHistory()
+        for snapshot in snapshots:
+            latest.add(*snapshot)
+        if latest.snapshot(len(snapshots) - 1) != current:
+            if updated is None or updated <= snapshots[-1][0]:
+                # Unrecorded edit without a later lastUpdated: it supersedes the latest snapshot
+                effective = snapshots.pop()[0]
+                previous = latest.snapshot(len(snapshots) - 1) if snapshots else {}
+            else:
+                effective, previous = updated, latest.snapshot(len(snapshots) - 1)
+            snapshots.append((effective, *snapshot_delta(previous, current)))
+    elif current:
+        snapshots.append((updated or date.today(), current, []))
+    for snapshot in snapshots:
+        history.add(*snapshot)
+    return history
+
+
+def history_path() -> str:
+    """Pricing history file in use: PRICING_HISTORY_PATH from the environment, else the bundled one"""
+    return os.environ.get("PRICING_HISTORY_PATH", PRICING_HISTORY_PATH)
+
+
+def history_digest(path: Optional[str] = None) -> str:
+    """SHA-256 of the history file (empty when there is none), for the pricing version"""
+    path = path or history_path()
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return hashlib.sha256(b"").hexdigest()
+
+
+def record_current_pricing(path: str = PRICING_HISTORY_PATH, source_path: str = LLM_PRICING_JSON_PATH,
+                           effective: Optional[date] = None) -> Optional[Tuple[date, int, int]]:
+    """
+    Append LLM_Pricing.json to the history as a delta, effective from its
+    lastUpdated (or the given date). Returns (effective, models set, models
+    removed), or None when it matches the latest snapshot.
+    """
+    history = PricingHistory()
+    for snapshot in read_history(path):
+        history.add(*snapshot)
+    updated, current = current_pricing_source(source_path)
+    effective = effective or updated or date.today()
+    previous = history.snapshot(len(history.dates) - 1) if history.dates else {}
+    changed, removed = snapshot_delta(previous, current)
+    if not changed and not removed:
+        return None
+    if history.dates and effective <= history.dates[-1]:
+        raise ValueError(
+            f"Effective date {effective} is not after the latest snapshot ({history.dates[-1]}); "
+            "bump lastUpdated in LLM_Pricing.json or pass a later date"
+        )
+    record = {"effective": effective.isoformat(), "set": {model: list(entry) for model, entry in sorted(changed.items())}}
+    if removed:
+        record["remove"] = removed
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    return effective, len(changed), len(removed)
+
+
+# Shared history instance (loaded on first as-of lookup)
+_pricing_history: Optional[PricingHistory] = None
+_pricing_history_lock = threading.Lock()
+
+
+def get_pricing_history() -> PricingHistory:
+    """Get the process-wide pricing history (at history_path())"""
+    global _pricing_history
+    with _pricing_history_lock:
+        if _pricing_history is None:
+            _pricing_history = load_history(history_path())
+    return _pricing_history
+
+
+if __name__ == "__main__":
+    # python -m app.pricing.history [YYYY-MM-DD]: record LLM_Pricing.json as the next snapshot
+    result = record_current_pricing(history_path(), effective=date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None)
+    if result is None:
+        print("LLM_Pricing.json matches the latest snapshot; nothing recorded")
+    else:
+        print(f"Recorded snapshot effective {result[0]}: {result[1]} models set, {result[2]} removed")
@@ -0,0 +1,192 @@
+"""
+Tenant Pricing Overlays
+
+Negotiated rates and custom tier contents of a tenant, kept as a sparse
+override document over the shared catalog:
+
+    {
+        "tiers": {"premium": {"limits": {"cache_hit_rate": 0.5}, "security": {"monthly_cost": 900.0}}},
+        "rates": {"llm": {"gpt-4o": {"input": 2.0, "output": 8.0}},
+                  "azure": {"compute": {"Standard_D16s_v5": {"reserved_1yr": 0.52}}}}
+    }
+
+"tiers" overrides SERVICE_TIERS entries, "rates" the rate card the cost
+lines are compiled against (LLM token rates in USD per 1M tokens; LLM
+overrides apply to as-of-date rates as well). Lists and scalars replace the
+base value; objects are merged key by key.
+
+Overlays resolve through a copy-on-write chain: an OverlayMapping answers
+from the overlay and falls through to the base, and each overridden
+section becomes an overlay view of its own on first access, kept for later
+lookups. The base is never copied or mutated, so a tenant costs the memory
+of its overrides, the views it has used and its own compiled cost lines;
+a tenant that overrides no rates shares the base compiled cost lines.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+MISSING = object()
+
+# Rate-card sections an overlay may override (llm_history follows llm)
+OVERLAY_RATE_SECTIONS = ("llm", "llm_default", "azure", "gpu")
+
+# Sections where an overlay may add keys the base lacks (a model the base catalog does not price)
+OPEN_SECTIONS = {("rates", "llm")}
+
+# Cost line compiler: (name, rate-card key, rate card) -> compiled cost line
+CompileLine = Callable[[str, Tuple[Any, ...], Mapping[str, Any]], Any]
+
+
+class OverlayMapping(Mapping):
+    """Read-only view of overlay over base: overlay values win, nested objects merge"""
+
+    __slots__ = ("overlay", "base", "_views")
+
+    def __init__(self, overlay: Dict[str, Any], base: Mapping[str, Any]):
+        self.overlay = overlay
+        self.base = base
+        self._views: Dict[Any, "OverlayMapping"] = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        view = self._views.get(key)
+        if view is not None:
+            return view
+        value = self.overlay.get(key, MISSING)
+        if value is MISSING:
+            return self.base[key]
+        if isinstance(value, dict):
+            base = self.base.get(key)
+            if isinstance(base, Mapping):
+                view = self._views[key] = OverlayMapping(value, base)
+                return view
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.overlay or key in self.base
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.overlay
+        yield from (key for key in self.base if key not in self.overlay)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class DatedOverlay(Mapping):
+    """Applies one overlay to every entry of a dated section (effective date -> rates)"""
+
+    def __init__(self, overlay: Dict[str, Any], base: Mapping[str, Mapping[str, Any]]):
+        self.overlay = overlay
+        self.base = base
+        self._views: Dict[str, OverlayMapping] = {}
+
+    def __getitem__(self, key: str) -> OverlayMapping:
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = OverlayMapping(self.overlay, self.base[key])
+        return view
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.base)
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+
+def materialize(value: Any) -> Any:
+    """Plain dicts of a (possibly overlaid) mapping, e.g. for JSON responses"""
+    if isinstance(value, Mapping):
+        return {key: materialize(item) for key, item in value.items()}
+    return value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check(overlay: Any, base: Any, path: Tuple[str, ...]):
+    """ValueError when overlay does not fit the shape of base"""
+    where = ".".join(path)
+    if isinstance(base, Mapping):
+        if not isinstance(overlay, dict):
+            raise ValueError(f"{where} must be an object")
+        for key, value in overlay.items():
+            if key in base:
+                _check(value, base[key], path + (key,))
+            elif path[:2] in OPEN_SECTIONS and len(path) == 2:
+                if not isinstance(value, dict) or not all(_is_number(value.get(field)) for field in ("input", "output")):
+                    raise ValueError(f"{where}.{key} is not in the base catalog: give at least numeric input and output rates")
+            else:
+                raise ValueError(f"Unknown key {where}.{key}")
+    elif isinstance(overlay, dict):
+        raise ValueError(f"{where} must not be an object")
+    elif _is_number(base) and not _is_number(overlay):
+        raise ValueError(f"{where} must be a number")
+    elif isinstance(base, (list, tuple)) and not isinstance(overlay, list):
+        raise ValueError(f"{where} must be a list")
+
+
+class TenantPricing:
+    """
+    Tier configurations, rate card and compiled cost lines of one tenant
+    (or of the shared catalog, for the base instance)
+    """
+
+    def __init__(self, tiers: Mapping[str, Mapping[str, Any]], rate_card: Mapping[str, Any], compile_line: CompileLine,
+                 tenant_id: Optional[str] = None, document: Optional[Dict[str, Any]] = None,
+                 base: Optional["TenantPricing"] = None):
+        self.tiers = tiers
+        self.rate_card = rate_card
+        self.tenant_id = tenant_id
+        self.document = document or {}
+        self.base = base
+        self.version = hashlib.sha256(
+            json.dumps(self.document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()[:16] if tenant_id else ""
+        self._compile_line = compile_line
+        self._compiled: Dict[Tuple[Any, ...], Any] = {}
+
+    def tier(self, tier: str) -> Mapping[str, Any]:
+        """Configuration of a tier (standard when unknown), as get_tier_config"""
+        config = self.tiers.get(tier.lower())
+        return config if config is not None else self.tiers["standard"]
+
+    def compiled(self, name: str, *key: Any) -> Any:
+        """Cost line compiled against this rate card (the base's when no rates are overridden)"""
+        if self.base is not None and self.rate_card is self.base.rate_card:
+            return self.base.compiled(name, *key)
+        compiled = self._compiled.get((name, *key))
+        if compiled is None:
+            compiled = self._compiled[(name, *key)] = self._compile_line(name, key, self.rate_card)
+        return compiled
+
+    def overlay(self, tenant_id: str, document: Dict[str, Any]) -> "TenantPricing":
+        """Tenant pricing layered over this one (ValueError when the document does not fit)"""
+        if not isinstance(document, dict):
+            raise ValueError("An overlay must be an object")
+        unknown = sorted(set(document) - {"tiers", "rates"})
+        if unknown:
+            raise ValueError(f"Unknown overlay sections {unknown}; expected 'tiers' and/or 'rates'")
+        tiers_overlay = document.get("tiers") or {}
+        rates_overlay = document.get("rates") or {}
+        _check(tiers_overlay, self.tiers, ("tiers",))
+        bad_sections = sorted(set(rates_overlay) - set(OVERLAY_RATE_SECTIONS))
+        if bad_sections:
+            raise ValueError(f"Rate sections {bad_sections} cannot be overridden. Available: {list(OVERLAY_RATE_SECTIONS)}")
+        _check(rates_overlay, {name: self.rate_card[name] for name in rates_overlay}, ("rates",))
+
+        tiers = OverlayMapping(tiers_overlay, self.tiers) if tiers_overlay else self.tiers
+        rate_card = self.rate_card
+        if rates_overlay:
+            if "llm" in rates_overlay and "llm_history" in self.rate_card:
+                rates_overlay = {**rates_overlay, "llm_history": DatedOverlay(rates_overlay["llm"], self.rate_card["llm_history"])}
+            rate_card = OverlayMapping(rates_overlay, self.rate_card)
+        return TenantPricing(tiers, rate_card, self._compile_line, tenant_id, document, base=self)
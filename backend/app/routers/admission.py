@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.middleware.admission import get_admission_controller
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.get("/admission")
+async def admission_stats():
+    """Rate limit and per-pool concurrency, queue lengths, rejections and queue-wait percentiles (this process)"""
+    return get_admission_controller().stats()
@@ -0,0 +1,282 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.routers.capacity_planner import model_service_time
+from app.routers.cost_calculator_v2 import api_call_cost
+
+# Latency quantiles of the end-to-end response time
+PIPELINE_QUANTILES = (0.5, 0.95)
+
+# Upper bounds on one analysis: agents in the DAG, model swaps (each one a
+# re-simulation) and simulated call latencies (samples × total calls per
+# assessment, one float64 each)
+MAX_PIPELINE_AGENTS = 64
+MAX_MODEL_SWAPS = 32
+MAX_SIMULATED_CALLS = 20_000_000
+
+# ===========================
+# MODELS
+# ===========================
+
+class PipelineAgent(BaseModel):
+    """Agent of the pipeline (DAG node): starts once every agent it depends on has finished"""
+    id: str
+    model: str
+    depends_on: List[str] = Field(default=[])
+    calls: int = Field(default=1, ge=1, le=100, description="LLM calls per assessment")
+    parallel_calls: bool = Field(default=True, description="Calls fan out concurrently (else run one after another)")
+    tokens_per_call: int = Field(default=5000, ge=1, le=200000)
+    input_token_share: float = Field(default=0.7, ge=0.0, le=1.0)
+    usage_probability: float = Field(default=100.0, ge=0.0, le=100.0, description="Percent of assessments using the agent")
+    latency_cv: Optional[float] = Field(default=None, ge=0.0, description="Overrides the pipeline latency_cv")
+
+# Sales Coach pipeline (agent defaults as in the Design page)
+SALES_COACH_PIPELINE = [
+    PipelineAgent(id="supervisor", model="gpt-4o", tokens_per_call=3000),
+    PipelineAgent(id="client_intelligence", model="gpt-4o", depends_on=["supervisor"], calls=2,
+                  tokens_per_call=7000, usage_probability=90),
+    PipelineAgent(id="deal_assessment", model="gpt-4o", depends_on=["supervisor"], calls=2,
+                  tokens_per_call=6000, usage_probability=85),
+    PipelineAgent(id="strategic_planning", model="claude-3-5-sonnet", depends_on=["supervisor"], calls=2,
+                  tokens_per_call=10000, usage_probability=75),
+    PipelineAgent(id="team_orchestration", model="gpt-4o", depends_on=["supervisor"],
+                  tokens_per_call=5000, usage_probability=60),
+    PipelineAgent(id="power_plan", model="gpt-4o", depends_on=["client_intelligence", "deal_assessment"], calls=3,
+                  tokens_per_call=8000),
+    PipelineAgent(id="persona_coach", model="gpt-4o",
+                  depends_on=["power_plan", "strategic_planning", "team_orchestration"], calls=2, tokens_per_call=5000),
+    PipelineAgent(id="feedback_agent", model="gpt-4o", depends_on=["persona_coach"],
+                  tokens_per_call=4000, usage_probability=80),
+]
+
+class PipelineRequest(BaseModel):
+    agents: List[PipelineAgent] = Field(default=SALES_COACH_PIPELINE, max_length=MAX_PIPELINE_AGENTS)
+    assessments_per_month: int = Field(default=10000, ge=1)
+    cache_hit_rate: float = Field(default=0.70, ge=0.0, le=1.0)
+    use_prompt_caching: bool = Field(default=True)
+    latency_cv: float = Field(
+        default=0.3, ge=0.0,
+        description="Coefficient of variation of each call's latency (lognormal around the latency tables)"
+    )
+    samples: int = Field(default=20000, ge=100, le=200000)
+    seed: int = Field(default=0)
+    alternative_models: Dict[str, List[str]] = Field(
+        default={},
+        description="Models to try per agent ID: cost and latency change of swapping each in"
+    )
+
+class AgentResult(BaseModel):
+    id: str
+    model: str
+    cost_per_assessment: float
+    mean_call_latency_seconds: float
+    mean_latency_seconds: float
+    criticality: float = Field(description="Share of assessments in which the agent is on the critical path")
+    slack_seconds: float = Field(description="Delay the agent absorbs without lengthening the mean-latency critical path")
+
+class ModelSwap(BaseModel):
+    agent: str
+    model: str
+    cost_per_assessment_change: float
+    monthly_cost_change: float
+    p50_change_seconds: float
+    p95_change_seconds: float
+
+class PipelineResponse(BaseModel):
+    cost_per_assessment: float
+    monthly_cost: float
+    mean_latency_seconds: float
+    latency_quantiles_seconds: Dict[str, float]
+    critical_path: List[str]
+    agents: List[AgentResult]
+    swaps: List[ModelSwap]
+
+# ===========================
+# DAG ANALYSIS
+# ===========================
+
+def topological_order(agents: List[PipelineAgent]) -> List[int]:
+    """Agent indices with every agent after its dependencies (400 on unknown IDs or cycles)"""
+    index = {agent.id: i for i, agent in enumerate(agents)}
+    if len(index) != len(agents):
+        raise HTTPException(status_code=400, detail="Agent IDs must be unique")
+    unknown = sorted({d for agent in agents for d in agent.depends_on if d not in index})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown dependencies {unknown}")
+
+    remaining = {i: {index[d] for d in agent.depends_on} for i, agent in enumerate(agents)}
+    order = []
+    while remaining:
+        ready = [i for i, deps in remaining.items() if not deps]
+        if not ready:
+            cycle = [agents[i].id for i in remaining]
+            raise HTTPException(status_code=400, detail=f"Agent dependencies form a cycle among {cycle}")
+        for i in ready:
+            order.append(i)
+            del remaining[i]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+def _call_profile(agent: PipelineAgent, model: str, payload: PipelineRequest):
+    """(cost per call, mean latency per call) of an agent running a model"""
+    input_tokens = agent.tokens_per_call * agent.input_token_share
+    output_tokens = agent.tokens_per_call - input_tokens
+    cost = api_call_cost(model, input_tokens, output_tokens, payload.cache_hit_rate, payload.use_prompt_caching)
+    return cost, model_service_time(model, input_tokens, output_tokens)
+
+def simulate_latency(agents: List[PipelineAgent], order: List[int], mean_call: np.ndarray,
+                     normals: List[np.ndarray], used: np.ndarray, payload: PipelineRequest):
+    """
+    Monte Carlo over assessments (one row per sample): each call's latency is
+    lognormal around its mean (normals[i]: samples × calls of agent i);
+    fanned-out calls finish with the slowest one,
+    sequential calls add up; unused agents take no time. Returns agent
+    finish times (samples × agents), durations, and the critical-path
+    predecessor of every agent (-1 for a start node).
+    """
+    samples = used.shape[0]
+    durations = np.empty((samples, len(agents)))
+    for i, agent in enumerate(agents):
+        cv = payload.latency_cv if agent.latency_cv is None else agent.latency_cv
+        sigma = np.sqrt(np.log1p(cv ** 2))
+        calls = mean_call[i] * np.exp(sigma * normals[i] - sigma ** 2 / 2)
+        node = calls.max(axis=1) if agent.parallel_calls else calls.sum(axis=1)
+        durations[:, i] = np.where(used[:, i], node, 0.0)
+
+    finish = np.zeros((samples, len(agents)))
+    predecessor = np.full((samples, len(agents)), -1)
+    index = {agent.id: i for i, agent in enumerate(agents)}
+    for i in order:
+        deps = [index[d] for d in agents[i].depends_on]
+        start = np.zeros(samples)
+        if deps:
+            dep_finish = finish[:, deps]
+            start = dep_finish.max(axis=1)
+            predecessor[:, i] = np.array(deps)[dep_finish.argmax(axis=1)]
+        finish[:, i] = start + durations[:, i]
+    return finish, durations, predecessor
+
+def analyze_pipeline(payload: PipelineRequest) -> PipelineResponse:
+    """
+    Cost per assessment is the expected LLM spend of every agent; the user
+    sees the end-to-end latency, the longest path through the DAG. Latency
+    quantiles come from simulating per-call latency distributions; model
+    swaps are simulated with the same random draws (common random numbers).
+    """
+    agents = payload.agents
+    if not agents:
+        raise HTTPException(status_code=400, detail="The pipeline needs at least one agent")
+    order = topological_order(agents)
+    simulated_calls = payload.samples * sum(agent.calls for agent in agents)
+    if simulated_calls > MAX_SIMULATED_CALLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"samples × total calls per assessment is {simulated_calls:,}; at most {MAX_SIMULATED_CALLS:,}"
+        )
+    for agent_id, models in payload.alternative_models.items():
+        if agent_id not in {agent.id for agent in agents}:
+            raise HTTPException(status_code=400, detail=f"alternative_models names unknown agent '{agent_id}'")
+    if sum(len(models) for models in payload.alternative_models.values()) > MAX_MODEL_SWAPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MODEL_SWAPS} alternative models per analysis")
+
+    profiles = [_call_profile(agent, agent.model, payload) for agent in agents]
+    call_cost = np.array([cost for cost, _ in profiles])
+    mean_call = np.array([latency for _, latency in profiles])
+    usage = np.array([agent.usage_probability / 100 for agent in agents])
+    calls = np.array([agent.calls for agent in agents])
+    agent_cost = usage * calls * call_cost
+
+    rng = np.random.default_rng(payload.seed)
+    normals = [rng.standard_normal((payload.samples, agent.calls)) for agent in agents]
+    used = rng.random((payload.samples, len(agents))) < usage
+
+    finish, durations, predecessor = simulate_latency(agents, order, mean_call, normals, used, payload)
+    end_to_end = finish.max(axis=1)
+    quantiles = np.quantile(end_to_end, PIPELINE_QUANTILES)
+
+    # Criticality: walk back from the last agent to finish along critical predecessors
+    on_path = np.zeros_like(used)
+    rows = np.arange(payload.samples)
+    current = finish.argmax(axis=1)
+    for _ in range(len(agents)):
+        active = current >= 0
+        if not active.any():
+            break
+        on_path[rows[active], current[active]] = True
+        current = np.where(active, predecessor[rows, np.maximum(current, 0)], -1)
+
+    # Critical path and slack at mean durations (expected usage)
+    mean_duration = durations.mean(axis=0)
+    index = {agent.id: i for i, agent in enumerate(agents)}
+    earliest = np.zeros(len(agents))
+    for i in order:
+        start = max((earliest[index[d]] for d in agents[i].depends_on), default=0.0)
+        earliest[i] = start + mean_duration[i]
+    makespan = earliest.max()
+    latest = np.full(len(agents), makespan)
+    for i in reversed(order):
+        for d in agents[i].depends_on:
+            latest[index[d]] = min(latest[index[d]], latest[i] - mean_duration[i])
+    slack = latest - earliest
+    path, node = [], int(earliest.argmax())
+    while node >= 0:
+        path.append(agents[node].id)
+        deps = [index[d] for d in agents[node].depends_on]
+        node = max(deps, key=lambda d: earliest[d]) if deps else -1
+
+    # Model swaps: re-price and re-simulate one agent at a time with the same draws
+    swaps = []
+    for agent_id, models in payload.alternative_models.items():
+        i = index[agent_id]
+        for model in models:
+            cost, latency = _call_profile(agents[i], model, payload)
+            swapped_mean = mean_call.copy()
+            swapped_mean[i] = latency
+            swapped_finish, _, _ = simulate_latency(agents, order, swapped_mean, normals, used, payload)
+            swapped_quantiles = np.quantile(swapped_finish.max(axis=1), PIPELINE_QUANTILES)
+            cost_change = usage[i] * calls[i] * (cost - call_cost[i])
+            swaps.append(ModelSwap(
+                agent=agent_id,
+                model=model,
+                cost_per_assessment_change=cost_change,
+                monthly_cost_change=cost_change * payload.assessments_per_month,
+                p50_change_seconds=swapped_quantiles[0] - quantiles[0],
+                p95_change_seconds=swapped_quantiles[1] - quantiles[1],
+            ))
+
+    cost_per_assessment = float(agent_cost.sum())
+    return PipelineResponse(
+        cost_per_assessment=cost_per_assessment,
+        monthly_cost=cost_per_assessment * payload.assessments_per_month,
+        mean_latency_seconds=float(end_to_end.mean()),
+        latency_quantiles_seconds={f"p{round(q * 100)}": float(v) for q, v in zip(PIPELINE_QUANTILES, quantiles)},
+        critical_path=path[::-1],
+        agents=[
+            AgentResult(
+                id=agent.id,
+                model=agent.model,
+                cost_per_assessment=agent_cost[i],
+                mean_call_latency_seconds=mean_call[i],
+                mean_latency_seconds=mean_duration[i],
+                criticality=on_path[:, i].mean(),
+                slack_seconds=max(slack[i], 0.0),
+            )
+            for i, agent in enumerate(agents)
+        ],
+        swaps=swaps,
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/pipeline/analyze", response_model=PipelineResponse)
+def analyze_pipeline_endpoint(payload: PipelineRequest):
+    """Cost per assessment and end-to-end latency (critical path, p50/p95) of a multi-agent pipeline"""
+    return analyze_pipeline(payload)
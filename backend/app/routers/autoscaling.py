@@ -0,0 +1,219 @@
+import math
+from datetime import date
+from typing import List, Dict, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.config.service_tiers import SERVICE_TIERS, get_tier_config
+from app.routers.cost_calculator_v2 import (
+    AZURE_PRICING_SYDNEY,
+    get_agent_infrastructure,
+    calculate_llm_costs,
+)
+from app.storage.usage_store import get_usage_store
+
+HOURS_PER_WEEK = 168
+HOURS_PER_MONTH = 730
+
+# Always-on GPUs per tier, as in the on-premise branch of calculate_llm_costs
+TIER_GPU_COUNTS = {"basic": 1, "standard": 2, "premium": 4}
+
+# ===========================
+# MODELS
+# ===========================
+
+class AutoscalingRules(BaseModel):
+    min_nodes: int = Field(default=1, ge=0)
+    max_nodes: Optional[int] = Field(default=None, ge=1, description="Defaults to the always-on node count")
+    target_utilization: float = Field(default=0.7, gt=0.0, le=1.0)
+    capacity_per_node: Optional[float] = Field(
+        default=None, gt=0,
+        description="Load units one node serves per hour at 100% utilization; "
+                    "defaults to sizing the always-on fleet for peak load at target utilization"
+    )
+    scale_up_delay_minutes: float = Field(default=5.0, ge=0, description="Time for a new node to become ready (billed)")
+    scale_down_cooldown_minutes: float = Field(
+        default=30.0, ge=0, le=HOURS_PER_WEEK * 60,
+        description="Nodes are kept this long after load drops (at most one week: the profile wraps around)"
+    )
+
+class AutoscalingRequest(BaseModel):
+    agent_type: str = Field(default="sales-coach")
+    service_tier: str = Field(default="standard")
+    infrastructure_scale: float = Field(default=1.0, ge=0.1, le=5.0)
+    use_reserved_instances: Optional[bool] = Field(default=None, description="Always-on pricing; defaults to the tier feature")
+
+    # Load profile: explicit 168-hour week (Monday 00:00 UTC first) or derived from ingested usage
+    weekly_load_profile: Optional[List[float]] = Field(default=None, min_length=HOURS_PER_WEEK, max_length=HOURS_PER_WEEK)
+    usage_start_date: Optional[date] = None
+    usage_end_date: Optional[date] = None
+    usage_service_tiers: List[str] = Field(default=[])
+
+    aks_rules: AutoscalingRules = Field(default=AutoscalingRules(min_nodes=2))
+    gpu_rules: AutoscalingRules = Field(default=AutoscalingRules(min_nodes=1))
+
+class AutoscalingPoolResult(BaseModel):
+    node_pool: str
+    always_on_nodes: float
+    always_on_node_hours_per_month: float
+    always_on_monthly_cost: float
+    autoscaled_node_hours_per_month: float
+    autoscaled_monthly_cost: float
+    monthly_savings: float
+    peak_nodes: int
+    average_nodes: float
+    under_provisioned_node_hours_per_month: float
+    hourly_nodes: List[int]
+    notes: str
+
+class AutoscalingResponse(BaseModel):
+    service_tier: str
+    profile_source: str
+    load_profile: List[float]
+    total_always_on_monthly_cost: float
+    total_autoscaled_monthly_cost: float
+    total_monthly_savings: float
+    pools: List[AutoscalingPoolResult]
+
+# ===========================
+# LOAD PROFILE & SCALING
+# ===========================
+
+def weekly_profile_from_usage(start: date, end: date, service_tiers: List[str]) -> np.ndarray:
+    """Average queries per hour of week (Monday 00:00 UTC = hour 0) over a usage date range"""
+    aggregated = get_usage_store().aggregate(start, end, ("hour_of_week",), {"tier": [t.lower() for t in service_tiers]})
+    queries = np.bincount(aggregated["hour_of_week"], weights=aggregated["queries"], minlength=HOURS_PER_WEEK)
+
+    # Number of times each hour of week occurs in the range
+    days = np.arange((end - start).days + 1)
+    weekdays = (start.weekday() + days) % 7
+    occurrences = np.repeat(np.bincount(weekdays, minlength=7), 24)
+    return queries / np.maximum(occurrences, 1)
+
+def autoscaled_nodes(load: np.ndarray, always_on_nodes: float, rules: AutoscalingRules) -> Dict[str, np.ndarray]:
+    """
+    Desired and billed nodes per hour for a load profile under autoscaling rules.
+    Desired nodes follow load at the target utilization; nodes stay billed for
+    the scale-down cooldown; each scale-up step is unavailable (but billed)
+    for the scale-up delay.
+    """
+    peak = load.max()
+    if rules.capacity_per_node:
+        capacity = rules.capacity_per_node
+    else:
+        capacity = peak / (max(always_on_nodes, 1) * rules.target_utilization) if peak > 0 else 1.0
+
+    max_nodes = rules.max_nodes or max(math.ceil(always_on_nodes), rules.min_nodes, 1)
+    desired = np.clip(np.ceil(load / (capacity * rules.target_utilization)), rules.min_nodes, max_nodes)
+
+    # Cooldown: a node is kept until load has been lower for the whole window (week wraps around)
+    cooldown_hours = math.ceil(rules.scale_down_cooldown_minutes / 60)
+    wrapped = np.concatenate((desired[-cooldown_hours:], desired)) if cooldown_hours else desired
+    billed = np.lib.stride_tricks.sliding_window_view(wrapped, cooldown_hours + 1).max(axis=1)
+
+    step_up = np.maximum(billed - np.roll(billed, 1), 0)
+    late_node_hours = step_up * min(rules.scale_up_delay_minutes / 60, 1.0)
+
+    return {
+        "desired": desired,
+        "billed": billed,
+        "late_node_hours": late_node_hours,
+    }
+
+def _pool_result(node_pool: str, always_on_nodes: float, always_on_rate: float, autoscaled_rate: float,
+                 load: np.ndarray, rules: AutoscalingRules, notes: str) -> AutoscalingPoolResult:
+    scaled = autoscaled_nodes(load, always_on_nodes, rules)
+    weeks_per_month = HOURS_PER_MONTH / HOURS_PER_WEEK
+    node_hours = float(scaled["billed"].sum()) * weeks_per_month
+    always_on_cost = always_on_nodes * HOURS_PER_MONTH * always_on_rate
+    autoscaled_cost = node_hours * autoscaled_rate
+
+    return AutoscalingPoolResult(
+        node_pool=node_pool,
+        always_on_nodes=always_on_nodes,
+        always_on_node_hours_per_month=always_on_nodes * HOURS_PER_MONTH,
+        always_on_monthly_cost=always_on_cost,
+        autoscaled_node_hours_per_month=node_hours,
+        autoscaled_monthly_cost=autoscaled_cost,
+        monthly_savings=always_on_cost - autoscaled_cost,
+        peak_nodes=int(scaled["billed"].max()),
+        average_nodes=float(scaled["billed"].mean()),
+        under_provisioned_node_hours_per_month=float(scaled["late_node_hours"].sum()) * weeks_per_month,
+        hourly_nodes=scaled["billed"].astype(int).tolist(),
+        notes=notes,
+    )
+
+def calculate_autoscaling_costs(params: AutoscalingRequest) -> AutoscalingResponse:
+    """Compare always-on and autoscaled capacity for AKS nodes and on-premise GPUs"""
+    if params.weekly_load_profile is not None:
+        load = np.asarray(params.weekly_load_profile, dtype=np.float64)
+        source = "weekly_load_profile"
+    elif params.usage_start_date and params.usage_end_date:
+        if params.usage_end_date < params.usage_start_date:
+            raise HTTPException(status_code=400, detail="usage_end_date must be on or after usage_start_date")
+        load = weekly_profile_from_usage(params.usage_start_date, params.usage_end_date, params.usage_service_tiers)
+        source = f"usage {params.usage_start_date} to {params.usage_end_date}"
+    else:
+        raise HTTPException(status_code=400, detail="Provide weekly_load_profile or usage_start_date/usage_end_date")
+
+    if (load < 0).any() or load.max() <= 0:
+        raise HTTPException(status_code=400, detail="Load profile must be non-negative with some load")
+
+    tier = params.service_tier.lower() if params.service_tier.lower() in SERVICE_TIERS else "standard"
+    tier_config = get_tier_config(tier)
+    use_reserved = params.use_reserved_instances
+    if use_reserved is None:
+        use_reserved = tier_config["features"].get("use_reserved_instances", False)
+
+    # AKS: always-on matches calculate_infrastructure_costs; autoscaled nodes are pay-as-you-go
+    infra = get_agent_infrastructure(params.agent_type, tier, params.infrastructure_scale)
+    aks_rates = AZURE_PRICING_SYDNEY["compute"]["Standard_D16s_v5"]
+    aks = _pool_result(
+        "aks_nodes",
+        infra["aks_nodes"],
+        aks_rates["reserved_1yr" if use_reserved else "payg"],
+        aks_rates["payg"],
+        load,
+        params.aks_rules,
+        f"Standard_D16s_v5: always-on {'reserved_1yr' if use_reserved else 'payg'}, autoscaled payg",
+    )
+
+    # On-premise GPUs: always-on matches the on-premise branch of calculate_llm_costs
+    gpu_count = TIER_GPU_COUNTS.get(tier, 1)
+    on_prem_models = tier_config["llm_models"].get("on_premise", [])
+    gpu_mix = {model: 100.0 / len(on_prem_models) for model in on_prem_models}
+    gpu_monthly, _ = calculate_llm_costs(gpu_mix, 0, 0, 0, 0.0, False, deployment_type="on_premise", service_tier=tier)
+    gpu_hourly = gpu_monthly / (gpu_count * HOURS_PER_MONTH)  # AUD per GPU-hour (mix-weighted)
+    gpus = _pool_result(
+        "gpus",
+        gpu_count,
+        gpu_hourly,
+        gpu_hourly,
+        load,
+        params.gpu_rules,
+        f"{gpu_count} on-premise GPU(s) for {tier} tier models, ${gpu_hourly:.2f} AUD/GPU-hour",
+    )
+
+    pools = [aks, gpus]
+    return AutoscalingResponse(
+        service_tier=tier,
+        profile_source=source,
+        load_profile=load.tolist(),
+        total_always_on_monthly_cost=sum(p.always_on_monthly_cost for p in pools),
+        total_autoscaled_monthly_cost=sum(p.autoscaled_monthly_cost for p in pools),
+        total_monthly_savings=sum(p.monthly_savings for p in pools),
+        pools=pools,
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/infrastructure/autoscaling", response_model=AutoscalingResponse)
+def autoscaling_costs_endpoint(params: AutoscalingRequest):
+    """Cost of always-on versus autoscaled AKS nodes and on-premise GPUs for a weekly load profile"""
+    return calculate_autoscaling_costs(params)
@@ -0,0 +1,156 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    apply_service_tier_config,
+    batch_api,
+    calculate_llm_costs,
+    get_tenant_pricing,
+    route_batch_queries,
+)
+from app.pricing.tenants import TenantPricing
+
+# ===========================
+# MODELS
+# ===========================
+
+class BatchRoutingRequest(BaseModel):
+    calculation: CostCalculatorRequest = Field(default=CostCalculatorRequest())
+    turnaround_sweep_hours: List[float] = Field(
+        default=[0.5, 1, 2, 4, 6, 8, 12, 24],
+        description="max_batch_turnaround_hours values to price, for the latency/cost trade-off"
+    )
+
+class ModelBatchRoute(BaseModel):
+    model: str
+    provider: Optional[str]
+    batched_share: float
+    batch_discount: Optional[float]
+    typical_turnaround_hours: Optional[float]
+    max_turnaround_hours: Optional[float]
+    sync_monthly_cost: float
+    routed_monthly_cost: float
+
+class TurnaroundPoint(BaseModel):
+    max_batch_turnaround_hours: float
+    llm_monthly_cost: float
+    savings_monthly: float
+    savings_percent: float
+    batched_query_share: float
+    expected_added_latency_hours: float
+    worst_case_added_latency_hours: float
+
+class BatchRoutingResponse(BaseModel):
+    service_tier: str
+    use_batch_processing: bool
+    sync_llm_monthly_cost: float
+    routed: TurnaroundPoint
+    models: List[ModelBatchRoute]
+    sweep: List[TurnaroundPoint]
+
+# ===========================
+# ROUTING
+# ===========================
+
+def _route(params: CostCalculatorRequest, max_turnaround_hours: float, sync_cost: float, tenant_pricing: TenantPricing):
+    """Batch shares, per-model routed costs and the trade-off point at one turnaround limit"""
+    shares = route_batch_queries(
+        params.llm_mix, params.agent_latency_tolerances or [], max_turnaround_hours, params.as_of, tenant_pricing
+    )
+    total_queries = params.num_users * params.queries_per_user_per_month
+    cost, breakdown = calculate_llm_costs(
+        params.llm_mix, total_queries, params.avg_input_tokens, params.avg_output_tokens,
+        params.cache_hit_rate, params.use_prompt_caching,
+        cache_hit_rates=params.cache_hit_rates, batch_shares=shares, as_of=params.as_of, tenant_pricing=tenant_pricing
+    )
+
+    # Added latency is weighted by queries, over all queries (interactive ones add none)
+    batched = expected = worst = 0.0
+    for model, share in shares.items():
+        terms = batch_api(model, params.as_of, tenant_pricing)
+        weight = params.llm_mix[model] / 100 * share
+        batched += weight
+        expected += weight * terms["typical_turnaround_hours"]
+        worst = max(worst, terms["max_turnaround_hours"])
+
+    savings = sync_cost - cost
+    return shares, breakdown, TurnaroundPoint(
+        max_batch_turnaround_hours=max_turnaround_hours,
+        llm_monthly_cost=cost,
+        savings_monthly=savings,
+        savings_percent=savings / sync_cost * 100 if sync_cost else 0.0,
+        batched_query_share=batched,
+        expected_added_latency_hours=expected,
+        worst_case_added_latency_hours=worst,
+    )
+
+def plan_batch_routing(payload: BatchRoutingRequest) -> BatchRoutingResponse:
+    """
+    Cloud API LLM cost with the queries of latency-tolerant agents sent to
+    provider batch APIs, against all-synchronous pricing, and the same
+    trade-off for every turnaround limit of the sweep
+    """
+    tenant_pricing = get_tenant_pricing(payload.calculation.tenant)
+    params = apply_service_tier_config(payload.calculation.model_copy(deep=True), tenant_pricing)
+    if params.deployment_type != "cloud_api":
+        raise HTTPException(status_code=400, detail="Batch API routing applies to cloud_api deployments")
+
+    total_queries = params.num_users * params.queries_per_user_per_month
+    sync_cost, sync_breakdown = calculate_llm_costs(
+        params.llm_mix, total_queries, params.avg_input_tokens, params.avg_output_tokens,
+        params.cache_hit_rate, params.use_prompt_caching, cache_hit_rates=params.cache_hit_rates,
+        as_of=params.as_of, tenant_pricing=tenant_pricing
+    )
+
+    if params.use_batch_processing:
+        shares, routed_breakdown, routed = _route(params, params.max_batch_turnaround_hours, sync_cost, tenant_pricing)
+        sweep = [
+            _route(params, hours, sync_cost, tenant_pricing)[2] for hours in sorted(set(payload.turnaround_sweep_hours))
+        ]
+    else:
+        # Tier without batch processing: everything stays synchronous
+        shares, routed_breakdown = {}, sync_breakdown
+        routed = TurnaroundPoint(
+            max_batch_turnaround_hours=params.max_batch_turnaround_hours, llm_monthly_cost=sync_cost,
+            savings_monthly=0.0, savings_percent=0.0, batched_query_share=0.0,
+            expected_added_latency_hours=0.0, worst_case_added_latency_hours=0.0,
+        )
+        sweep = []
+
+    models = []
+    for sync_item, routed_item in zip(sync_breakdown, routed_breakdown):
+        model = sync_item.subcategory_ref
+        terms = batch_api(model, params.as_of, tenant_pricing)
+        models.append(ModelBatchRoute(
+            model=model,
+            provider=terms["provider"] if terms else None,
+            batched_share=shares.get(model, 0.0),
+            batch_discount=terms["discount"] if terms else None,
+            typical_turnaround_hours=terms["typical_turnaround_hours"] if terms else None,
+            max_turnaround_hours=terms["max_turnaround_hours"] if terms else None,
+            sync_monthly_cost=sync_item.monthly_cost,
+            routed_monthly_cost=routed_item.monthly_cost,
+        ))
+
+    return BatchRoutingResponse(
+        service_tier=params.service_tier,
+        use_batch_processing=params.use_batch_processing,
+        sync_llm_monthly_cost=sync_cost,
+        routed=routed,
+        models=models,
+        sweep=sweep,
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/batch-routing", response_model=BatchRoutingResponse)
+def batch_routing_endpoint(payload: BatchRoutingRequest):
+    """LLM cost saved, and completion latency added, by sending latency-tolerant queries to batch APIs"""
+    return plan_batch_routing(payload)
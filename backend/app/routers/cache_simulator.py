@@ -0,0 +1,256 @@
+import json
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any, Iterable
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+from app.config.service_tiers import get_model_provider
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    CostCalculatorResponse,
+    calculate_costs,
+)
+
+# ===========================
+# PROVIDER CACHE POLICIES
+# ===========================
+
+# Approximate prefix-caching behaviour of each provider
+# - min_cacheable_tokens: prompts shorter than this are never cached
+# - block_tokens: cached prefixes are matched in increments of this many tokens
+# - ttl_seconds: an idle prefix is evicted after this long (refreshed on every hit)
+PREFIX_CACHE_POLICIES = {
+    "openai": {"min_cacheable_tokens": 1024, "block_tokens": 128, "ttl_seconds": 600},
+    "anthropic": {"min_cacheable_tokens": 1024, "block_tokens": 128, "ttl_seconds": 300},
+    "google": {"min_cacheable_tokens": 1024, "block_tokens": 256, "ttl_seconds": 3600},
+    "default": {"min_cacheable_tokens": 1024, "block_tokens": 128, "ttl_seconds": 300},
+}
+
+# Approximate characters per token when a trace carries raw prompt text
+CHARS_PER_TOKEN = 4
+
+# ===========================
+# MODELS
+# ===========================
+
+class PromptTraceEntry(BaseModel):
+    """One prompt sent to a model; give either prompt text or token IDs"""
+    timestamp: float = Field(..., description="Seconds (any epoch); trace is replayed in time order")
+    model: str
+    prompt: Optional[str] = None
+    token_ids: Optional[List[int]] = None
+
+class CachePolicyOverride(BaseModel):
+    min_cacheable_tokens: Optional[int] = Field(default=None, ge=0)
+    block_tokens: Optional[int] = Field(default=None, ge=1)
+    ttl_seconds: Optional[float] = Field(default=None, ge=0)
+
+class CacheSimulationRequest(BaseModel):
+    prompts: List[PromptTraceEntry]
+    policy_overrides: Dict[str, CachePolicyOverride] = Field(
+        default={},
+        description="Per-model policy overrides (keyed by model ID)"
+    )
+    calculation: Optional[CostCalculatorRequest] = Field(
+        default=None,
+        description="If provided, priced with the simulated per-model cache hit rates"
+    )
+
+class ModelCacheStats(BaseModel):
+    model: str
+    provider: str
+    min_cacheable_tokens: int
+    block_tokens: int
+    ttl_seconds: float
+    prompts: int
+    prompts_with_cache_hit: int
+    input_tokens: int
+    cached_tokens: int
+    cached_token_fraction: float
+    cached_prefixes: int
+
+class CacheSimulationResponse(BaseModel):
+    models: List[ModelCacheStats]
+    total_prompts: int
+    overall_cached_token_fraction: float
+    cache_hit_rates: Dict[str, float]
+    calculation: Optional[CostCalculatorResponse] = None
+
+# ===========================
+# SIMULATOR
+# ===========================
+
+class PrefixCacheSimulator:
+    """
+    Replays prompts through a provider-style prefix cache.
+
+    Each prompt is split into block-aligned prefixes, identified by a chained
+    (rolling) hash of their blocks. Per model, an LRU-ordered dict maps each
+    prefix hash to its last access time, so TTL eviction pops from the front.
+    """
+
+    def __init__(self, policy_overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.policy_overrides = policy_overrides or {}
+        self._caches: Dict[str, OrderedDict] = {}
+        self._policies: Dict[str, Dict[str, Any]] = {}
+        self._stats: Dict[str, List[int]] = {}  # model -> [prompts, hit prompts, input, cached]
+        self._clock = float("-inf")
+
+    def policy(self, model: str) -> Dict[str, Any]:
+        if model not in self._policies:
+            provider = get_model_provider(model)
+            policy = {**PREFIX_CACHE_POLICIES.get(provider, PREFIX_CACHE_POLICIES["default"]), "provider": provider}
+            policy.update({k: v for k, v in self.policy_overrides.get(model, {}).items() if v is not None})
+            self._policies[model] = policy
+        return self._policies[model]
+
+    def _prefix_hashes(self, policy: Dict[str, Any], prompt: Optional[str], token_ids: Optional[List[int]]) -> tuple:
+        """Return (token count, chained hash of every full block prefix)"""
+        block = policy["block_tokens"]
+        if token_ids is not None:
+            units, step, num_tokens = token_ids, block, len(token_ids)
+        else:
+            units, step = prompt or "", block * CHARS_PER_TOKEN
+            num_tokens = -(-len(units) // CHARS_PER_TOKEN)
+
+        hashes = []
+        running = 0
+        for start in range(0, len(units) - step + 1, step):
+            piece = units[start:start + step]
+            running = hash((running, piece if isinstance(piece, str) else tuple(piece)))
+            hashes.append(running)
+        return num_tokens, hashes
+
+    def process(self, model: str, timestamp: float, prompt: Optional[str] = None, token_ids: Optional[List[int]] = None) -> int:
+        """Replay one prompt; returns the number of input tokens served from cache"""
+        policy = self.policy(model)
+        cache = self._caches.setdefault(model, OrderedDict())
+        stats = self._stats.setdefault(model, [0, 0, 0, 0])
+
+        # Out-of-order entries are treated as arriving now
+        now = self._clock = max(self._clock, timestamp)
+
+        # TTL eviction: entries are ordered by last access time
+        expiry = now - policy["ttl_seconds"]
+        while cache:
+            _, last_access = next(iter(cache.items()))
+            if last_access >= expiry:
+                break
+            cache.popitem(last=False)
+
+        num_tokens, hashes = self._prefix_hashes(policy, prompt, token_ids)
+
+        # Longest cached block prefix (prefixes of a cached prefix are always cached)
+        hit_blocks = 0
+        for prefix_hash in hashes:
+            if prefix_hash not in cache:
+                break
+            hit_blocks += 1
+
+        cached_tokens = hit_blocks * policy["block_tokens"]
+        if cached_tokens < policy["min_cacheable_tokens"]:
+            cached_tokens = 0
+
+        # Write / refresh this prompt's prefixes
+        if num_tokens >= policy["min_cacheable_tokens"]:
+            for prefix_hash in hashes:
+                cache[prefix_hash] = now
+                cache.move_to_end(prefix_hash)
+
+        stats[0] += 1
+        stats[1] += 1 if cached_tokens else 0
+        stats[2] += num_tokens
+        stats[3] += cached_tokens
+        return cached_tokens
+
+    def results(self) -> List[ModelCacheStats]:
+        results = []
+        for model, (prompts, hit_prompts, input_tokens, cached_tokens) in self._stats.items():
+            policy = self.policy(model)
+            results.append(ModelCacheStats(
+                model=model,
+                provider=policy["provider"],
+                min_cacheable_tokens=policy["min_cacheable_tokens"],
+                block_tokens=policy["block_tokens"],
+                ttl_seconds=policy["ttl_seconds"],
+                prompts=prompts,
+                prompts_with_cache_hit=hit_prompts,
+                input_tokens=input_tokens,
+                cached_tokens=cached_tokens,
+                cached_token_fraction=cached_tokens / input_tokens if input_tokens > 0 else 0.0,
+                cached_prefixes=len(self._caches.get(model, ())),
+            ))
+        return results
+
+def simulate_prefix_cache(
+    trace: Iterable[PromptTraceEntry],
+    policy_overrides: Optional[Dict[str, CachePolicyOverride]] = None
+) -> List[ModelCacheStats]:
+    """Replay a time-ordered prompt trace and return per-model cached-token fractions"""
+    simulator = PrefixCacheSimulator({
+        model: override.model_dump() for model, override in (policy_overrides or {}).items()
+    })
+    for entry in trace:
+        if entry.prompt is None and entry.token_ids is None:
+            raise HTTPException(status_code=400, detail="Each trace entry needs either 'prompt' or 'token_ids'")
+        simulator.process(entry.model, entry.timestamp, entry.prompt, entry.token_ids)
+    return simulator.results()
+
+async def build_simulation_response(
+    stats: List[ModelCacheStats],
+    calculation: Optional[CostCalculatorRequest]
+) -> CacheSimulationResponse:
+    """Summarise simulator output and optionally price a calculation with the simulated rates"""
+    total_input = sum(s.input_tokens for s in stats)
+    cache_hit_rates = {s.model: s.cached_token_fraction for s in stats}
+
+    calculation_response = None
+    if calculation is not None:
+        calculation = calculation.model_copy(update={"cache_hit_rates": cache_hit_rates})
+        calculation_response = await calculate_costs(calculation)
+
+    return CacheSimulationResponse(
+        models=stats,
+        total_prompts=sum(s.prompts for s in stats),
+        overall_cached_token_fraction=sum(s.cached_tokens for s in stats) / total_input if total_input > 0 else 0.0,
+        cache_hit_rates=cache_hit_rates,
+        calculation=calculation_response
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/cache-simulator/simulate", response_model=CacheSimulationResponse)
+async def simulate_cache_endpoint(params: CacheSimulationRequest):
+    """Derive per-model cache hit rates from a prompt trace (JSON body)"""
+    trace = sorted(params.prompts, key=lambda entry: entry.timestamp)
+    stats = await run_in_threadpool(simulate_prefix_cache, trace, params.policy_overrides)
+    return await build_simulation_response(stats, params.calculation)
+
+@router.post("/cache-simulator/simulate-file", response_model=CacheSimulationResponse)
+async def simulate_cache_file_endpoint(
+    trace_file: UploadFile = File(..., description="JSONL trace, one PromptTraceEntry per line, in time order"),
+    calculation: Optional[str] = Form(default=None, description="Optional CostCalculatorRequest as JSON")
+):
+    """Derive per-model cache hit rates from a large JSONL prompt trace (streamed)"""
+    def read_trace():
+        for line_number, line in enumerate(trace_file.file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield PromptTraceEntry(**json.loads(line))
+            except (ValueError, TypeError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid trace entry on line {line_number}: {e}")
+
+    try:
+        calculation_request = CostCalculatorRequest(**json.loads(calculation)) if calculation else None
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid calculation: {e}")
+    # Replay (and read the spooled upload) in the threadpool, not on the event loop
+    stats = await run_in_threadpool(simulate_prefix_cache, read_trace())
+    return await build_simulation_response(stats, calculation_request)
@@ -0,0 +1,213 @@
+import math
+from typing import Dict, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.config.service_tiers import LLM_LATENCY_PROFILES, get_tier_config, get_model_category
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    CostCalculatorResponse,
+    apply_service_tier_config,
+    get_agent_infrastructure,
+    calculate_infrastructure_costs,
+    calculate_costs,
+)
+
+# Wait-time percentile used for the latency target
+WAIT_PERCENTILE = 0.95
+
+# Upper bound on the node search
+MAX_PLANNED_NODES = 2000
+
+# ===========================
+# MODELS
+# ===========================
+
+class CapacityPlanRequest(BaseModel):
+    calculation: CostCalculatorRequest = Field(default=CostCalculatorRequest())
+    concurrent_users: Optional[int] = Field(
+        default=None, ge=1,
+        description="Users active at peak; defaults to min(num_users, tier max_concurrent_users)"
+    )
+    active_hours_per_user_per_month: float = Field(
+        default=44.0, gt=0,
+        description="Hours a user is active per month; spreads queries_per_user_per_month over active time"
+    )
+    requests_per_node: int = Field(default=32, ge=1, description="Requests one AKS node serves concurrently")
+    service_time_cv: float = Field(
+        default=1.0, ge=0.0,
+        description="Coefficient of variation of each model's service time (1.0 = exponential, M/M/c)"
+    )
+    target_p95_wait_seconds: float = Field(default=2.0, ge=0.0)
+    target_utilization: float = Field(default=0.7, gt=0.0, lt=1.0)
+
+class QueueMetrics(BaseModel):
+    nodes: int
+    servers: int
+    utilization: float
+    probability_of_waiting: Optional[float]
+    expected_queueing_delay_seconds: Optional[float]
+    p95_queueing_delay_seconds: Optional[float]
+    expected_response_time_seconds: Optional[float]
+    stable: bool
+
+class CapacityPlanResponse(BaseModel):
+    service_tier: str
+    concurrent_users: int
+    arrival_rate_per_second: float
+    mean_service_time_seconds: float
+    service_time_scv: float
+    offered_load_erlangs: float
+    service_time_by_model: Dict[str, float]
+    configured: QueueMetrics
+    planned: QueueMetrics
+    configured_infrastructure_cost: float
+    planned_infrastructure_cost: float
+    calculation: CostCalculatorResponse
+
+# ===========================
+# QUEUEING MODEL
+# ===========================
+
+def model_service_time(model: str, input_tokens: float, output_tokens: float) -> float:
+    """Seconds one request holds a serving slot: first token + prefill + generation"""
+    latency = LLM_LATENCY_PROFILES[get_model_category(model)]
+    return (
+        latency["time_to_first_token"]
+        + input_tokens / latency["prefill_tokens_per_second"]
+        + output_tokens / latency["output_tokens_per_second"]
+    )
+
+def erlang_c(servers: np.ndarray, offered_load: float) -> np.ndarray:
+    """
+    Probability an arrival waits in an M/M/c queue, for each server count.
+    Uses the stable Erlang B recursion B(k) = a·B(k-1) / (k + a·B(k-1)).
+    """
+    blocking = np.empty(int(servers.max()) + 1)
+    blocking[0] = 1.0
+    for k in range(1, len(blocking)):
+        blocking[k] = offered_load * blocking[k - 1] / (k + offered_load * blocking[k - 1])
+
+    b = blocking[servers]
+    rho = offered_load / servers
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = b / (1 - rho * (1 - b))
+    return np.where(rho < 1, c, 1.0)
+
+def queue_metrics(nodes: np.ndarray, params: CapacityPlanRequest, arrival_rate: float,
+                  service_time: float, scv: float) -> Dict[str, np.ndarray]:
+    """
+    Waiting-time metrics for a range of node counts (M/G/c via the
+    Allen-Cunneen correction (1 + SCV) / 2 on the M/M/c waiting time)
+    """
+    servers = np.maximum(nodes * params.requests_per_node, 1)
+    offered_load = arrival_rate * service_time
+    utilization = offered_load / servers
+    stable = utilization < 1
+
+    p_wait = erlang_c(servers, offered_load)
+    correction = (1 + scv) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drain_rate = servers / service_time - arrival_rate  # cμ - λ
+        mean_wait = np.where(stable, p_wait / drain_rate * correction, np.inf)
+        # P(W > t) = C·exp(-(cμ - λ)t)
+        tail = np.log(np.maximum(p_wait, 1e-300) / (1 - WAIT_PERCENTILE)) / drain_rate
+        p95_wait = np.where(stable, np.maximum(tail, 0.0) * correction, np.inf)
+
+    return {
+        "servers": servers,
+        "utilization": utilization,
+        "stable": stable,
+        "p_wait": np.where(stable, p_wait, 1.0),
+        "mean_wait": mean_wait,
+        "p95_wait": p95_wait,
+    }
+
+def _metrics_at(metrics: Dict[str, np.ndarray], i: int, nodes: int, service_time: float) -> QueueMetrics:
+    stable = bool(metrics["stable"][i])
+    return QueueMetrics(
+        nodes=nodes,
+        servers=int(metrics["servers"][i]),
+        utilization=float(metrics["utilization"][i]),
+        probability_of_waiting=float(metrics["p_wait"][i]) if stable else None,
+        expected_queueing_delay_seconds=float(metrics["mean_wait"][i]) if stable else None,
+        p95_queueing_delay_seconds=float(metrics["p95_wait"][i]) if stable else None,
+        expected_response_time_seconds=service_time + float(metrics["mean_wait"][i]) if stable else None,
+        stable=stable,
+    )
+
+async def plan_capacity(params: CapacityPlanRequest) -> CapacityPlanResponse:
+    """Size AKS nodes for a tier's peak load with an M/G/c model and price the result"""
+    calc = apply_service_tier_config(params.calculation.model_copy(deep=True))
+    tier = calc.service_tier.lower()
+    limits = get_tier_config(tier).get("limits", {})
+
+    concurrent_users = params.concurrent_users or min(calc.num_users, limits.get("max_concurrent_users", calc.num_users))
+    arrival_rate = concurrent_users * calc.queries_per_user_per_month / params.active_hours_per_user_per_month / 3600
+
+    # Service time: mixture over the LLM mix, each model with the given variability
+    total_share = sum(p for p in calc.llm_mix.values() if p > 0)
+    if total_share <= 0:
+        raise HTTPException(status_code=400, detail="llm_mix must contain at least one model with a positive share")
+    shares = {m: p / total_share for m, p in calc.llm_mix.items() if p > 0}
+    times = {m: model_service_time(m, calc.avg_input_tokens, calc.avg_output_tokens) for m in shares}
+    service_time = sum(shares[m] * times[m] for m in shares)
+    second_moment = sum(shares[m] * times[m] ** 2 * (1 + params.service_time_cv ** 2) for m in shares)
+    scv = second_moment / service_time ** 2 - 1
+    offered_load = arrival_rate * service_time
+
+    # Smallest node count meeting both the utilization and p95 wait targets
+    min_nodes = max(1, math.ceil(offered_load / (params.requests_per_node * params.target_utilization)))
+    candidates = np.arange(min_nodes, min(min_nodes * 2 + 64, MAX_PLANNED_NODES) + 1)
+    metrics = queue_metrics(candidates, params, arrival_rate, service_time, scv) if len(candidates) else None
+    meets = np.flatnonzero(metrics["p95_wait"] <= params.target_p95_wait_seconds) if metrics else []
+    if len(meets) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No node count up to {MAX_PLANNED_NODES} meets a p95 wait of {params.target_p95_wait_seconds}s"
+        )
+    planned_nodes = int(candidates[meets[0]])
+    planned = _metrics_at(metrics, meets[0], planned_nodes, service_time)
+
+    infra = get_agent_infrastructure(calc.agent_type, tier, calc.infrastructure_scale, calc.custom_infrastructure)
+    configured_nodes = max(int(math.ceil(infra["aks_nodes"])), 1)
+    configured = _metrics_at(
+        queue_metrics(np.array([configured_nodes]), params, arrival_rate, service_time, scv),
+        0, configured_nodes, service_time
+    )
+
+    configured_cost, _ = calculate_infrastructure_costs(infra, calc.use_reserved_instances)
+    planned_infra = {**infra, "aks_nodes": planned_nodes}
+    planned_cost, _ = calculate_infrastructure_costs(planned_infra, calc.use_reserved_instances)
+
+    # Full calculation with the planned node count (overrides are given at scale 1.0)
+    custom = {**(calc.custom_infrastructure or {}), "aks_nodes": planned_nodes / calc.infrastructure_scale}
+    calculation = await calculate_costs(params.calculation.model_copy(update={"custom_infrastructure": custom}))
+
+    return CapacityPlanResponse(
+        service_tier=tier,
+        concurrent_users=concurrent_users,
+        arrival_rate_per_second=arrival_rate,
+        mean_service_time_seconds=service_time,
+        service_time_scv=scv,
+        offered_load_erlangs=offered_load,
+        service_time_by_model=times,
+        configured=configured,
+        planned=planned,
+        configured_infrastructure_cost=configured_cost,
+        planned_infrastructure_cost=planned_cost,
+        calculation=calculation,
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/capacity/plan", response_model=CapacityPlanResponse)
+async def plan_capacity_endpoint(params: CapacityPlanRequest):
+    """Node count for a target p95 queueing delay and utilization, with the resulting costs"""
+    return await plan_capacity(params)
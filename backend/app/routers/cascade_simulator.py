@@ -0,0 +1,239 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.routers.capacity_planner import model_service_time
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    api_call_cost,
+    apply_service_tier_config,
+    calculate_llm_costs,
+    get_tenant_pricing,
+    llm_pricing_as_of,
+)
+
+# Latency quantiles reported for cascades and flat mixes
+LATENCY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Upper bound on escalation-rate combinations in one sweep
+MAX_SWEEP_POINTS = 10000
+
+# ===========================
+# MODELS
+# ===========================
+
+class CascadeStage(BaseModel):
+    """One model of the chain; a query escalates to the next stage with escalation_probability"""
+    model: str
+    escalation_probability: float = Field(default=0.0, ge=0.0, le=1.0)
+    escalation_range: Optional[Tuple[float, float]] = Field(
+        default=None,
+        description="Escalation probabilities to sweep (min, max) instead of the single value"
+    )
+    input_token_overhead: int = Field(default=0, ge=0, description="Extra input tokens per call (e.g. confidence/judge prompt)")
+    output_token_overhead: int = Field(default=0, ge=0, description="Extra output tokens per call (e.g. confidence score)")
+    include_previous_output: bool = Field(
+        default=False,
+        description="Escalated calls also read the previous stage's answer as input"
+    )
+
+class CascadeRequest(BaseModel):
+    calculation: CostCalculatorRequest = Field(
+        default=CostCalculatorRequest(),
+        description="Usage profile; its (tier) llm_mix is the flat mix the cascade is compared with"
+    )
+    stages: List[CascadeStage] = Field(..., min_length=1)
+    sweep_points: int = Field(default=21, ge=2, le=201, description="Points per swept escalation range")
+
+class LatencyDistribution(BaseModel):
+    expected_seconds: float
+    quantiles_seconds: Dict[str, float]
+    outcomes: List[Tuple[float, float]] = Field(description="(latency seconds, probability) of each way a query can finish")
+
+class CascadeStageResult(BaseModel):
+    model: str
+    reach_probability: float
+    exit_probability: float
+    cost_per_call: float
+    latency_seconds: float
+
+class RoutingResult(BaseModel):
+    cost_per_query: float
+    monthly_cost: float
+    latency: LatencyDistribution
+
+class CascadeSweepPoint(BaseModel):
+    escalation_probabilities: List[float]
+    cost_per_query: float
+    monthly_cost: float
+    savings_vs_flat_percent: float
+    expected_latency_seconds: float
+    quantiles_seconds: Dict[str, float]
+
+class CascadeResponse(BaseModel):
+    total_queries: int
+    cascade: RoutingResult
+    stages: List[CascadeStageResult]
+    flat_mix: RoutingResult
+    sweep: List[CascadeSweepPoint]
+
+# ===========================
+# CASCADE MODEL
+# ===========================
+
+def cascade_outcomes(escalation: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Probability of reaching and of finishing at every stage, for a batch of
+    escalation-probability vectors (points × stages; the last stage never escalates)
+    """
+    escalation = escalation.copy()
+    escalation[:, -1] = 0.0
+    reach = np.ones_like(escalation)
+    reach[:, 1:] = np.cumprod(escalation[:, :-1], axis=1)
+    return reach, reach * (1 - escalation)
+
+def latency_quantiles(latencies: np.ndarray, probabilities: np.ndarray) -> np.ndarray:
+    """Quantiles (points × LATENCY_QUANTILES) of discrete latency distributions (points × outcomes)"""
+    order = np.argsort(latencies)
+    sorted_latency = latencies[order]
+    cumulative = np.cumsum(probabilities[:, order], axis=1)
+    result = np.empty((probabilities.shape[0], len(LATENCY_QUANTILES)))
+    for j, q in enumerate(LATENCY_QUANTILES):
+        result[:, j] = sorted_latency[np.argmax(cumulative >= q - 1e-12, axis=1)]
+    return result
+
+def _quantile_dict(row: np.ndarray) -> Dict[str, float]:
+    return {f"p{round(q * 100)}": float(value) for q, value in zip(LATENCY_QUANTILES, row)}
+
+def _distribution(latencies: np.ndarray, probabilities: np.ndarray) -> LatencyDistribution:
+    return LatencyDistribution(
+        expected_seconds=float(probabilities @ latencies),
+        quantiles_seconds=_quantile_dict(latency_quantiles(latencies, probabilities[None, :])[0]),
+        outcomes=[(float(t), float(p)) for t, p in zip(latencies, probabilities) if p > 0],
+    )
+
+def simulate_cascade(payload: CascadeRequest) -> CascadeResponse:
+    """
+    A query starts at the first stage and moves on with that stage's
+    escalation probability, paying every call on its way. Latency adds up
+    over the calls, so the distribution has one outcome per exit stage.
+    Cost and latency are evaluated at once over the grid of all swept
+    escalation ranges, and compared with the request's flat llm_mix.
+    """
+    tenant_pricing = get_tenant_pricing(payload.calculation.tenant)
+    params = apply_service_tier_config(payload.calculation.model_copy(deep=True), tenant_pricing)
+    if params.deployment_type != "cloud_api":
+        raise HTTPException(status_code=400, detail="Cascades are priced for cloud_api deployments")
+    stages = payload.stages
+    if stages[-1].escalation_probability > 0 or stages[-1].escalation_range:
+        raise HTTPException(status_code=400, detail="The last stage of a cascade cannot escalate")
+    if any(s.escalation_range and not 0.0 <= s.escalation_range[0] <= s.escalation_range[1] <= 1.0 for s in stages):
+        raise HTTPException(status_code=400, detail="Escalation ranges must satisfy 0 <= min <= max <= 1")
+    llm_pricing, _ = llm_pricing_as_of(params.as_of, tenant_pricing)
+    unknown = [s.model for s in stages if s.model not in llm_pricing]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No token rates for cascade models {unknown}. Available: {list(llm_pricing)}"
+        )
+    mix = {model: share for model, share in params.llm_mix.items() if share > 0}
+    if not mix:
+        raise HTTPException(status_code=400, detail="The flat llm_mix needs at least one model with a positive share")
+
+    # Per-call tokens, cost and latency of each stage
+    costs, latencies = np.empty(len(stages)), np.empty(len(stages))
+    for i, stage in enumerate(stages):
+        input_tokens = params.avg_input_tokens + stage.input_token_overhead
+        if stage.include_previous_output and i > 0:
+            input_tokens += params.avg_output_tokens + stages[i - 1].output_token_overhead
+        output_tokens = params.avg_output_tokens + stage.output_token_overhead
+        cache_hit_rate = (params.cache_hit_rates or {}).get(stage.model, params.cache_hit_rate)
+        costs[i] = api_call_cost(
+            stage.model, input_tokens, output_tokens, cache_hit_rate, params.use_prompt_caching, params.as_of, tenant_pricing
+        )
+        latencies[i] = model_service_time(stage.model, input_tokens, output_tokens)
+    exit_latency = np.cumsum(latencies)
+
+    # Flat mix: each query goes to one model
+    total_queries = params.num_users * params.queries_per_user_per_month
+    flat_monthly, _ = calculate_llm_costs(
+        params.llm_mix, total_queries, params.avg_input_tokens, params.avg_output_tokens,
+        params.cache_hit_rate, params.use_prompt_caching, cache_hit_rates=params.cache_hit_rates,
+        as_of=params.as_of, tenant_pricing=tenant_pricing
+    )
+    flat_share = np.array(list(mix.values())) / sum(mix.values())
+    flat_latency = np.array([
+        model_service_time(model, params.avg_input_tokens, params.avg_output_tokens) for model in mix
+    ])
+    flat = RoutingResult(
+        cost_per_query=flat_monthly / total_queries,
+        monthly_cost=flat_monthly,
+        latency=_distribution(flat_latency, flat_share),
+    )
+
+    # The configured cascade
+    reach, exits = cascade_outcomes(np.array([[s.escalation_probability for s in stages]]))
+    cost_per_query = float(reach[0] @ costs)
+    cascade = RoutingResult(
+        cost_per_query=cost_per_query,
+        monthly_cost=cost_per_query * total_queries,
+        latency=_distribution(exit_latency, exits[0]),
+    )
+
+    # Sweep: cartesian grid over every stage with an escalation range
+    axes = [
+        np.linspace(*s.escalation_range, payload.sweep_points) if s.escalation_range else np.array([s.escalation_probability])
+        for s in stages
+    ]
+    grid_size = int(np.prod([len(axis) for axis in axes]))
+    if grid_size > MAX_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {grid_size:,} points (max {MAX_SWEEP_POINTS:,}); use fewer ranges or sweep_points"
+        )
+    sweep = []
+    if any(s.escalation_range for s in stages):
+        grid = np.stack([g.ravel() for g in np.meshgrid(*axes, indexing="ij")], axis=1)
+        grid_reach, grid_exits = cascade_outcomes(grid)
+        grid_cost = grid_reach @ costs
+        grid_latency = grid_exits @ exit_latency
+        grid_quantiles = latency_quantiles(exit_latency, grid_exits)
+        for k in range(grid_size):
+            sweep.append(CascadeSweepPoint(
+                escalation_probabilities=grid[k].tolist(),
+                cost_per_query=grid_cost[k],
+                monthly_cost=grid_cost[k] * total_queries,
+                savings_vs_flat_percent=(1 - grid_cost[k] / flat.cost_per_query) * 100 if flat.cost_per_query else 0.0,
+                expected_latency_seconds=grid_latency[k],
+                quantiles_seconds=_quantile_dict(grid_quantiles[k]),
+            ))
+
+    return CascadeResponse(
+        total_queries=total_queries,
+        cascade=cascade,
+        stages=[
+            CascadeStageResult(
+                model=stage.model,
+                reach_probability=reach[0][i],
+                exit_probability=exits[0][i],
+                cost_per_call=costs[i],
+                latency_seconds=latencies[i],
+            )
+            for i, stage in enumerate(stages)
+        ],
+        flat_mix=flat,
+        sweep=sweep,
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/cascade/simulate", response_model=CascadeResponse)
+def simulate_cascade_endpoint(payload: CascadeRequest):
+    """Expected cost, expected and tail latency of a model cascade, next to the flat llm_mix"""
+    return simulate_cascade(payload)
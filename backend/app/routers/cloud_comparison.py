@@ -0,0 +1,229 @@
+import math
+from typing import List, Dict, Optional, Any
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.config.service_tiers import get_tier_config
+from app.config.cloud_pricing import CLOUD_PROVIDERS, COMMITMENT_TERMS
+from app.pricing.catalog import get_pricing_catalog
+from app.routers.cost_calculator_v2 import (
+    CostBreakdown,
+    get_agent_infrastructure,
+    calculate_infrastructure_costs,
+)
+
+HOURS_PER_MONTH = 730
+
+# Rate cards of pricing.yaml, from the shared pricing catalog
+CLOUD_RATE_CARDS = get_pricing_catalog().cloud_rate_cards()
+
+# Node shapes priced by calculate_infrastructure_costs, matched on every cloud
+# - aks_nodes: Standard_D16s_v5 (16 vCPU, 64 GB)
+# - gpu_nodes: Standard_NC6s_v3 (1 GPU)
+REFERENCE_NODE_SHAPES = {
+    "aks_nodes": {"vcpus": 16, "memory_gb": 64, "gpus": 0},
+    "gpu_nodes": {"vcpus": 0, "memory_gb": 0, "gpus": 1},
+}
+
+# Equivalents may combine several smaller instances, up to this many per node
+MAX_INSTANCES_PER_NODE = 4
+
+# Line items of the vectorized evaluation: (label, unit, billing multiplier, node shape)
+LINE_ITEMS = (
+    ("AKS Nodes", "nodes", HOURS_PER_MONTH, "aks_nodes"),
+    ("GPU Nodes", "nodes", HOURS_PER_MONTH, "gpu_nodes"),
+    ("SQL Database", "vCores", HOURS_PER_MONTH, None),
+    ("Hot Storage", "GB", 1, None),
+    ("Cool Storage", "GB", 1, None),
+)
+
+# ===========================
+# MODELS
+# ===========================
+
+class CloudComparisonScenario(BaseModel):
+    service_tier: str = Field(default="standard")
+    infrastructure_scale: float = Field(default=1.0, ge=0.1, le=5.0)
+    gpu_nodes: Optional[float] = Field(default=None, ge=0, description="Override GPU node count (tiers define none)")
+
+class CloudComparisonRequest(BaseModel):
+    agent_type: str = Field(default="sales-coach")
+    scenarios: List[CloudComparisonScenario] = Field(default=[CloudComparisonScenario()])
+    providers: List[str] = Field(default=list(CLOUD_PROVIDERS))
+    commitments: List[str] = Field(default=list(COMMITMENT_TERMS))
+    top_n: Optional[int] = Field(default=None, ge=1, description="Return only the N cheapest options per scenario")
+
+class CloudOption(BaseModel):
+    provider: str
+    region: str
+    commitment: str
+    monthly_cost: float
+    annual_cost: float
+    savings_vs_baseline: float
+    sku_mapping: Dict[str, str]
+    breakdown: List[CostBreakdown]
+
+class ScenarioComparison(BaseModel):
+    scenario: CloudComparisonScenario
+    infrastructure: Dict[str, float]
+    baseline_monthly_cost: float
+    baseline_description: str
+    cheapest: Optional[CloudOption]
+    options: List[CloudOption]
+
+class CloudComparisonResponse(BaseModel):
+    scenarios: List[ScenarioComparison]
+
+# ===========================
+# SKU MAPPING & RATE MATRIX
+# ===========================
+
+def match_sku(card: Dict[str, Any], shape: Dict[str, int], term: str) -> Optional[Dict[str, Any]]:
+    """Cheapest SKU (and instance count) on a rate card covering one reference node"""
+    best = None
+    for sku in card["compute"]:
+        rate = sku["rates"].get(term)
+        if rate is None or (shape["gpus"] > 0) != (sku["gpus"] > 0):
+            continue
+        count = max(
+            math.ceil(shape["vcpus"] / sku["vcpus"]) if shape["vcpus"] else 1,
+            math.ceil(shape["memory_gb"] / sku["memory_gb"]) if shape["memory_gb"] else 1,
+            math.ceil(shape["gpus"] / sku["gpus"]) if shape["gpus"] else 1,
+        )
+        if count > MAX_INSTANCES_PER_NODE:
+            continue
+        # Ties go to the SKU needing fewer instances
+        if best is None or (count * rate, count) < (best["node_hourly"], best["count"]):
+            best = {"sku": sku["sku"], "count": count, "node_hourly": count * rate}
+    return best
+
+def build_rate_matrix(providers: List[str], commitments: List[str]) -> tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    One row per (provider, region, commitment) option, one column per LINE_ITEMS
+    entry, in AUD per billing unit. Unavailable rates are NaN.
+    """
+    options, rows = [], []
+    for card in CLOUD_RATE_CARDS:
+        if card["provider"] not in providers:
+            continue
+        for term in commitments:
+            skus = {name: match_sku(card, shape, term) for name, shape in REFERENCE_NODE_SHAPES.items()}
+            options.append({"card": card, "commitment": term, "skus": skus})
+            rows.append([
+                skus["aks_nodes"]["node_hourly"] if skus["aks_nodes"] else np.nan,
+                skus["gpu_nodes"]["node_hourly"] if skus["gpu_nodes"] else np.nan,
+                card["sql_vcore_hourly"] if card["sql_vcore_hourly"] is not None else np.nan,
+                card["storage_gb_month"]["hot"] if card["storage_gb_month"]["hot"] is not None else np.nan,
+                card["storage_gb_month"]["cool"] if card["storage_gb_month"]["cool"] is not None else np.nan,
+            ])
+    return options, np.array(rows, dtype=np.float64).reshape(len(rows), len(LINE_ITEMS))
+
+def compare_clouds(params: CloudComparisonRequest) -> CloudComparisonResponse:
+    """Price every scenario on every provider/region/commitment in one matrix evaluation"""
+    unknown = [p for p in params.providers if p not in CLOUD_PROVIDERS]
+    unknown += [c for c in params.commitments if c not in COMMITMENT_TERMS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown providers/commitments {unknown}. Available: {list(CLOUD_PROVIDERS)} / {list(COMMITMENT_TERMS)}"
+        )
+
+    options, rates = build_rate_matrix(params.providers, params.commitments)
+
+    infras = []
+    for scenario in params.scenarios:
+        custom = {"gpu_nodes": scenario.gpu_nodes} if scenario.gpu_nodes is not None else None
+        # Overrides are given at scale 1.0, like tier values
+        infras.append(get_agent_infrastructure(params.agent_type, scenario.service_tier, scenario.infrastructure_scale, custom))
+
+    # Billing quantities per scenario: (scenarios, line items)
+    quantities = np.array([
+        [infra["aks_nodes"], infra["gpu_nodes"], infra["sql_vcores"], infra["storage_hot_tb"] * 1024, infra["storage_cool_tb"] * 1024]
+        for infra in infras
+    ], dtype=np.float64) * np.array([item[2] for item in LINE_ITEMS])
+
+    # (scenarios, options, line items); a missing rate only matters if the quantity is used
+    line_costs = np.where(quantities[:, None, :] > 0, quantities[:, None, :] * rates[None, :, :], 0.0)
+    totals = line_costs.sum(axis=2)
+
+    comparisons = []
+    for s, (scenario, infra) in enumerate(zip(params.scenarios, infras)):
+        use_reserved = get_tier_config(scenario.service_tier)["features"].get("use_reserved_instances", False)
+        baseline, _ = calculate_infrastructure_costs(infra, use_reserved)
+
+        ranked = [o for o in np.argsort(totals[s], kind="stable") if not np.isnan(totals[s, o])]
+        if params.top_n:
+            ranked = ranked[:params.top_n]
+
+        scenario_options = []
+        for o in ranked:
+            option = options[o]
+            card = option["card"]
+            sku_mapping = {
+                shape: f"{option['skus'][shape]['sku']} × {option['skus'][shape]['count']} per node"
+                for i, (_, _, _, shape) in enumerate(LINE_ITEMS)
+                if shape and quantities[s, i] > 0
+            }
+            breakdown = []
+            for i, (label, unit, multiplier, shape) in enumerate(LINE_ITEMS):
+                if quantities[s, i] <= 0:
+                    continue
+                sku = option["skus"].get(shape) if shape else None
+                breakdown.append(CostBreakdown(
+                    category="Infrastructure",
+                    subcategory=label,
+                    monthly_cost=float(line_costs[s, o, i]),
+                    annual_cost=float(line_costs[s, o, i]) * 12,
+                    unit=unit,
+                    quantity=float(quantities[s, i] / multiplier),
+                    notes=f"{card['provider']} {card['region']} ({option['commitment']})"
+                          + (f": {sku['sku']} × {sku['count']} per node" if sku else ""),
+                    calculation_formula=f"{quantities[s, i] / multiplier:,.2f} {unit} × ${rates[o, i]:.4f}"
+                                        + (" × 730 hours" if multiplier == HOURS_PER_MONTH else "")
+                                        + f" = ${line_costs[s, o, i]:,.2f}/month"
+                ))
+
+            scenario_options.append(CloudOption(
+                provider=card["provider"],
+                region=card["region"],
+                commitment=option["commitment"],
+                monthly_cost=float(totals[s, o]),
+                annual_cost=float(totals[s, o]) * 12,
+                savings_vs_baseline=baseline - float(totals[s, o]),
+                sku_mapping=sku_mapping,
+                breakdown=breakdown,
+            ))
+
+        comparisons.append(ScenarioComparison(
+            scenario=scenario,
+            infrastructure=infra,
+            baseline_monthly_cost=baseline,
+            baseline_description=f"calculate_infrastructure_costs (Azure Sydney, {'reserved_1yr' if use_reserved else 'payg'})",
+            cheapest=scenario_options[0] if scenario_options else None,
+            options=scenario_options,
+        ))
+
+    return CloudComparisonResponse(scenarios=comparisons)
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/infrastructure/compare", response_model=CloudComparisonResponse)
+def compare_clouds_endpoint(params: CloudComparisonRequest):
+    """Rank Azure, AWS and GCP options for one or more tier infrastructure scenarios"""
+    return compare_clouds(params)
+
+@router.get("/infrastructure/cheapest", response_model=ScenarioComparison)
+async def cheapest_cloud_endpoint(
+    service_tier: str = "standard",
+    infrastructure_scale: float = Query(default=1.0, ge=0.1, le=5.0),
+    gpu_nodes: Optional[float] = Query(default=None, ge=0)
+):
+    """Cheapest provider/region/commitment for a single scenario"""
+    scenario = CloudComparisonScenario(service_tier=service_tier, infrastructure_scale=infrastructure_scale, gpu_nodes=gpu_nodes)
+    return compare_clouds(CloudComparisonRequest(scenarios=[scenario], top_n=1)).scenarios[0]
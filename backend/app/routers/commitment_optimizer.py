@@ -0,0 +1,281 @@
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.routers.cost_calculator_v2 import AZURE_PRICING_SYDNEY
+
+HOURS_PER_MONTH = 730
+
+# Node pools that can be reserved, and their Azure SKU in AZURE_PRICING_SYDNEY
+RESERVABLE_NODE_SKUS = {
+    "aks_nodes": "Standard_D16s_v5",
+    "gpu_nodes": "Standard_NC6s_v3",
+}
+
+# Reservation terms (months); a reservation is billed for its full term
+RESERVATION_TERMS = {
+    "reserved_3yr": 36,
+    "reserved_1yr": 12,
+}
+
+# ===========================
+# MODELS
+# ===========================
+
+class NodeDemandProfile(BaseModel):
+    """Node demand for one pool; give hourly or monthly demand (repeated to fill the horizon)"""
+    hourly_demand: Optional[List[float]] = Field(
+        default=None,
+        description="Nodes needed per hour (e.g. a 168-hour week or 730-hour month, tiled over the horizon)"
+    )
+    monthly_demand: Optional[List[float]] = Field(
+        default=None,
+        description="Nodes needed per month (flat within each month; last value repeats to fill the horizon)"
+    )
+
+class CommitmentOptimizerRequest(BaseModel):
+    horizon_months: int = Field(default=36, ge=1, le=120)
+    demand: Dict[str, NodeDemandProfile] = Field(
+        ...,
+        description=f"Demand per node pool: {', '.join(RESERVABLE_NODE_SKUS)}"
+    )
+
+class ReservationPurchase(BaseModel):
+    month: int
+    term: str
+    nodes: int
+    term_cost: float
+
+class MonthlyCoverage(BaseModel):
+    month: int
+    peak_demand: int
+    reserved_3yr_nodes: int
+    reserved_1yr_nodes: int
+    payg_node_hours: float
+    cost: float
+
+class PoolCommitmentPlan(BaseModel):
+    node_pool: str
+    sku: str
+    optimized_cost: float
+    payg_only_cost: float
+    flat_reserved_1yr_cost: float
+    current_estimated_savings: float
+    optimized_savings_vs_payg: float
+    purchases: List[ReservationPurchase]
+    coverage: List[MonthlyCoverage]
+
+class CommitmentOptimizerResponse(BaseModel):
+    horizon_months: int
+    total_optimized_cost: float
+    total_payg_only_cost: float
+    total_flat_reserved_1yr_cost: float
+    total_current_estimated_savings: float
+    total_optimized_savings_vs_payg: float
+    plans: List[PoolCommitmentPlan]
+
+# ===========================
+# OPTIMIZER
+# ===========================
+
+def demand_matrix(profile: NodeDemandProfile, horizon_months: int) -> np.ndarray:
+    """Integer node demand as a (months, hours per month) matrix"""
+    hours = horizon_months * HOURS_PER_MONTH
+    if profile.hourly_demand:
+        hourly = np.resize(np.asarray(profile.hourly_demand, dtype=np.float64), hours)
+    elif profile.monthly_demand:
+        monthly = np.asarray(profile.monthly_demand[:horizon_months], dtype=np.float64)
+        monthly = np.concatenate((monthly, np.full(horizon_months - len(monthly), monthly[-1])))
+        hourly = np.repeat(monthly, HOURS_PER_MONTH)
+    else:
+        raise HTTPException(status_code=400, detail="Each demand profile needs hourly_demand or monthly_demand")
+    if (hourly < 0).any():
+        raise HTTPException(status_code=400, detail="Node demand cannot be negative")
+    return np.ceil(hourly).astype(np.int64).reshape(horizon_months, HOURS_PER_MONTH)
+
+def layer_hours(demand: np.ndarray) -> np.ndarray:
+    """
+    Hours per month in which at least k nodes are needed, for k = 1..peak.
+    Returns a (peak, months) matrix.
+    """
+    peak = int(demand.max())
+    counts = np.stack([np.bincount(month, minlength=peak + 1) for month in demand])  # (months, peak + 1)
+    at_least = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]  # hours with demand >= k
+    return at_least[:, 1:].T.astype(np.float64)
+
+def _plan_reservations(usage: np.ndarray, payg_rate: float, term_months: List[int],
+                       term_costs: List[float]) -> Tuple[List[Dict[int, int]], np.ndarray]:
+    """
+    Exact reservation plan as a min-cost flow over month boundaries 0..months.
+
+    Each of the peak units of flow walks from month 0 to the horizon, one month
+    at a time as an uncovered layer (paying that layer's pay-as-you-go hours,
+    the least-used uncovered layer first) or across a whole reservation term at
+    the term's cost; reserved nodes in a month = units crossing it on a
+    reservation. Interval arcs keep the LP integral, so successive shortest
+    paths give the optimal start counts. Returns the starts per month for each
+    term and the uncovered layers per month.
+    """
+    layers, months = usage.shape
+    layer_cost = usage * payg_rate
+    # Runs of layers with equal usage can be (un)covered together
+    run_down = np.ones((layers, months), dtype=np.int64)  # layers j <= k with the usage of layer k
+    run_up = np.ones((layers, months), dtype=np.int64)  # layers j >= k with the usage of layer k
+    for k in range(1, layers):
+        same = usage[k] == usage[k - 1]
+        run_down[k] += np.where(same, run_down[k - 1], 0)
+    for k in range(layers - 2, -1, -1):
+        same = usage[k] == usage[k + 1]
+        run_up[k] += np.where(same, run_up[k + 1], 0)
+
+    uncovered = np.zeros(months, dtype=np.int64)
+    starts = [dict() for _ in term_months]
+    sent = 0
+    while sent < layers:
+        # Residual arcs: (from, to, cost, capacity, (term or -1, month, direction))
+        arcs = []
+        for t in range(months):
+            g = int(uncovered[t])
+            if g < layers:
+                k = layers - 1 - g
+                arcs.append((t, t + 1, layer_cost[k, t], int(run_down[k, t]), (-1, t, 1)))
+            if g > 0:
+                k = layers - g
+                arcs.append((t + 1, t, -layer_cost[k, t], int(run_up[k, t]), (-1, t, -1)))
+            for i, (length, cost) in enumerate(zip(term_months, term_costs)):
+                end = min(t + length, months)
+                arcs.append((t, end, cost, layers, (i, t, 1)))
+                if starts[i].get(t):
+                    arcs.append((end, t, -cost, starts[i][t], (i, t, -1)))
+
+        # Bellman-Ford (backward arcs have negative costs, but no negative cycles)
+        dist = [np.inf] * (months + 1)
+        via = [None] * (months + 1)
+        dist[0] = 0.0
+        for _ in range(months + 1):
+            changed = False
+            for arc in arcs:
+                u, v, cost = arc[0], arc[1], arc[2]
+                if dist[u] + cost < dist[v] - 1e-9:
+                    dist[v] = dist[u] + cost
+                    via[v] = arc
+                    changed = True
+            if not changed:
+                break
+
+        path = []
+        node = months
+        while node != 0:
+            path.append(via[node])
+            node = via[node][0]
+        amount = min([layers - sent] + [arc[3] for arc in path])
+        for _, _, _, _, (i, t, direction) in path:
+            if i < 0:
+                uncovered[t] += direction * amount
+            else:
+                starts[i][t] = starts[i].get(t, 0) + direction * amount
+        sent += amount
+
+    return [{t: n for t, n in term_starts.items() if n} for term_starts in starts], uncovered
+
+def optimize_commitments(node_pool: str, demand: np.ndarray) -> PoolCommitmentPlan:
+    """
+    Cost-minimizing mix of 3-year, 1-year and pay-as-you-go capacity.
+
+    Demand is split into unit layers (layer k = the k-th node), each used in
+    the hours where demand >= k; reserved nodes always cover the lowest layers
+    of a month. A reservation may cover different layers in different months,
+    so layers are planned jointly (see _plan_reservations).
+    """
+    sku = RESERVABLE_NODE_SKUS[node_pool]
+    rates = AZURE_PRICING_SYDNEY["compute"][sku]
+    months = demand.shape[0]
+    usage = layer_hours(demand)  # (layers, months)
+    layers = usage.shape[0]
+
+    terms = list(RESERVATION_TERMS.items())
+    term_costs = [rates[term] * length * HOURS_PER_MONTH for term, length in terms]
+    starts, uncovered = _plan_reservations(usage, rates["payg"], [length for _, length in terms], term_costs)
+
+    # Purchases, monthly coverage and the pay-as-you-go hours of uncovered layers
+    active = {term: np.zeros(months, dtype=np.int64) for term, _ in terms}
+    purchases: Dict[tuple, int] = {}
+    for (term, length), term_starts in zip(terms, starts):
+        for t, count in term_starts.items():
+            purchases[(t, term)] = count
+            active[term][t:t + length] += count
+    payg_hours = np.array([usage[layers - uncovered[t]:, t].sum() for t in range(months)], dtype=np.float64)
+
+    reserved_month_cost = sum(active[term] * rates[term] * HOURS_PER_MONTH for term, _ in terms)
+    monthly_cost = reserved_month_cost + payg_hours * rates["payg"]
+    # Reservation months beyond the horizon are still owed
+    optimized_cost = float(
+        sum(count * cost for term_starts, cost in zip(starts, term_costs) for count in term_starts.values())
+        + payg_hours.sum() * rates["payg"]
+    )
+
+    payg_only = float(demand.sum() * rates["payg"])
+    flat_reserved = float(demand.max() * rates["reserved_1yr"] * HOURS_PER_MONTH * months)
+
+    return PoolCommitmentPlan(
+        node_pool=node_pool,
+        sku=sku,
+        optimized_cost=optimized_cost,
+        payg_only_cost=payg_only,
+        flat_reserved_1yr_cost=flat_reserved,
+        # Same flat estimate as calculate_costs: reserved_savings = infra_total * 0.5
+        current_estimated_savings=flat_reserved * 0.5,
+        optimized_savings_vs_payg=payg_only - optimized_cost,
+        purchases=[
+            ReservationPurchase(
+                month=t,
+                term=term,
+                nodes=count,
+                term_cost=count * rates[term] * RESERVATION_TERMS[term] * HOURS_PER_MONTH
+            )
+            for (t, term), count in sorted(purchases.items())
+        ],
+        coverage=[
+            MonthlyCoverage(
+                month=t,
+                peak_demand=int(demand[t].max()),
+                reserved_3yr_nodes=int(active["reserved_3yr"][t]),
+                reserved_1yr_nodes=int(active["reserved_1yr"][t]),
+                payg_node_hours=float(payg_hours[t]),
+                cost=float(monthly_cost[t]),
+            )
+            for t in range(months)
+        ],
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/infrastructure/commitments/optimize", response_model=CommitmentOptimizerResponse)
+def optimize_commitments_endpoint(params: CommitmentOptimizerRequest):
+    """Choose the cheapest mix of 3-year, 1-year and pay-as-you-go AKS/GPU capacity for a demand profile"""
+    unknown = [pool for pool in params.demand if pool not in RESERVABLE_NODE_SKUS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown node pools {unknown}. Available: {list(RESERVABLE_NODE_SKUS)}"
+        )
+
+    plans = [
+        optimize_commitments(pool, demand_matrix(profile, params.horizon_months))
+        for pool, profile in params.demand.items()
+    ]
+    return CommitmentOptimizerResponse(
+        horizon_months=params.horizon_months,
+        total_optimized_cost=sum(p.optimized_cost for p in plans),
+        total_payg_only_cost=sum(p.payg_only_cost for p in plans),
+        total_flat_reserved_1yr_cost=sum(p.flat_reserved_1yr_cost for p in plans),
+        total_current_estimated_savings=sum(p.current_estimated_savings for p in plans),
+        total_optimized_savings_vs_payg=sum(p.optimized_savings_vs_payg for p in plans),
+        plans=plans
+    )
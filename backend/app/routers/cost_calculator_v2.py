@@ -1,45 +1,53 @@
 import sys
-import os
-
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+import asyncio
+import hashlib
+import math
+
+from fastapi import APIRouter, HTTPException, Response
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, SkipValidation, confloat, field_serializer
+from typing import List, Dict, Optional, Any, Mapping, Tuple
+from datetime import date
 import json
+from functools import lru_cache
 
 # Import service tier configurations
 from app.config.service_tiers import (
     SERVICE_TIERS,
     LLM_CATEGORIES,
-    get_tier_config,
+    GPU_COSTS,
+    MODEL_PRECISION_BYTES,
+    ON_PREMISE_MODEL_SPECS,
     get_llm_models_for_tier,
     get_tier_summary,
     calculate_on_premise_cost
 )
+from app.pricing.cost_expressions import Const, Input, Percent, Rate, CompiledCost, compile_cost
+from app.pricing.catalog import get_pricing_catalog
+from app.pricing.history import LlmRatesByDate, get_pricing_history, history_digest
+from app.pricing.tenants import TenantPricing
+from app.pricing.gpu_packing import GpuFleetPlan, ModelDemand, kv_cache_gb_per_token, plan_gpu_fleet
+
+# Provider batch APIs: discount on token prices (unless a model lists its own
+# batchProcessingDiscount in LLM_Pricing.json), typical turnaround used for
+# routing, and the turnaround the provider commits to
+BATCH_API_PRICING = {
+    "openai": {"discount": 0.5, "typical_turnaround_hours": 4.0, "max_turnaround_hours": 24.0},
+    "anthropic": {"discount": 0.5, "typical_turnaround_hours": 1.0, "max_turnaround_hours": 24.0},
+    "gemini": {"discount": 0.5, "typical_turnaround_hours": 6.0, "max_turnaround_hours": 24.0},
+}
 
-# Load LLM pricing from LLM_Pricing.json
+# LLM pricing from LLM_Pricing.json, read from the shared pricing catalog
 def load_llm_pricing():
-    """Load LLM pricing from LLM_Pricing.json file"""
-    config_path = os.path.join(os.path.dirname(__file__), '../config/LLM_Pricing.json')
-    try:
-        with open(config_path, 'r') as f:
-            data = json.load(f)
-            # Flatten the providers structure to model_id: {input, output, ...}
-            pricing = {}
-            for provider, models in data.get('providers', {}).items():
-                for model_id, model_data in models.items():
-                    pricing[model_id] = {
-                        'input': model_data.get('input', 0.0),
-                        'output': model_data.get('output', 0.0),
-                        'cache_read': model_data.get('cachedInput', 0.0)
-                    }
-            return pricing
-    except Exception as e:
-        print(f"Error loading LLM_Pricing.json: {e}")
-        return {}
-
-# Load pricing on module import
+    """Model ID -> {input, output, cache_read[, provider, batch_discount]} (USD per 1M tokens)"""
+    return get_pricing_catalog().llm_pricing(BATCH_API_PRICING)
+
+# Load pricing on module import (a read-only view over the memory-mapped catalog)
 LLM_PRICING_USD = load_llm_pricing()
 
+# Fallback pricing (USD per 1M tokens) for models missing from LLM_Pricing.json
+DEFAULT_LLM_PRICING_USD = {"input": 2.50, "output": 10.00, "cache_read": 1.25}
+
 # ===========================
 # PRICING CONFIGURATION
 # ===========================
@@ -60,8 +68,11 @@ AZURE_PRICING_SYDNEY = {
         }
     },
     "database": {
-        "cosmosdb_ru_100": 0.008,  # per 100 RU/s per hour
+        "cosmosdb_ru_100": 0.012,  # per 100 RU/s per hour
         "redis_c6": 0.192,  # per hour
+        "redis_premium_c1": 0.096,  # per hour (1GB, memory system)
+        "redis_premium_c6": 0.765,  # per hour (6GB, memory system)
+        "neo4j_node": 0.691,  # per node per hour (Standard_D16s_v5 reserved)
         "sql_standard": 0.192  # per vCore per hour
     },
     "storage": {
@@ -118,10 +129,39 @@ AI_AGENTS = {
     }
 }
 
+def compute_pricing_version() -> str:
+    """Short hash of every pricing table and tier configuration used by calculate_costs"""
+    from app.config.service_tiers import GPU_COSTS, ON_PREMISE_OPEX
+
+    pricing_inputs = {
+        "llm_pricing_usd": dict(LLM_PRICING_USD),
+        "llm_pricing_history": history_digest(),
+        "batch_api_pricing": BATCH_API_PRICING,
+        "default_llm_pricing_usd": DEFAULT_LLM_PRICING_USD,
+        "azure_pricing_sydney": AZURE_PRICING_SYDNEY,
+        "data_source_pricing_usd": DATA_SOURCE_PRICING_USD,
+        "aud_to_usd": AUD_TO_USD,
+        "ai_agents": AI_AGENTS,
+        "service_tiers": SERVICE_TIERS,
+        "gpu_costs": GPU_COSTS,
+        "on_premise_opex": ON_PREMISE_OPEX,
+    }
+    canonical = json.dumps(pricing_inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+# Identifies the pricing a quote was calculated with
+PRICING_VERSION = compute_pricing_version()
+
 # ===========================
 # MODELS
 # ===========================
 
+class AgentLatencyTolerance(BaseModel):
+    """Agent of the workload, with its share of queries and how long its answers may take"""
+    agent: str
+    query_share: float = Field(..., ge=0.0, le=100.0, description="Percent of all queries")
+    latency_tolerance_hours: float = Field(..., ge=0.0)
+
 class CostCalculatorRequest(BaseModel):
     # AI Agent Selection
     agent_type: str = Field(default="sales-coach", description="Type of AI agent")
@@ -146,6 +186,10 @@ class CostCalculatorRequest(BaseModel):
 
     # Infrastructure Parameters
     infrastructure_scale: float = Field(default=1.0, ge=0.1, le=5.0)
+    custom_infrastructure: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Overrides for tier infrastructure (e.g. aks_nodes), given at scale 1.0"
+    )
     memory_type: str = Field(default="redis", description="Memory system: redis, cosmos-db, neo4j, in_memory")
 
     # LLM Configuration
@@ -156,15 +200,55 @@ class CostCalculatorRequest(BaseModel):
 
     # Optimization Settings
     cache_hit_rate: float = Field(default=0.70, ge=0.0, le=1.0)
+    cache_hit_rates: Optional[Dict[str, confloat(ge=0.0, le=1.0)]] = Field(
+        default=None,
+        description="Per-model cache hit rates (e.g. from the prefix cache simulator); override cache_hit_rate for listed models"
+    )
     use_prompt_caching: bool = Field(default=True)
     use_reserved_instances: bool = Field(default=True)
 
+    # Batch API Routing
+    use_batch_processing: bool = Field(default=True)
+    agent_latency_tolerances: Optional[List[AgentLatencyTolerance]] = Field(
+        default=None,
+        description="Agents whose queries may go to provider batch APIs when they tolerate the batch turnaround; "
+                    "queries not covered are interactive"
+    )
+    max_batch_turnaround_hours: float = Field(
+        default=24.0, gt=0.0,
+        description="Longest typical batch turnaround accepted; providers slower than this are not used"
+    )
+
+    # Effective-Dated Pricing
+    as_of: Optional[date] = Field(
+        default=None,
+        description="Price LLM tokens with the rates in force on this date (pricing history); current rates when omitted"
+    )
+
+    # On-Premise GPU Placement
+    gpu_placement: bool = Field(
+        default=False,
+        description="Price on-premise LLMs from a memory-fit GPU placement plan instead of the tier GPU allocation"
+    )
+    gpu_precision: str = Field(default="fp16", description="Weight precision for GPU placement: fp16, fp8, int8, int4")
+    concurrent_sequences: Optional[int] = Field(
+        default=None, ge=1,
+        description="Sequences in flight at peak for GPU placement; defaults to min(num_users, tier max_concurrent_users)"
+    )
+
     # MCP Tools (NEW - addresses user's question)
     mcp_tools: List[str] = Field(
         default=[],
         description="Selected MCP tools for the agent"
     )
 
+    # Quote metadata
+    customer: Optional[str] = Field(default=None, description="Customer the quote is prepared for")
+    tenant: Optional[str] = Field(
+        default=None,
+        description="Tenant whose pricing overlay (negotiated rates, custom tier contents) applies"
+    )
+
 class AgentCostRequest(BaseModel):
     """Request model for calculating individual agent LLM costs"""
     llm_model: str = Field(..., description="The LLM model used by this agent")
@@ -173,6 +257,7 @@ class AgentCostRequest(BaseModel):
     num_users: int = Field(default=100, ge=1, le=10000)
     queries_per_user_per_month: int = Field(default=40, ge=1, le=10000)
     avg_tokens_per_request: int = Field(default=5000, ge=100, le=100000)
+    input_token_share: float = Field(default=0.7, ge=0.0, le=1.0, description="Share of tokens that are input (e.g. from the workload profiler)")
     cache_hit_rate: float = Field(default=0.70, ge=0.0, le=1.0)
     use_prompt_caching: bool = Field(default=True)
 
@@ -200,6 +285,118 @@ class CostBreakdown(BaseModel):
     cost_drivers: Optional[List[str]] = None
     optimization_tips: Optional[List[str]] = None
 
+# ===========================
+# COMPACT BREAKDOWN RECORDS
+# ===========================
+
+# Breakdown text shared across requests is interned once and referenced by ID.
+# A text reference is a str (final text), an int (TEXT_TABLE ID) or a tuple
+# (template ID, *args) that is only formatted when the response is serialized.
+TEXT_TABLE: List[str] = []
+_TEXT_IDS: Dict[str, int] = {}
+
+# Constant lists of text references (cost drivers, optimization tips)
+TEXT_LISTS: List[tuple] = []
+
+def intern_text(text: str) -> int:
+    """ID of a constant string or str.format template in TEXT_TABLE"""
+    text_id = _TEXT_IDS.get(text)
+    if text_id is None:
+        text_id = _TEXT_IDS[text] = len(TEXT_TABLE)
+        TEXT_TABLE.append(text)
+    return text_id
+
+def intern_list(*items: Any) -> int:
+    """ID of a constant list in TEXT_LISTS; plain strings are interned"""
+    TEXT_LISTS.append(tuple(intern_text(item) if isinstance(item, str) else item for item in items))
+    return len(TEXT_LISTS) - 1
+
+def render_text(ref: Any) -> Optional[str]:
+    if ref is None or type(ref) is str:
+        return ref
+    if type(ref) is int:
+        return TEXT_TABLE[ref]
+    return TEXT_TABLE[ref[0]].format(*ref[1:])
+
+def render_list(ref: Any) -> Optional[List[str]]:
+    if ref is None:
+        return None
+    return [render_text(item) for item in (TEXT_LISTS[ref] if type(ref) is int else ref)]
+
+class BreakdownRecord:
+    """
+    Internal cost line item: numbers plus text references. Rendered into a
+    CostBreakdown only when the response is serialized.
+    """
+    __slots__ = ("category", "subcategory_ref", "monthly_cost", "unit_ref", "quantity",
+                 "notes_ref", "formula_ref", "drivers_ref", "tips_ref")
+
+    def __init__(self, category: str, subcategory: Any, monthly_cost: float, unit: Any, quantity: float,
+                 notes: Any, formula: Any = None, drivers: Any = None, tips: Any = None):
+        self.category = category
+        self.subcategory_ref = subcategory
+        self.monthly_cost = monthly_cost
+        self.unit_ref = unit
+        self.quantity = quantity
+        self.notes_ref = notes
+        self.formula_ref = formula
+        self.drivers_ref = drivers
+        self.tips_ref = tips
+
+    @property
+    def subcategory(self) -> str:
+        return render_text(self.subcategory_ref)
+
+    @property
+    def annual_cost(self) -> float:
+        return self.monthly_cost * 12
+
+    @property
+    def unit(self) -> str:
+        return render_text(self.unit_ref)
+
+    @property
+    def notes(self) -> str:
+        return render_text(self.notes_ref)
+
+    @property
+    def calculation_formula(self) -> Optional[str]:
+        return render_text(self.formula_ref)
+
+    @property
+    def cost_drivers(self) -> Optional[List[str]]:
+        return render_list(self.drivers_ref)
+
+    @property
+    def optimization_tips(self) -> Optional[List[str]]:
+        return render_list(self.tips_ref)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialized CostBreakdown fields"""
+        return {
+            "category": self.category,
+            "subcategory": self.subcategory,
+            "monthly_cost": float(self.monthly_cost),
+            "annual_cost": float(self.annual_cost),
+            "unit": self.unit,
+            "quantity": float(self.quantity),
+            "notes": self.notes,
+            "calculation_formula": self.calculation_formula,
+            "cost_drivers": self.cost_drivers,
+            "optimization_tips": self.optimization_tips,
+        }
+
+    def to_model(self) -> CostBreakdown:
+        return CostBreakdown.model_construct(**self.to_dict())
+
+# Labels come from requests (service_tier, memory_type, ...), so the cache is bounded
+TITLE_CACHE_SIZE = 256
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def title_text(name: str) -> str:
+    """Title-cased label (tier names, config values), cached for the recently used names"""
+    return name.title()
+
 class AgentArchitecture(BaseModel):
     name: str
     description: str
@@ -247,16 +444,16 @@ class CostCalculatorResponse(BaseModel):
     prompt_tuning_costs: float  # NEW - Tier-based prompt optimization costs
     mcp_tools_costs: float  # User-selected tools
 
-    # Detailed Breakdown by Tab
-    llm_breakdown: List[CostBreakdown]
-    infrastructure_breakdown: List[CostBreakdown]
-    data_source_breakdown: List[CostBreakdown]
-    monitoring_breakdown: List[CostBreakdown]
-    memory_system_breakdown: List[CostBreakdown]
-    retrieval_breakdown: List[CostBreakdown]  # NEW
-    security_breakdown: List[CostBreakdown]  # NEW
-    prompt_tuning_breakdown: List[CostBreakdown]  # NEW
-    mcp_tools_breakdown: List[CostBreakdown]
+    # Detailed Breakdown by Tab (BreakdownRecord or CostBreakdown items, rendered on serialization)
+    llm_breakdown: SkipValidation[List[CostBreakdown]]
+    infrastructure_breakdown: SkipValidation[List[CostBreakdown]]
+    data_source_breakdown: SkipValidation[List[CostBreakdown]]
+    monitoring_breakdown: SkipValidation[List[CostBreakdown]]
+    memory_system_breakdown: SkipValidation[List[CostBreakdown]]
+    retrieval_breakdown: SkipValidation[List[CostBreakdown]]  # NEW
+    security_breakdown: SkipValidation[List[CostBreakdown]]  # NEW
+    prompt_tuning_breakdown: SkipValidation[List[CostBreakdown]]  # NEW
+    mcp_tools_breakdown: SkipValidation[List[CostBreakdown]]
 
     # Metrics
     queries_per_month: int
@@ -269,19 +466,160 @@ class CostCalculatorResponse(BaseModel):
     # NEW: Global Usage Parameters with detailed per-user metrics
     global_usage_metrics: GlobalUsageMetrics
 
+    # Content hash of the request and pricing version (see /quotes)
+    quote_id: Optional[str] = None
+
+    @field_serializer(
+        "llm_breakdown", "infrastructure_breakdown", "data_source_breakdown", "monitoring_breakdown",
+        "memory_system_breakdown", "retrieval_breakdown", "security_breakdown", "prompt_tuning_breakdown",
+        "mcp_tools_breakdown",
+    )
+    def render_breakdown(self, items: list) -> List[Dict[str, Any]]:
+        return [item.to_dict() if isinstance(item, BreakdownRecord) else item.model_dump() for item in items]
+
+# ===========================
+# COST EXPRESSIONS
+# ===========================
+
+# Rate-card values cost expressions are compiled against
+RATE_CARD = {
+    "azure": AZURE_PRICING_SYDNEY,
+    "gpu": GPU_COSTS,
+    "llm": LLM_PRICING_USD,
+    "llm_history": LlmRatesByDate(BATCH_API_PRICING),
+    "llm_default": DEFAULT_LLM_PRICING_USD,
+    "fx": {"aud_to_usd": AUD_TO_USD},
+}
+
+HOURS_PER_MONTH = Const(730, "{} hours")
+GB_PER_TB = Const(1024, "{} GB/TB")
+USD_PER_AUD = Rate(("fx", "aud_to_usd"), "{} USD/AUD")
+
+def _token_rate(pricing: tuple, kind: str, label: str = "tokens") -> Rate:
+    return Rate(pricing + (kind,), "${}/1M " + label, scale=1e-6)
+
+# Cost line declarations: rate-card key -> (expression, compile options)
+
+def aks_nodes_cost(commitment: str):
+    rate = Rate(("azure", "compute", "Standard_D16s_v5", commitment), "${}/hour")
+    return rate * Input("aks_nodes", "{:g} nodes") * HOURS_PER_MONTH, {}
+
+def gpu_nodes_cost(commitment: str):
+    rate = Rate(("azure", "compute", "Standard_NC6s_v3", commitment), "${}/hour")
+    return rate * Input("gpu_nodes", "{:g} nodes") * HOURS_PER_MONTH, {}
+
+def sql_database_cost():
+    rate = Rate(("azure", "database", "sql_standard"), "${}/vCore-hour")
+    return rate * Input("sql_vcores", "{:g} vCores") * HOURS_PER_MONTH, {}
+
+def storage_cost():
+    hot = Rate(("azure", "storage", "hot_lrs"), "${}/GB hot") * Input("storage_hot_tb", "{:,.2f} TB") * GB_PER_TB
+    cool = Rate(("azure", "storage", "cool_lrs"), "${}/GB cool") * Input("storage_cool_tb", "{:,.2f} TB") * GB_PER_TB
+    return hot + cool, {}
+
+def llm_api_cost(cached: bool, batched: bool, *pricing: str):
+    """Token cost (USD, converted to AUD) of one model's share of queries"""
+    if cached:
+        hit_rate = Input("cache_hit_rate", "{:.0%}")
+        input_rate = (hit_rate * _token_rate(pricing, "cache_read", "cached tokens")
+                      + (1 - hit_rate) * _token_rate(pricing, "input"))
+    else:
+        input_rate = _token_rate(pricing, "input")
+    queries = Input("total_queries", "{:,} queries") * Percent("percentage")
+    tokens = (Input("avg_input_tokens", "{:,} input tokens") * input_rate
+              + Input("avg_output_tokens", "{:,} output tokens") * _token_rate(pricing, "output"))
+    if batched:
+        discount = Rate(pricing + ("batch_discount",), "{:.0%} batch discount")
+        tokens = tokens * (1 - Input("batch_share", "{:.0%} batched") * discount)
+    return queries * tokens / USD_PER_AUD, {}
+
+def llm_gpu_cost(gpu_type: str):
+    rate = Rate(("gpu", gpu_type, "hourly_cost"), "${}/hour")
+    return rate * HOURS_PER_MONTH * Input("gpu_count", "{} GPUs") * Percent("percentage") / USD_PER_AUD, {}
+
+def llm_gpu_fleet_cost(gpu_type: str):
+    rate = Rate(("gpu", gpu_type, "hourly_cost"), "${}/hour")
+    return rate * HOURS_PER_MONTH * Input("gpu_count", "{} GPUs") / USD_PER_AUD, {}
+
+def cosmos_db_cost():
+    rate = Rate(("azure", "database", "cosmosdb_ru_100"), "${}/hour")
+    return Input("cosmos_ru", "{:,.0f} RU/s") / Const(100) * rate * HOURS_PER_MONTH, {}
+
+def redis_cost(sku: str):
+    rate = Rate(("azure", "database", f"redis_premium_{sku}"), "${}/hour")
+    return rate * HOURS_PER_MONTH, {"suffix": f" ({sku.upper()} tier)"}
+
+def neo4j_cost():
+    rate = Rate(("azure", "database", "neo4j_node"), "${}/hour")
+    return Input("neo4j_nodes", "{} nodes") * rate * HOURS_PER_MONTH, {}
+
+# Cost lines by name, with an example rate-card key (see /formulas)
+COST_LINES = {
+    "aks_nodes": (aks_nodes_cost, ("reserved_1yr",)),
+    "gpu_nodes": (gpu_nodes_cost, ("reserved_1yr",)),
+    "sql_database": (sql_database_cost, ()),
+    "storage": (storage_cost, ()),
+    "llm_api": (llm_api_cost, (True, True, "llm", "claude-3-5-haiku")),
+    "llm_gpu": (llm_gpu_cost, ("A100",)),
+    "llm_gpu_fleet": (llm_gpu_fleet_cost, ("A100",)),
+    "cosmos_db": (cosmos_db_cost, ()),
+    "redis": (redis_cost, ("c6",)),
+    "neo4j": (neo4j_cost, ()),
+}
+
+@lru_cache(maxsize=None)
+def compiled_cost(name: str, *key: Any) -> CompiledCost:
+    """
+    Cost line compiled against RATE_CARD. line(**inputs) returns the cost and
+    its formula as a lazily formatted text reference (interned template).
+    """
+    declare, _ = COST_LINES[name]
+    expr, options = declare(*key)
+    return compile_cost(expr, RATE_CARD, intern=intern_text, **options)
+
+def compile_line(name: str, key: tuple, rate_card: Mapping[str, Any]) -> CompiledCost:
+    """Cost line compiled against a rate card (a tenant's, or RATE_CARD via the shared cache)"""
+    if rate_card is RATE_CARD:
+        return compiled_cost(name, *key)
+    declare, _ = COST_LINES[name]
+    expr, options = declare(*key)
+    return compile_cost(expr, rate_card, intern=intern_text, **options)
+
+# Shared catalog pricing; tenant overlays are layered over it (see app.pricing.tenants)
+BASE_PRICING = TenantPricing(SERVICE_TIERS, RATE_CARD, compile_line)
+
+def get_tenant_pricing(tenant: Optional[str]) -> TenantPricing:
+    """Pricing of a tenant (the shared catalog when tenant is None; 400 when it has no overlay)"""
+    if tenant is None:
+        return BASE_PRICING
+    from app.storage.tenant_store import get_tenant_store
+
+    try:
+        pricing = get_tenant_store().get(tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if pricing is None:
+        raise HTTPException(status_code=400, detail=f"Tenant '{tenant}' has no pricing overlay")
+    return pricing
+
+def request_pricing_version(params: CostCalculatorRequest) -> str:
+    """Pricing version a request is priced with: the catalog's, plus the tenant overlay's"""
+    if params.tenant is None:
+        return PRICING_VERSION
+    return f"{PRICING_VERSION}+{get_tenant_pricing(params.tenant).version}"
+
 # ===========================
 # COST CALCULATION FUNCTIONS
 # ===========================
 
-def get_agent_infrastructure(agent_type: str, service_tier: str, scale: float, custom: Optional[Dict] = None) -> Dict[str, float]:
+def get_agent_infrastructure(agent_type: str, service_tier: str, scale: float, custom: Optional[Dict] = None,
+                             tenant_pricing: TenantPricing = BASE_PRICING) -> Dict[str, float]:
     """
     Get infrastructure configuration for an agent based on service tier.
-    Uses tier-specific infrastructure from service_tiers.py instead of agent defaults.
+    Uses tier-specific infrastructure from service_tiers.py (or the tenant's tiers) instead of agent defaults.
     """
-    from app.config.service_tiers import INFRASTRUCTURE_CONFIGS
-
     # Get tier-specific infrastructure configuration
-    tier_infra = INFRASTRUCTURE_CONFIGS.get(service_tier.lower(), INFRASTRUCTURE_CONFIGS["standard"])
+    tier_infra = tenant_pricing.tier(service_tier)["infrastructure"]
 
     # Convert storage from GB to TB for compatibility with existing calculations
     base_infra = {
@@ -301,68 +639,184 @@ def get_agent_infrastructure(agent_type: str, service_tier: str, scale: float, c
     # Apply scale multiplier
     return {key: value * scale for key, value in base_infra.items()}
 
-def calculate_infrastructure_costs(infra: Dict[str, float], use_reserved: bool) -> tuple[float, List[CostBreakdown]]:
+# Interned breakdown text: str.format templates and constant notes/drivers/tips
+TXT_AKS_NODES = intern_text("Standard_D16s_v5 × {0} nodes")
+TXT_GPU_NODES = intern_text("Standard_NC6s_v3 × {0} nodes")
+TXT_SQL_VCORES = intern_text("Standard tier × {0} vCores")
+TXT_STORAGE = intern_text("{0}TB hot + {1}TB cool")
+
+TXT_GPU_SUBCATEGORY = intern_text("{0} ({1})")
+TXT_GPU_UNIT = intern_text("{0} GPU(s)")
+TXT_GPU_NOTES = intern_text("{0}% allocation, {1}x {2} GPU(s) @ ${3}/hr ({4} tier)")
+TXT_GPU_DRIVER_TIER = intern_text("Tier: {0} tier → {1} GPU(s)")
+TXT_GPU_DRIVER_TYPE = intern_text("GPU Type: {0} (${1}/hour)")
+TXT_GPU_DRIVER_ALLOCATION = intern_text("Allocation: {0}% of workload")
+TXT_GPU_DRIVER_RUNTIME = intern_text("Runtime: 730 hours/month (24/7 availability)")
+GPU_TIPS = intern_list(
+    "Consider Standard tier (2 GPUs) for balanced cost/performance",
+    "Use model quantization to run on cheaper GPU types",
+    "Implement auto-scaling to reduce GPU usage during low-traffic periods",
+    "Switch to Cloud API for variable workloads (pay per token)",
+)
+TXT_GPU_FLEET_SUBCATEGORY = intern_text("{0} fleet ({1})")
+TXT_GPU_FLEET_NOTES = intern_text("{0} GPU(s) @ ${1}/hr hosting {2}")
+TXT_GPU_FLEET_DRIVER_MODEL = intern_text(
+    "{0}: {1} replica(s) × {2} GPU(s), {3} sequences per replica, {4:,.1f} GB weights + KV cache"
+)
+TXT_GPU_FLEET_DRIVER_SHARED = intern_text("{0} GPU(s) shared by several models")
+GPU_FLEET_TIPS = intern_list(
+    "Quantize weights (int8/int4) to fit models on fewer or cheaper GPUs",
+    "Lower max input tokens to shrink the KV cache reserved per sequence",
+    "Queue requests to cap concurrent sequences per model",
+)
+TXT_API_NOTES = intern_text("{0}% of queries, {1:.0f}% cache hit rate")
+TXT_API_BATCH_NOTES = intern_text("{0}% of queries, {1:.0f}% cache hit rate, {2:.0%} via batch API")
+
+TXT_DATA_SOURCES_SUBCATEGORY = intern_text("{0} Tier Data Sources")
+TXT_DATA_SOURCES_NOTES = intern_text("Included sources: {0}")
+TXT_NO_DATA_SOURCES = intern_text("No Premium Data Sources")
+TXT_NO_DATA_SOURCES_NOTES = intern_text("Basic tier includes no premium data sources")
+
+TXT_TIER_SERVICE = intern_text("{0} ({1} Tier)")
+TXT_FEATURES = intern_text("Features: {0}")
+
+TXT_COSMOS_SUBCATEGORY = intern_text("Cosmos DB ({0} Tier)")
+TXT_COSMOS_NOTES = intern_text("{0:,} RU/s provisioned throughput. Multi-model NoSQL, Global Distribution, Auto-scaling")
+TXT_COSMOS_DRIVER_RU = intern_text("Request Units: {0:,} RU/s (primary cost driver)")
+COSMOS_DRIVERS_TAIL = tuple(intern_text(t) for t in (
+    "Storage: Minimal impact at current scale",
+    "Multi-region replication: If enabled",
+    "Auto-scale vs provisioned: Currently provisioned",
+))
+TXT_COSMOS_TIP_CURRENT = intern_text("Current: {0:,} RU/s. Monitor actual usage to right-size.")
+COSMOS_TIPS_TAIL = tuple(intern_text(t) for t in (
+    "Enable auto-scale to pay only for RU/s used (vs provisioned)",
+    "Use reserved capacity for 1-3 year terms (up to 63% savings)",
+    "Optimize queries to reduce RU consumption",
+    "Consider serverless mode for unpredictable workloads",
+))
+
+TXT_REDIS_SUBCATEGORY = intern_text("Redis ({0} Tier)")
+TXT_REDIS_NOTES = intern_text("{0}GB Azure Cache for Redis. Persistence enabled, Replication enabled")
+TXT_REDIS_DRIVER_SIZE = intern_text("Cache size: {0}GB (determines tier)")
+REDIS_DRIVERS_TAIL = tuple(intern_text(t) for t in (
+    "Premium features: Persistence, Clustering, Geo-replication",
+    "Azure Cache for Redis Standard/Premium tier",
+    "Region: Australia East",
+))
+TXT_REDIS_TIP_BASIC = intern_text("Use Basic tier if persistence not required (50% savings)")
+TXT_REDIS_TIP_MONITOR = intern_text("Monitor memory usage - if < {0}GB consistently, downsize")
+REDIS_TIPS_TAIL = tuple(intern_text(t) for t in (
+    "Enable data eviction policies to reduce memory pressure",
+    "Consider moving cold data to Cosmos DB or SQL",
+))
+
+TXT_NEO4J_SUBCATEGORY = intern_text("Neo4j ({0} Tier)")
+TXT_NEO4J_NOTES = intern_text("{0} Neo4j cluster nodes. Graph database for relationship mapping")
+TXT_NEO4J_DRIVER_NODES = intern_text("Number of nodes: {0}")
+NEO4J_DRIVERS_TAIL = tuple(intern_text(t) for t in (
+    "VM SKU: Standard_D16s_v5 (16 vCPU, 64GB RAM) per node",
+    "Reserved Instance pricing (1-year)",
+    "Storage: Premium SSD for graph data",
+    "High availability: Multi-node clustering",
+))
+TXT_NEO4J_TIP_SINGLE = intern_text("Use single node for development/testing environments")
+TXT_NEO4J_TIP_CURRENT = intern_text("Current: {0} nodes. Scale down if graph < 1M nodes")
+NEO4J_TIPS_TAIL = tuple(intern_text(t) for t in (
+    "Consider managed graph services if operational overhead is high",
+    "Optimize Cypher queries to reduce compute requirements",
+))
+
+TXT_IN_MEMORY_SUBCATEGORY = intern_text("In-Memory ({0} Tier)")
+TXT_IN_MEMORY_NOTES = intern_text("{0}GB application memory. WARNING: Data lost on restart, not suitable for production")
+TXT_IN_MEMORY_FORMULA = intern_text("$0.00/month (uses application memory, no external service)")
+IN_MEMORY_DRIVERS = intern_list(
+    "No infrastructure cost (uses app memory)",
+    "Limited by container/VM memory allocation",
+    "Non-persistent: Data lost on restart",
+)
+IN_MEMORY_TIPS = intern_list(
+    "Only use for stateless applications or development",
+    "Migrate to Redis for production workloads",
+    "Implement external persistence for critical data",
+    "WARNING: Not suitable for production use",
+)
+
+TXT_MEMORY_DEFAULT_SUBCATEGORY = intern_text("{0} ({1} Tier - Default)")
+TXT_MEMORY_UNKNOWN_NOTES = intern_text("Unknown memory type '{0}', using tier default: {1}")
+TXT_MEMORY_DEFAULT_NOTES = intern_text("{0}GB capacity. Features: {1}")
+TXT_MEMORY_DEFAULT_FORMULA = intern_text("Tier default configuration: ${0:,.2f}/month")
+TXT_MEMORY_DRIVER_TIER = intern_text("Service tier: {0}")
+TXT_MEMORY_DRIVER_TYPE = intern_text("Default memory type: {0}")
+TXT_MEMORY_DRIVER_CAPACITY = intern_text("Capacity: {0}GB")
+
+TXT_MCP_NOTES = intern_text("Per assessment cost for {0}")
+TXT_RETRIEVAL_NOTES = intern_text("{0:,} max vectors. {1}")
+TXT_SECURITY_SUBCATEGORY = intern_text("{0} Security ({1} Tier)")
+TXT_SECURITY_NOTES = intern_text("Features: {0}.{1}")
+
+def calculate_infrastructure_costs(infra: Dict[str, float], use_reserved: bool,
+                                   tenant_pricing: TenantPricing = BASE_PRICING) -> tuple[float, List[BreakdownRecord]]:
     """Calculate infrastructure costs based on Azure pricing"""
     breakdown = []
     total = 0.0
+    commitment = "reserved_1yr" if use_reserved else "payg"
 
     # AKS Nodes
-    aks_cost = AZURE_PRICING_SYDNEY["compute"]["Standard_D16s_v5"]["reserved_1yr" if use_reserved else "payg"] * infra["aks_nodes"] * 730
+    aks_cost, aks_formula = tenant_pricing.compiled("aks_nodes", commitment).line(aks_nodes=infra["aks_nodes"])
     total += aks_cost
-    breakdown.append(CostBreakdown(
-        category="Infrastructure",
-        subcategory="AKS Nodes",
-        monthly_cost=aks_cost,
-        annual_cost=aks_cost * 12,
-        unit="nodes",
-        quantity=infra["aks_nodes"],
-        notes=f"Standard_D16s_v5 × {int(infra['aks_nodes'])} nodes"
+    breakdown.append(BreakdownRecord(
+        "Infrastructure", "AKS Nodes", aks_cost, "nodes", infra["aks_nodes"],
+        notes=(TXT_AKS_NODES, int(infra["aks_nodes"])),
+        formula=aks_formula
     ))
 
     # GPU Nodes (if any)
     if infra["gpu_nodes"] > 0:
-        gpu_cost = AZURE_PRICING_SYDNEY["compute"]["Standard_NC6s_v3"]["reserved_1yr" if use_reserved else "payg"] * infra["gpu_nodes"] * 730
+        gpu_cost, gpu_formula = tenant_pricing.compiled("gpu_nodes", commitment).line(gpu_nodes=infra["gpu_nodes"])
         total += gpu_cost
-        breakdown.append(CostBreakdown(
-            category="Infrastructure",
-            subcategory="GPU Nodes",
-            monthly_cost=gpu_cost,
-            annual_cost=gpu_cost * 12,
-            unit="nodes",
-            quantity=infra["gpu_nodes"],
-            notes=f"Standard_NC6s_v3 × {int(infra['gpu_nodes'])} nodes"
+        breakdown.append(BreakdownRecord(
+            "Infrastructure", "GPU Nodes", gpu_cost, "nodes", infra["gpu_nodes"],
+            notes=(TXT_GPU_NODES, int(infra["gpu_nodes"])),
+            formula=gpu_formula
         ))
 
     # SQL Database
-    sql_cost = AZURE_PRICING_SYDNEY["database"]["sql_standard"] * infra["sql_vcores"] * 730
+    sql_cost, sql_formula = tenant_pricing.compiled("sql_database").line(sql_vcores=infra["sql_vcores"])
     total += sql_cost
-    breakdown.append(CostBreakdown(
-        category="Infrastructure",
-        subcategory="SQL Database",
-        monthly_cost=sql_cost,
-        annual_cost=sql_cost * 12,
-        unit="vCores",
-        quantity=infra["sql_vcores"],
-        notes=f"Standard tier × {int(infra['sql_vcores'])} vCores"
+    breakdown.append(BreakdownRecord(
+        "Infrastructure", "SQL Database", sql_cost, "vCores", infra["sql_vcores"],
+        notes=(TXT_SQL_VCORES, int(infra["sql_vcores"])),
+        formula=sql_formula
     ))
 
     # Storage
-    hot_storage_cost = AZURE_PRICING_SYDNEY["storage"]["hot_lrs"] * infra["storage_hot_tb"] * 1024  # TB to GB
-    cool_storage_cost = AZURE_PRICING_SYDNEY["storage"]["cool_lrs"] * infra["storage_cool_tb"] * 1024
-    storage_total = hot_storage_cost + cool_storage_cost
+    storage_total, storage_formula = tenant_pricing.compiled("storage").line(
+        storage_hot_tb=infra["storage_hot_tb"],
+        storage_cool_tb=infra["storage_cool_tb"]
+    )
     total += storage_total
-    breakdown.append(CostBreakdown(
-        category="Infrastructure",
-        subcategory="Storage",
-        monthly_cost=storage_total,
-        annual_cost=storage_total * 12,
-        unit="GB",
-        quantity=infra["storage_hot_tb"] + infra["storage_cool_tb"],
-        notes=f"{infra['storage_hot_tb']}TB hot + {infra['storage_cool_tb']}TB cool"
+    breakdown.append(BreakdownRecord(
+        "Infrastructure", "Storage", storage_total, "GB", infra["storage_hot_tb"] + infra["storage_cool_tb"],
+        notes=(TXT_STORAGE, infra["storage_hot_tb"], infra["storage_cool_tb"]),
+        formula=storage_formula
     ))
 
     return total, breakdown
 
+def llm_pricing_as_of(as_of: Optional[date] = None,
+                      tenant_pricing: TenantPricing = BASE_PRICING) -> Tuple[Mapping[str, Dict[str, Any]], tuple]:
+    """LLM token rates in force on a date and their rate-card key (current rates when as_of is None)"""
+    if as_of is None:
+        return tenant_pricing.rate_card["llm"], ("llm",)
+    history = get_pricing_history()
+    try:
+        index = history.index_on(as_of)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    effective = history.dates[index].isoformat()
+    return tenant_pricing.rate_card["llm_history"][effective], ("llm_history", effective)
+
 def calculate_llm_costs(
     llm_mix: Dict[str, float],
     total_queries: int,
@@ -371,15 +825,51 @@ def calculate_llm_costs(
     cache_hit_rate: float,
     use_prompt_caching: bool,
     deployment_type: str = "cloud_api",
-    service_tier: str = "standard"
-) -> tuple[float, List[CostBreakdown]]:
-    """Calculate LLM costs based on deployment type: Cloud API (token-based) or On-Premise (GPU-based)"""
+    service_tier: str = "standard",
+    cache_hit_rates: Optional[Dict[str, float]] = None,
+    gpu_plan: Optional[GpuFleetPlan] = None,
+    gpu_precision: str = "fp16",
+    batch_shares: Optional[Dict[str, float]] = None,
+    as_of: Optional[date] = None,
+    tenant_pricing: TenantPricing = BASE_PRICING
+) -> tuple[float, List[BreakdownRecord]]:
+    """
+    Calculate LLM costs based on deployment type: Cloud API (token-based) or On-Premise (GPU-based).
+    On-premise GPUs come from gpu_plan when given, otherwise from the tier GPU allocation.
+    batch_shares gives the fraction of each model's queries sent to its provider's batch API.
+    Token rates are those in force on as_of when given; rates and GPU costs are the tenant's.
+    """
     breakdown = []
     total = 0.0
+    gpu_costs = tenant_pricing.rate_card["gpu"]
+
+    # On-Premise deployment priced from a GPU placement plan
+    if deployment_type == "on_premise" and gpu_plan is not None:
+        for gpu_type, gpu_count in gpu_plan.gpus.items():
+            fleet_cost, formula = tenant_pricing.compiled("llm_gpu_fleet", gpu_type).line(gpu_count=gpu_count)
+            total += fleet_cost
+
+            placements = [p for p in gpu_plan.placements if p.gpu_type == gpu_type]
+            shared = sum(1 for shared_type, _, _ in gpu_plan.shared_gpus if shared_type == gpu_type)
+            drivers = tuple(
+                (TXT_GPU_FLEET_DRIVER_MODEL, p.model, p.replicas, p.gpus_per_replica, p.sequences_per_replica, p.memory_gb)
+                for p in placements
+            )
+            breakdown.append(BreakdownRecord(
+                "LLM Costs (GPU)",
+                (TXT_GPU_FLEET_SUBCATEGORY, gpu_type, gpu_precision),
+                fleet_cost,
+                (TXT_GPU_UNIT, gpu_type),
+                gpu_count,
+                notes=(TXT_GPU_FLEET_NOTES, gpu_count, gpu_costs[gpu_type]["hourly_cost"],
+                       ", ".join(p.model for p in placements)),
+                formula=formula,
+                drivers=drivers + (((TXT_GPU_FLEET_DRIVER_SHARED, shared),) if shared else ()) + (TXT_GPU_DRIVER_RUNTIME,),
+                tips=GPU_FLEET_TIPS
+            ))
 
     # Handle On-Premise deployment (GPU-based pricing)
-    if deployment_type == "on_premise":
-        from app.config.service_tiers import LLM_CATEGORIES, GPU_COSTS
+    elif deployment_type == "on_premise":
 
         # Determine number of GPUs based on tier
         gpu_count = {
@@ -400,86 +890,95 @@ def calculate_llm_costs(
                         gpu_type = model_info.get("gpu_type", "A100")
                         break
 
-            # Calculate GPU cost for full month (730 hours)
-            gpu_hourly_cost = GPU_COSTS[gpu_type]["hourly_cost"]
-            monthly_cost_per_gpu_usd = gpu_hourly_cost * 730
-            total_gpu_cost_usd = monthly_cost_per_gpu_usd * gpu_count * (percentage / 100)
-
-            # Convert to AUD
-            model_cost = total_gpu_cost_usd / AUD_TO_USD
+            # GPU cost for full month (730 hours), converted to AUD
+            gpu_hourly_cost = gpu_costs[gpu_type]["hourly_cost"]
+            model_cost, formula = tenant_pricing.compiled("llm_gpu", gpu_type).line(gpu_count=gpu_count, percentage=percentage)
 
             total += model_cost
 
-            breakdown.append(CostBreakdown(
-                category="LLM Costs (GPU)",
-                subcategory=f"{model} ({gpu_type})",
-                monthly_cost=model_cost,
-                annual_cost=model_cost * 12,
-                unit=f"{gpu_type} GPU(s)",
-                quantity=gpu_count,
-                notes=f"{percentage}% allocation, {gpu_count}x {gpu_type} GPU(s) @ ${gpu_hourly_cost}/hr ({service_tier} tier)",
-                calculation_formula=f"{gpu_count} GPUs × ${gpu_hourly_cost}/hour × 730 hours × {percentage}% = ${model_cost:,.2f}/month",
-                cost_drivers=[
-                    f"Tier: {service_tier.title()} tier → {gpu_count} GPU(s)",
-                    f"GPU Type: {gpu_type} (${gpu_hourly_cost}/hour)",
-                    f"Allocation: {percentage}% of workload",
-                    "Runtime: 730 hours/month (24/7 availability)"
-                ],
-                optimization_tips=[
-                    "Consider Standard tier (2 GPUs) for balanced cost/performance",
-                    "Use model quantization to run on cheaper GPU types",
-                    "Implement auto-scaling to reduce GPU usage during low-traffic periods",
-                    f"Switch to Cloud API for variable workloads (pay per token)"
-                ]
+            breakdown.append(BreakdownRecord(
+                "LLM Costs (GPU)",
+                (TXT_GPU_SUBCATEGORY, model, gpu_type),
+                model_cost,
+                (TXT_GPU_UNIT, gpu_type),
+                gpu_count,
+                notes=(TXT_GPU_NOTES, percentage, gpu_count, gpu_type, gpu_hourly_cost, service_tier),
+                formula=formula,
+                drivers=(
+                    (TXT_GPU_DRIVER_TIER, title_text(service_tier), gpu_count),
+                    (TXT_GPU_DRIVER_TYPE, gpu_type, gpu_hourly_cost),
+                    (TXT_GPU_DRIVER_ALLOCATION, percentage),
+                    TXT_GPU_DRIVER_RUNTIME,
+                ),
+                tips=GPU_TIPS
             ))
     else:
         # Handle Cloud API deployment (token-based pricing)
+        llm_pricing, llm_key = llm_pricing_as_of(as_of, tenant_pricing)
         for model, percentage in llm_mix.items():
             if percentage <= 0:
                 continue
 
             # Get pricing for this model
-            pricing = LLM_PRICING_USD.get(model, {"input": 2.50, "output": 10.00, "cache_read": 1.25})
+            pricing = llm_pricing.get(model, DEFAULT_LLM_PRICING_USD)
 
             # Calculate tokens for this model
             model_queries = total_queries * (percentage / 100)
             input_tokens = model_queries * avg_input_tokens
             output_tokens = model_queries * avg_output_tokens
 
-            # Apply caching
-            if use_prompt_caching and "cache_read" in pricing:
-                cached_input_tokens = input_tokens * cache_hit_rate
-                fresh_input_tokens = input_tokens * (1 - cache_hit_rate)
-
-                # Cost calculation
-                input_cost = (cached_input_tokens / 1000000 * pricing["cache_read"] +
-                             fresh_input_tokens / 1000000 * pricing["input"])
-            else:
-                input_cost = input_tokens / 1000000 * pricing["input"]
-
-            output_cost = output_tokens / 1000000 * pricing["output"]
-            model_cost = (input_cost + output_cost) / AUD_TO_USD  # Convert to AUD
+            # Token cost in AUD, applying caching (per-model rate if provided)
+            model_cache_hit_rate = (cache_hit_rates or {}).get(model, cache_hit_rate)
+            cached = use_prompt_caching and "cache_read" in pricing
+            pricing_key = (*llm_key, model) if model in llm_pricing else ("llm_default",)
+            batch_share = (batch_shares or {}).get(model, 0.0)
+            model_cost, formula = tenant_pricing.compiled("llm_api", cached, batch_share > 0, *pricing_key).line(
+                total_queries=total_queries,
+                percentage=percentage,
+                avg_input_tokens=avg_input_tokens,
+                avg_output_tokens=avg_output_tokens,
+                cache_hit_rate=model_cache_hit_rate,
+                batch_share=batch_share
+            )
 
             total += model_cost
 
-            breakdown.append(CostBreakdown(
-                category="LLM Costs (API)",
-                subcategory=model,
-                monthly_cost=model_cost,
-                annual_cost=model_cost * 12,
-                unit="tokens",
-                quantity=input_tokens + output_tokens,
-                notes=f"{percentage}% of queries, {cache_hit_rate*100:.0f}% cache hit rate"
+            if batch_share > 0:
+                notes = (TXT_API_BATCH_NOTES, percentage, model_cache_hit_rate * 100, batch_share)
+            else:
+                notes = (TXT_API_NOTES, percentage, model_cache_hit_rate * 100)
+            breakdown.append(BreakdownRecord(
+                "LLM Costs (API)", model, model_cost, "tokens", input_tokens + output_tokens,
+                notes=notes,
+                formula=formula
             ))
 
     return total, breakdown
 
-def calculate_data_source_costs(agent_type: str, service_tier: str = "standard") -> tuple[float, List[CostBreakdown]]:
+def api_call_cost(model: str, input_tokens: float, output_tokens: float, cache_hit_rate: float,
+                  use_prompt_caching: bool, as_of: Optional[date] = None,
+                  tenant_pricing: TenantPricing = BASE_PRICING) -> float:
+    """Cost (AUD) of one Cloud API call, priced by the llm_api cost line as in calculate_llm_costs"""
+    llm_pricing, llm_key = llm_pricing_as_of(as_of, tenant_pricing)
+    pricing = llm_pricing.get(model, DEFAULT_LLM_PRICING_USD)
+    cached = use_prompt_caching and "cache_read" in pricing
+    pricing_key = (*llm_key, model) if model in llm_pricing else ("llm_default",)
+    cost, _ = tenant_pricing.compiled("llm_api", cached, False, *pricing_key).line(
+        total_queries=1,
+        percentage=100.0,
+        avg_input_tokens=input_tokens,
+        avg_output_tokens=output_tokens,
+        cache_hit_rate=cache_hit_rate
+    )
+    return cost
+
+def calculate_data_source_costs(agent_type: str, service_tier: str = "standard",
+                                tenant_pricing: TenantPricing = BASE_PRICING) -> tuple[float, List[BreakdownRecord]]:
     """Calculate data source costs based on service tier (NOT agent requirements)"""
     breakdown = []
 
     # Get tier-specific data source configuration from service_tiers.py
-    tier_config = get_tier_config(service_tier)
+    tier_config = tenant_pricing.tier(service_tier)
     data_sources_config = tier_config.get("data_sources", {})
 
     # Use the tier-specific monthly cost directly
@@ -489,35 +988,30 @@ def calculate_data_source_costs(agent_type: str, service_tier: str = "standard")
     if monthly_cost_aud > 0:
         # If there's a cost, add breakdown for included data sources
         sources_str = ", ".join(sources) if sources else "No premium data sources"
-        breakdown.append(CostBreakdown(
-            category="Data Sources",
-            subcategory=f"{service_tier.title()} Tier Data Sources",
-            monthly_cost=monthly_cost_aud,
-            annual_cost=monthly_cost_aud * 12,
-            unit="subscription",
-            quantity=len(sources),
-            notes=f"Included sources: {sources_str}"
+        breakdown.append(BreakdownRecord(
+            "Data Sources",
+            (TXT_DATA_SOURCES_SUBCATEGORY, title_text(service_tier)),
+            monthly_cost_aud,
+            "subscription",
+            len(sources),
+            notes=(TXT_DATA_SOURCES_NOTES, sources_str)
         ))
     else:
         # Basic tier - no premium data sources
-        breakdown.append(CostBreakdown(
-            category="Data Sources",
-            subcategory="No Premium Data Sources",
-            monthly_cost=0.0,
-            annual_cost=0.0,
-            unit="subscription",
-            quantity=0,
-            notes="Basic tier includes no premium data sources"
+        breakdown.append(BreakdownRecord(
+            "Data Sources", TXT_NO_DATA_SOURCES, 0.0, "subscription", 0,
+            notes=TXT_NO_DATA_SOURCES_NOTES
         ))
 
     return monthly_cost_aud, breakdown
 
-def calculate_monitoring_costs(data_ingestion_gb: float, service_tier: str = "standard") -> tuple[float, List[CostBreakdown]]:
+def calculate_monitoring_costs(data_ingestion_gb: float, service_tier: str = "standard",
+                               tenant_pricing: TenantPricing = BASE_PRICING) -> tuple[float, List[BreakdownRecord]]:
     """Calculate monitoring and observability costs based on service tier"""
     breakdown = []
 
     # Get tier-specific monitoring configuration from service_tiers.py
-    tier_config = get_tier_config(service_tier)
+    tier_config = tenant_pricing.tier(service_tier)
     monitoring_config = tier_config.get("monitoring", {})
 
     monthly_cost = monitoring_config.get("monthly_cost", 0.0)
@@ -525,27 +1019,28 @@ def calculate_monitoring_costs(data_ingestion_gb: float, service_tier: str = "st
     features = monitoring_config.get("features", [])
     features_str = ", ".join(features)
 
-    breakdown.append(CostBreakdown(
-        category="Monitoring",
-        subcategory=f"{apm_tool} ({service_tier.title()} Tier)",
-        monthly_cost=monthly_cost,
-        annual_cost=monthly_cost * 12,
-        unit="service",
-        quantity=1,
-        notes=f"Features: {features_str}"
+    breakdown.append(BreakdownRecord(
+        "Monitoring",
+        (TXT_TIER_SERVICE, apm_tool, title_text(service_tier)),
+        monthly_cost,
+        "service",
+        1,
+        notes=(TXT_FEATURES, features_str)
     ))
 
     return monthly_cost, breakdown
 
-def calculate_memory_system_costs(memory_type: str, infrastructure: Dict[str, float], service_tier: str = "standard") -> tuple[float, List[CostBreakdown]]:
+def calculate_memory_system_costs(memory_type: str, infrastructure: Dict[str, float], service_tier: str = "standard",
+                                  tenant_pricing: TenantPricing = BASE_PRICING) -> tuple[float, List[BreakdownRecord]]:
     """
     Calculate memory system costs based on actual memory type selected.
     FIXED: Now honors the memory_type parameter instead of always using tier default.
     """
     breakdown = []
+    tier_title = title_text(service_tier)
 
     # Get tier-specific memory configuration as fallback
-    tier_config = get_tier_config(service_tier)
+    tier_config = tenant_pricing.tier(service_tier)
     tier_memory_config = tier_config.get("memory", {})
 
     # CRITICAL FIX: Honor the memory_type parameter if provided
@@ -559,94 +1054,54 @@ def calculate_memory_system_costs(memory_type: str, infrastructure: Dict[str, fl
             cosmos_ru = infrastructure.get("cosmos_ru", 15000)
             if cosmos_ru == 0:
                 cosmos_ru = 10000  # Minimum provisioned throughput for Cosmos DB
-            # Formula: (RU/s ÷ 100) × $0.012 AUD/hour × 730 hours
-            monthly_cost = (cosmos_ru / 100) * 0.012 * 730
-            capacity_str = f"{int(cosmos_ru):,} RU/s"
-            features_str = "Multi-model NoSQL, Global Distribution, Auto-scaling"
-
-            breakdown.append(CostBreakdown(
-                category="Memory System",
-                subcategory=f"Cosmos DB ({service_tier.title()} Tier)",
-                monthly_cost=monthly_cost,
-                annual_cost=monthly_cost * 12,
-                unit="RU/s",
-                quantity=cosmos_ru,
-                notes=f"{capacity_str} provisioned throughput. {features_str}",
-                calculation_formula=f"({int(cosmos_ru):,} RU/s ÷ 100) × $0.012/hour × 730 hours = ${monthly_cost:,.2f}/month",
-                cost_drivers=[
-                    f"Request Units: {int(cosmos_ru):,} RU/s (primary cost driver)",
-                    "Storage: Minimal impact at current scale",
-                    "Multi-region replication: If enabled",
-                    "Auto-scale vs provisioned: Currently provisioned"
-                ],
-                optimization_tips=[
-                    f"Current: {int(cosmos_ru):,} RU/s. Monitor actual usage to right-size.",
-                    "Enable auto-scale to pay only for RU/s used (vs provisioned)",
-                    "Use reserved capacity for 1-3 year terms (up to 63% savings)",
-                    "Optimize queries to reduce RU consumption",
-                    "Consider serverless mode for unpredictable workloads"
-                ]
+            monthly_cost, formula = tenant_pricing.compiled("cosmos_db").line(cosmos_ru=cosmos_ru)
+            ru = int(cosmos_ru)
+
+            breakdown.append(BreakdownRecord(
+                "Memory System",
+                (TXT_COSMOS_SUBCATEGORY, tier_title),
+                monthly_cost,
+                "RU/s",
+                cosmos_ru,
+                notes=(TXT_COSMOS_NOTES, ru),
+                formula=formula,
+                drivers=((TXT_COSMOS_DRIVER_RU, ru),) + COSMOS_DRIVERS_TAIL,
+                tips=((TXT_COSMOS_TIP_CURRENT, ru),) + COSMOS_TIPS_TAIL
             ))
 
         elif normalized_type == "redis":
             # Calculate Redis cost based on capacity
             capacity_gb = tier_memory_config.get("capacity_gb", 6)
-            # C6 (6GB) = $0.765/hour × 730 = $558.45/month
-            hourly_cost = 0.765 if capacity_gb >= 6 else 0.096  # C1 for < 6GB
-            monthly_cost = hourly_cost * 730
-
-            breakdown.append(CostBreakdown(
-                category="Memory System",
-                subcategory=f"Redis ({service_tier.title()} Tier)",
-                monthly_cost=monthly_cost,
-                annual_cost=monthly_cost * 12,
-                unit="GB",
-                quantity=capacity_gb,
-                notes=f"{capacity_gb}GB Azure Cache for Redis. Persistence enabled, Replication enabled",
-                calculation_formula=f"${hourly_cost}/hour × 730 hours = ${monthly_cost:,.2f}/month (C{6 if capacity_gb >= 6 else 1} tier)",
-                cost_drivers=[
-                    f"Cache size: {capacity_gb}GB (determines tier)",
-                    "Premium features: Persistence, Clustering, Geo-replication",
-                    "Azure Cache for Redis Standard/Premium tier",
-                    "Region: Australia East"
-                ],
-                optimization_tips=[
-                    "Use Basic tier if persistence not required (50% savings)",
-                    f"Monitor memory usage - if < {capacity_gb * 0.6}GB consistently, downsize",
-                    "Enable data eviction policies to reduce memory pressure",
-                    "Consider moving cold data to Cosmos DB or SQL"
-                ]
+            # C6 (6GB) premium cache; C1 for < 6GB
+            monthly_cost, formula = tenant_pricing.compiled("redis", "c6" if capacity_gb >= 6 else "c1").line()
+
+            breakdown.append(BreakdownRecord(
+                "Memory System",
+                (TXT_REDIS_SUBCATEGORY, tier_title),
+                monthly_cost,
+                "GB",
+                capacity_gb,
+                notes=(TXT_REDIS_NOTES, capacity_gb),
+                formula=formula,
+                drivers=((TXT_REDIS_DRIVER_SIZE, capacity_gb),) + REDIS_DRIVERS_TAIL,
+                tips=(TXT_REDIS_TIP_BASIC, (TXT_REDIS_TIP_MONITOR, capacity_gb * 0.6)) + REDIS_TIPS_TAIL
             ))
 
         elif normalized_type == "neo4j":
             # Calculate Neo4j cost based on number of nodes
             neo4j_nodes = int(infrastructure.get("neo4j_nodes", 1))
-            # Standard_D16s_v5 reserved: $0.691/hour per node
-            hourly_cost_per_node = 0.691
-            monthly_cost = hourly_cost_per_node * neo4j_nodes * 730
-
-            breakdown.append(CostBreakdown(
-                category="Memory System",
-                subcategory=f"Neo4j ({service_tier.title()} Tier)",
-                monthly_cost=monthly_cost,
-                annual_cost=monthly_cost * 12,
-                unit="nodes",
-                quantity=neo4j_nodes,
-                notes=f"{neo4j_nodes} Neo4j cluster nodes. Graph database for relationship mapping",
-                calculation_formula=f"{neo4j_nodes} nodes × ${hourly_cost_per_node}/hour × 730 hours = ${monthly_cost:,.2f}/month",
-                cost_drivers=[
-                    f"Number of nodes: {neo4j_nodes}",
-                    "VM SKU: Standard_D16s_v5 (16 vCPU, 64GB RAM) per node",
-                    "Reserved Instance pricing (1-year)",
-                    "Storage: Premium SSD for graph data",
-                    "High availability: Multi-node clustering"
-                ],
-                optimization_tips=[
-                    "Use single node for development/testing environments",
-                    f"Current: {neo4j_nodes} nodes. Scale down if graph < 1M nodes",
-                    "Consider managed graph services if operational overhead is high",
-                    "Optimize Cypher queries to reduce compute requirements"
-                ]
+            monthly_cost, formula = tenant_pricing.compiled("neo4j").line(neo4j_nodes=neo4j_nodes)
+
+            breakdown.append(BreakdownRecord(
+                "Memory System",
+                (TXT_NEO4J_SUBCATEGORY, tier_title),
+                monthly_cost,
+                "nodes",
+                neo4j_nodes,
+                notes=(TXT_NEO4J_NOTES, neo4j_nodes),
+                formula=formula,
+                drivers=((TXT_NEO4J_DRIVER_NODES, neo4j_nodes),) + NEO4J_DRIVERS_TAIL,
+                tips=(TXT_NEO4J_TIP_SINGLE, (TXT_NEO4J_TIP_CURRENT, neo4j_nodes)) + NEO4J_TIPS_TAIL
             ))
 
         elif normalized_type in ["in_memory", "in-memory"]:
@@ -654,26 +1109,16 @@ def calculate_memory_system_costs(memory_type: str, infrastructure: Dict[str, fl
             monthly_cost = 0.0
             capacity_gb = tier_memory_config.get("capacity_gb", 4)
 
-            breakdown.append(CostBreakdown(
-                category="Memory System",
-                subcategory=f"In-Memory ({service_tier.title()} Tier)",
-                monthly_cost=0.0,
-                annual_cost=0.0,
-                unit="GB",
-                quantity=capacity_gb,
-                notes=f"{capacity_gb}GB application memory. WARNING: Data lost on restart, not suitable for production",
-                calculation_formula="$0.00/month (uses application memory, no external service)",
-                cost_drivers=[
-                    "No infrastructure cost (uses app memory)",
-                    "Limited by container/VM memory allocation",
-                    "Non-persistent: Data lost on restart"
-                ],
-                optimization_tips=[
-                    "Only use for stateless applications or development",
-                    "Migrate to Redis for production workloads",
-                    "Implement external persistence for critical data",
-                    "WARNING: Not suitable for production use"
-                ]
+            breakdown.append(BreakdownRecord(
+                "Memory System",
+                (TXT_IN_MEMORY_SUBCATEGORY, tier_title),
+                0.0,
+                "GB",
+                capacity_gb,
+                notes=(TXT_IN_MEMORY_NOTES, capacity_gb),
+                formula=TXT_IN_MEMORY_FORMULA,
+                drivers=IN_MEMORY_DRIVERS,
+                tips=IN_MEMORY_TIPS
             ))
 
         else:
@@ -682,14 +1127,13 @@ def calculate_memory_system_costs(memory_type: str, infrastructure: Dict[str, fl
             memory_type_tier = tier_memory_config.get("type", "in_memory")
             capacity_gb = tier_memory_config.get("capacity_gb", 0)
 
-            breakdown.append(CostBreakdown(
-                category="Memory System",
-                subcategory=f"{memory_type_tier.title()} ({service_tier.title()} Tier - Default)",
-                monthly_cost=monthly_cost,
-                annual_cost=monthly_cost * 12,
-                unit="GB",
-                quantity=capacity_gb,
-                notes=f"Unknown memory type '{memory_type}', using tier default: {memory_type_tier}"
+            breakdown.append(BreakdownRecord(
+                "Memory System",
+                (TXT_MEMORY_DEFAULT_SUBCATEGORY, title_text(memory_type_tier), tier_title),
+                monthly_cost,
+                "GB",
+                capacity_gb,
+                notes=(TXT_MEMORY_UNKNOWN_NOTES, memory_type, memory_type_tier)
             ))
 
     else:
@@ -710,28 +1154,27 @@ def calculate_memory_system_costs(memory_type: str, infrastructure: Dict[str, fl
 
         features_str = ", ".join(features) if features else "No advanced features"
 
-        breakdown.append(CostBreakdown(
-            category="Memory System",
-            subcategory=f"{memory_type_tier.title()} ({service_tier.title()} Tier - Default)",
-            monthly_cost=monthly_cost,
-            annual_cost=monthly_cost * 12,
-            unit="GB",
-            quantity=capacity_gb,
-            notes=f"{capacity_gb}GB capacity. Features: {features_str}",
-            calculation_formula=f"Tier default configuration: ${monthly_cost:,.2f}/month",
-            cost_drivers=[
-                f"Service tier: {service_tier}",
-                f"Default memory type: {memory_type_tier}",
-                f"Capacity: {capacity_gb}GB"
-            ]
+        breakdown.append(BreakdownRecord(
+            "Memory System",
+            (TXT_MEMORY_DEFAULT_SUBCATEGORY, title_text(memory_type_tier), tier_title),
+            monthly_cost,
+            "GB",
+            capacity_gb,
+            notes=(TXT_MEMORY_DEFAULT_NOTES, capacity_gb, features_str),
+            formula=(TXT_MEMORY_DEFAULT_FORMULA, monthly_cost),
+            drivers=(
+                (TXT_MEMORY_DRIVER_TIER, service_tier),
+                (TXT_MEMORY_DRIVER_TYPE, memory_type_tier),
+                (TXT_MEMORY_DRIVER_CAPACITY, capacity_gb),
+            )
         ))
 
     return monthly_cost, breakdown
 
-def calculate_mcp_tools_costs(selected_tools: List[str], num_assessments: int = 4000) -> tuple[float, List[CostBreakdown]]:
+def calculate_mcp_tools_costs(selected_tools: List[str], num_assessments: int = 4000) -> tuple[float, List[BreakdownRecord]]:
     """Calculate MCP tools costs based on selected tools"""
     breakdown = []
-    
+
     # Calculate total monthly cost for MCP tools
     total_cost = 0.0
 
@@ -753,24 +1196,20 @@ def calculate_mcp_tools_costs(selected_tools: List[str], num_assessments: int =
             tool_cost = mcp_tool_pricing.get(tool_name, 0.0)
             total_cost += tool_cost
 
-            breakdown.append(CostBreakdown(
-                category="MCP Tools",
-                subcategory=tool_name,
-                monthly_cost=tool_cost,
-                annual_cost=tool_cost * 12,
-                unit="assessment",
-                quantity=num_assessments,
-                notes=f"Per assessment cost for {tool_name}"
+            breakdown.append(BreakdownRecord(
+                "MCP Tools", tool_name, tool_cost, "assessment", num_assessments,
+                notes=(TXT_MCP_NOTES, tool_name)
             ))
 
     return total_cost, breakdown
 
-def calculate_retrieval_costs(service_tier: str = "standard") -> tuple[float, List[CostBreakdown]]:
+def calculate_retrieval_costs(service_tier: str = "standard",
+                              tenant_pricing: TenantPricing = BASE_PRICING) -> tuple[float, List[BreakdownRecord]]:
     """Calculate retrieval/RAG costs based on service tier"""
     breakdown = []
 
     # Get tier-specific retrieval configuration from service_tiers.py
-    tier_config = get_tier_config(service_tier)
+    tier_config = tenant_pricing.tier(service_tier)
     retrieval_config = tier_config.get("retrieval", {})
 
     monthly_cost = retrieval_config.get("monthly_cost", 0.0)
@@ -786,24 +1225,24 @@ def calculate_retrieval_costs(service_tier: str = "standard") -> tuple[float, Li
 
     features_str = ", ".join(features) if features else f"Indexing: {indexing}"
 
-    breakdown.append(CostBreakdown(
-        category="Retrieval/RAG",
-        subcategory=f"{vector_db} ({service_tier.title()} Tier)",
-        monthly_cost=monthly_cost,
-        annual_cost=monthly_cost * 12,
-        unit="vectors",
-        quantity=max_vectors,
-        notes=f"{max_vectors:,} max vectors. {features_str}"
+    breakdown.append(BreakdownRecord(
+        "Retrieval/RAG",
+        (TXT_TIER_SERVICE, vector_db, title_text(service_tier)),
+        monthly_cost,
+        "vectors",
+        max_vectors,
+        notes=(TXT_RETRIEVAL_NOTES, max_vectors, features_str)
     ))
 
     return monthly_cost, breakdown
 
-def calculate_security_costs(service_tier: str = "standard") -> tuple[float, List[CostBreakdown]]:
+def calculate_security_costs(service_tier: str = "standard",
+                             tenant_pricing: TenantPricing = BASE_PRICING) -> tuple[float, List[BreakdownRecord]]:
     """Calculate security costs based on service tier"""
     breakdown = []
 
     # Get tier-specific security configuration from service_tiers.py
-    tier_config = get_tier_config(service_tier)
+    tier_config = tenant_pricing.tier(service_tier)
     security_config = tier_config.get("security", {})
 
     monthly_cost = security_config.get("monthly_cost", 0.0)
@@ -814,24 +1253,24 @@ def calculate_security_costs(service_tier: str = "standard") -> tuple[float, Lis
     compliance = security_config.get("compliance", [])
     compliance_str = f" Compliance: {', '.join(compliance)}" if compliance else ""
 
-    breakdown.append(CostBreakdown(
-        category="Security",
-        subcategory=f"{level.title()} Security ({service_tier.title()} Tier)",
-        monthly_cost=monthly_cost,
-        annual_cost=monthly_cost * 12,
-        unit="service",
-        quantity=1,
-        notes=f"Features: {features_str}.{compliance_str}"
+    breakdown.append(BreakdownRecord(
+        "Security",
+        (TXT_SECURITY_SUBCATEGORY, title_text(level), title_text(service_tier)),
+        monthly_cost,
+        "service",
+        1,
+        notes=(TXT_SECURITY_NOTES, features_str, compliance_str)
     ))
 
     return monthly_cost, breakdown
 
-def calculate_prompt_tuning_costs(service_tier: str = "standard") -> tuple[float, List[CostBreakdown]]:
+def calculate_prompt_tuning_costs(service_tier: str = "standard",
+                                  tenant_pricing: TenantPricing = BASE_PRICING) -> tuple[float, List[BreakdownRecord]]:
     """Calculate prompt tuning costs based on service tier"""
     breakdown = []
 
     # Get tier-specific prompt tuning configuration from service_tiers.py
-    tier_config = get_tier_config(service_tier)
+    tier_config = tenant_pricing.tier(service_tier)
     prompt_tuning_config = tier_config.get("prompt_tuning", {})
 
     monthly_cost = prompt_tuning_config.get("monthly_cost", 0.0)
@@ -839,24 +1278,24 @@ def calculate_prompt_tuning_costs(service_tier: str = "standard") -> tuple[float
     features = prompt_tuning_config.get("features", [])
     features_str = ", ".join(features)
 
-    breakdown.append(CostBreakdown(
-        category="Prompt Tuning",
-        subcategory=f"{approach.replace('_', ' ').title()} ({service_tier.title()} Tier)",
-        monthly_cost=monthly_cost,
-        annual_cost=monthly_cost * 12,
-        unit="service",
-        quantity=1,
-        notes=f"Features: {features_str}"
+    breakdown.append(BreakdownRecord(
+        "Prompt Tuning",
+        (TXT_TIER_SERVICE, title_text(approach.replace("_", " ")), title_text(service_tier)),
+        monthly_cost,
+        "service",
+        1,
+        notes=(TXT_FEATURES, features_str)
     ))
 
     return monthly_cost, breakdown
 
-def apply_service_tier_config(params: CostCalculatorRequest) -> CostCalculatorRequest:
-    """Apply service tier configuration to request parameters"""
+def apply_service_tier_config(params: CostCalculatorRequest,
+                              tenant_pricing: TenantPricing = BASE_PRICING) -> CostCalculatorRequest:
+    """Apply service tier configuration (the tenant's tiers when given) to request parameters"""
 
-    # If service_tier is provided and exists in SERVICE_TIERS
-    if params.service_tier and params.service_tier.lower() in SERVICE_TIERS:
-        tier_config = SERVICE_TIERS[params.service_tier.lower()]
+    # If service_tier is provided and exists in the tiers
+    if params.service_tier and params.service_tier.lower() in tenant_pricing.tiers:
+        tier_config = tenant_pricing.tiers[params.service_tier.lower()]
 
         # Override LLM mix with tier configuration (using deployment_type)
         # Build LLM mix based on available models in tier
@@ -874,26 +1313,113 @@ def apply_service_tier_config(params: CostCalculatorRequest) -> CostCalculatorRe
         features = tier_config.get("features", {})
         params.use_prompt_caching = features.get("use_prompt_caching", True)
         params.use_reserved_instances = features.get("use_reserved_instances", False)
+        params.use_batch_processing = features.get("use_batch_processing", False)
 
     return params
 
+def batch_api(model: str, as_of: Optional[date] = None,
+              tenant_pricing: TenantPricing = BASE_PRICING) -> Optional[Dict[str, Any]]:
+    """Batch API terms of a model (provider, discount, typical and max turnaround), or None if it has none"""
+    pricing = llm_pricing_as_of(as_of, tenant_pricing)[0].get(model)
+    if not pricing or "batch_discount" not in pricing:
+        return None
+    return {**BATCH_API_PRICING[pricing["provider"]], "provider": pricing["provider"], "discount": pricing["batch_discount"]}
+
+def route_batch_queries(llm_mix: Dict[str, float], agents: List[AgentLatencyTolerance],
+                        max_turnaround_hours: float, as_of: Optional[date] = None,
+                        tenant_pricing: TenantPricing = BASE_PRICING) -> Dict[str, float]:
+    """
+    Fraction of each model's queries sent to its provider's batch API. Every
+    agent's queries spread over llm_mix alike; an agent's queries are batched
+    on a model when its latency tolerance covers the provider's typical
+    turnaround, and that turnaround is within max_turnaround_hours.
+    """
+    if sum(a.query_share for a in agents) > 100.0 + 1e-9:
+        raise HTTPException(status_code=400, detail="Agent query shares must not exceed 100%")
+
+    shares = {}
+    for model, percentage in llm_mix.items():
+        terms = batch_api(model, as_of, tenant_pricing)
+        if percentage <= 0 or terms is None or terms["typical_turnaround_hours"] > max_turnaround_hours:
+            continue
+        share = sum(a.query_share for a in agents if a.latency_tolerance_hours >= terms["typical_turnaround_hours"]) / 100
+        if share > 0:
+            shares[model] = share
+    return shares
+
+def plan_on_premise_gpus(params: CostCalculatorRequest, tenant_pricing: TenantPricing = BASE_PRICING) -> GpuFleetPlan:
+    """
+    GPU placement for the on-premise models of llm_mix (tier config applied):
+    weights at gpu_precision plus a KV cache per concurrent sequence, each
+    sequence holding the tier's max input + output tokens (up to the model's
+    context length). Concurrent sequences are split across models by mix share.
+    """
+    if params.gpu_precision not in MODEL_PRECISION_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"GPU precision '{params.gpu_precision}' not supported. Available: {list(MODEL_PRECISION_BYTES)}"
+        )
+    unknown = [model for model, percentage in params.llm_mix.items() if percentage > 0 and model not in ON_PREMISE_MODEL_SPECS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No self-hosting spec for {unknown}. Available: {list(ON_PREMISE_MODEL_SPECS)}"
+        )
+
+    limits = tenant_pricing.tiers.get(params.service_tier.lower(), {}).get("limits", {})
+    context = limits.get("max_input_tokens", params.avg_input_tokens) + limits.get("max_output_tokens", params.avg_output_tokens)
+    concurrency = params.concurrent_sequences or min(params.num_users, limits.get("max_concurrent_users", params.num_users))
+    bytes_per_param = MODEL_PRECISION_BYTES[params.gpu_precision]
+
+    demands = []
+    for model, percentage in params.llm_mix.items():
+        if percentage <= 0:
+            continue
+        spec = ON_PREMISE_MODEL_SPECS[model]
+        kv_per_token = kv_cache_gb_per_token(spec["layers"], spec["kv_heads"], spec["head_dim"])
+        demands.append(ModelDemand(
+            model,
+            spec["params_b"] * bytes_per_param,
+            kv_per_token * min(context, spec["max_context"]),
+            math.ceil(concurrency * percentage / 100),
+        ))
+    try:
+        return plan_gpu_fleet(demands, tenant_pricing.rate_card["gpu"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ===========================
 # MAIN COST CALCULATION
 # ===========================
 
-async def calculate_costs(params: CostCalculatorRequest):
-    """Calculate comprehensive costs for AI agent deployment"""
+def canonical_request(params: CostCalculatorRequest) -> str:
+    """Request as canonical JSON (sorted keys, no whitespace)"""
+    return json.dumps(params.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
 
-    # Apply service tier configuration (Basic, Standard, Premium)
-    params = apply_service_tier_config(params)
+def calculation_key(canonical: str, pricing_version: str = PRICING_VERSION) -> str:
+    """Content address of a calculation: SHA-256 of pricing version + canonical request"""
+    return hashlib.sha256(f"{pricing_version}\n{canonical}".encode("utf-8")).hexdigest()
 
-    # Validate agent type
-    if params.agent_type not in AI_AGENTS:
+def validate_agent_type(agent_type: str):
+    """400 when an agent type is not in AI_AGENTS"""
+    if agent_type not in AI_AGENTS:
         raise HTTPException(
             status_code=400,
-            detail=f"Agent type '{params.agent_type}' not supported. Available: {list(AI_AGENTS.keys())}"
+            detail=f"Agent type '{agent_type}' not supported. Available: {list(AI_AGENTS.keys())}"
         )
 
+def compute_costs(params: CostCalculatorRequest) -> "CostCalculatorResponse":
+    """Calculate comprehensive costs for AI agent deployment"""
+
+    # Pricing of the request's tenant (shared catalog without one)
+    tenant_pricing = get_tenant_pricing(params.tenant)
+
+    # Apply service tier configuration (Basic, Standard, Premium)
+    params = apply_service_tier_config(params, tenant_pricing)
+
+    # Validate agent type
+    validate_agent_type(params.agent_type)
+
     # Get agent configuration
     agent = AI_AGENTS[params.agent_type]
 
@@ -902,7 +1428,8 @@ async def calculate_costs(params: CostCalculatorRequest):
         params.agent_type,
         params.service_tier,
         params.infrastructure_scale,
-        None  # No custom infrastructure for now
+        params.custom_infrastructure,
+        tenant_pricing
     )
 
     # Calculate costs
@@ -919,34 +1446,43 @@ async def calculate_costs(params: CostCalculatorRequest):
         params.cache_hit_rate,
         params.use_prompt_caching,
         deployment_type=params.deployment_type,
-        service_tier=params.service_tier
+        service_tier=params.service_tier,
+        cache_hit_rates=params.cache_hit_rates,
+        gpu_plan=plan_on_premise_gpus(params, tenant_pricing) if params.deployment_type == "on_premise" and params.gpu_placement else None,
+        gpu_precision=params.gpu_precision,
+        batch_shares=route_batch_queries(
+            params.llm_mix, params.agent_latency_tolerances, params.max_batch_turnaround_hours, params.as_of, tenant_pricing
+        ) if params.use_batch_processing and params.agent_latency_tolerances else None,
+        as_of=params.as_of,
+        tenant_pricing=tenant_pricing
     )
 
     # Calculate infrastructure costs
-    infra_total, infra_breakdown = calculate_infrastructure_costs(infra, params.use_reserved_instances)
+    infra_total, infra_breakdown = calculate_infrastructure_costs(infra, params.use_reserved_instances, tenant_pricing)
 
     # Calculate tier-based costs using service_tiers.py configurations
-    data_total, data_breakdown = calculate_data_source_costs(params.agent_type, params.service_tier)
+    data_total, data_breakdown = calculate_data_source_costs(params.agent_type, params.service_tier, tenant_pricing)
 
     # Estimate data ingestion for monitoring (based on queries and users)
     estimated_data_gb = (params.num_users * params.queries_per_user_per_month * 0.001) + 100  # Base 100GB
-    monitor_total, monitor_breakdown = calculate_monitoring_costs(estimated_data_gb, params.service_tier)
+    monitor_total, monitor_breakdown = calculate_monitoring_costs(estimated_data_gb, params.service_tier, tenant_pricing)
 
     # Calculate MEMORY SYSTEM costs (tier-based)
     memory_total, memory_breakdown = calculate_memory_system_costs(
         memory_type=params.memory_type,
         infrastructure=infra,
-        service_tier=params.service_tier
+        service_tier=params.service_tier,
+        tenant_pricing=tenant_pricing
     )
 
     # Calculate RETRIEVAL/RAG costs (NEW - tier-based)
-    retrieval_total, retrieval_breakdown = calculate_retrieval_costs(params.service_tier)
+    retrieval_total, retrieval_breakdown = calculate_retrieval_costs(params.service_tier, tenant_pricing)
 
     # Calculate SECURITY costs (NEW - tier-based)
-    security_total, security_breakdown = calculate_security_costs(params.service_tier)
+    security_total, security_breakdown = calculate_security_costs(params.service_tier, tenant_pricing)
 
     # Calculate PROMPT TUNING costs (NEW - tier-based)
-    prompt_tuning_total, prompt_tuning_breakdown = calculate_prompt_tuning_costs(params.service_tier)
+    prompt_tuning_total, prompt_tuning_breakdown = calculate_prompt_tuning_costs(params.service_tier, tenant_pricing)
 
     # Calculate MCP TOOLS costs (user-selected)
     total_queries = params.num_users * params.queries_per_user_per_month
@@ -955,8 +1491,18 @@ async def calculate_costs(params: CostCalculatorRequest):
         total_queries
     )
 
+    # Effective cache hit rate (mix-weighted when per-model rates are provided)
+    cache_hit_rate = params.cache_hit_rate
+    if params.cache_hit_rates:
+        mix_total = sum(pct for pct in params.llm_mix.values() if pct > 0)
+        if mix_total > 0:
+            cache_hit_rate = sum(
+                pct * params.cache_hit_rates.get(model, params.cache_hit_rate)
+                for model, pct in params.llm_mix.items() if pct > 0
+            ) / mix_total
+
     # Calculate savings
-    cache_savings = llm_total * (1 - params.cache_hit_rate) if params.use_prompt_caching else 0
+    cache_savings = llm_total * (1 - cache_hit_rate) if params.use_prompt_caching else 0
     reserved_savings = infra_total * 0.5 if params.use_reserved_instances else 0
 
     # Calculate totals (INCLUDING all tier-based costs)
@@ -989,7 +1535,7 @@ async def calculate_costs(params: CostCalculatorRequest):
         total_queries_per_month=total_queries,
 
         # Efficiency Metrics
-        cache_hit_rate=params.cache_hit_rate,
+        cache_hit_rate=cache_hit_rate,
         avg_tokens_per_query=int(params.avg_input_tokens + params.avg_output_tokens),
         cost_per_query=round(cost_per_query, 4),
         cost_per_1k_tokens=round(cost_per_1k_tokens, 4),
@@ -1028,16 +1574,95 @@ async def calculate_costs(params: CostCalculatorRequest):
         global_usage_metrics=global_usage_metrics  # NEW: Global Usage Parameters
     )
 
+# Single-flight: in-progress calculations by calculation_key
+_inflight_calculations: Dict[str, asyncio.Future] = {}
+SINGLE_FLIGHT_STATS = {"computed": 0, "coalesced": 0}
+
+async def calculate_costs(params: CostCalculatorRequest, canonical: Optional[str] = None) -> CostCalculatorResponse:
+    """
+    Calculate comprehensive costs for AI agent deployment.
+    Identical concurrent requests (same canonical request and pricing version)
+    await a single computation, run off the event loop, and share its result.
+    Pass canonical when it has already been computed for the request.
+    """
+    key = calculation_key(canonical or canonical_request(params), request_pricing_version(params))
+    inflight = _inflight_calculations.get(key)
+    if inflight is not None:
+        SINGLE_FLIGHT_STATS["coalesced"] += 1
+        response = await asyncio.shield(inflight)
+        return response.model_copy()
+
+    # The computation runs in its own task: cancelling the request that started it
+    # (e.g. a client disconnect) does not cancel it for the requests awaiting it
+    task = _inflight_calculations[key] = asyncio.ensure_future(_shared_calculation(key, params))
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())  # retrieved even with no waiters
+    SINGLE_FLIGHT_STATS["computed"] += 1
+    return await asyncio.shield(task)
+
+async def _shared_calculation(key: str, params: CostCalculatorRequest) -> CostCalculatorResponse:
+    try:
+        return await run_in_threadpool(compute_costs, params)
+    finally:
+        del _inflight_calculations[key]
+
+
 # ===========================
 # API ROUTES
 # ===========================
 
+# Upper bound on requests in one /calculate/batch or /calculate-agent/batch call
+MAX_BATCH_CALCULATIONS = 100
+
 router = APIRouter()
 
+async def calculate_and_record(params: CostCalculatorRequest) -> CostCalculatorResponse:
+    """Calculate costs and record the quote (as /calculate does)"""
+    from app.storage.quote_store import get_quote_store
+
+    # Canonicalize before the calculation applies tier overrides to params
+    canonical = canonical_request(params)
+    response = await calculate_costs(params, canonical)
+    response.quote_id = calculation_key(canonical, request_pricing_version(params))
+    get_quote_store().submit(params, response, canonical)
+    return response
+
 @router.post("/calculate", response_model=CostCalculatorResponse)
 async def calculate_costs_endpoint(params: CostCalculatorRequest):
     """Calculate comprehensive costs for AI agent deployment"""
-    return await calculate_costs(params)
+    response = await calculate_and_record(params)
+    # Serialize directly: the breakdown records are rendered once, not re-validated
+    return Response(response.model_dump_json(), media_type="application/json")
+
+@router.post("/calculate/batch", response_model=List[CostCalculatorResponse])
+async def calculate_costs_batch_endpoint(items: List[CostCalculatorRequest]):
+    """Calculate many requests in one call (responses in request order, each quote recorded)"""
+    if len(items) > MAX_BATCH_CALCULATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_CALCULATIONS} calculations per batch")
+    responses = await asyncio.gather(*(calculate_and_record(params) for params in items))
+    return Response(
+        "[" + ",".join(response.model_dump_json() for response in responses) + "]",
+        media_type="application/json"
+    )
+
+@router.get("/calculate/single-flight")
+async def single_flight_stats():
+    """Counters for calculations computed vs. coalesced onto an identical in-flight calculation"""
+    return {
+        **SINGLE_FLIGHT_STATS,
+        "in_flight": len(_inflight_calculations),
+        "pricing_version": PRICING_VERSION,
+    }
+
+@router.get("/formulas")
+async def list_cost_formulas():
+    """Declared cost lines: symbolic formula and partial derivatives (for an example rate-card key)"""
+    return {
+        "pricing_version": PRICING_VERSION,
+        "cost_lines": {
+            name: {"example_key": list(key), **compiled_cost(name, *key).describe()}
+            for name, (_, key) in COST_LINES.items()
+        },
+    }
 
 @router.get("/agents")
 async def list_agents():
@@ -1113,8 +1738,7 @@ async def get_tier_models(tier_id: str, deployment_type: str = "cloud_api"):
         "models": models
     }
 
-@router.post("/calculate-agent", response_model=AgentCostResponse)
-async def calculate_agent_cost_endpoint(params: AgentCostRequest):
+def calculate_agent_cost(params: AgentCostRequest) -> AgentCostResponse:
     """
     Calculate LLM costs for a SINGLE agent only (no infrastructure costs).
     This endpoint is designed for per-agent cost calculation in the Sales Coach UI.
@@ -1122,9 +1746,9 @@ async def calculate_agent_cost_endpoint(params: AgentCostRequest):
     # Calculate total queries for this agent
     total_queries = params.num_users * params.queries_per_user_per_month
 
-    # Calculate input/output tokens (70/30 split)
-    avg_input_tokens = int(params.avg_tokens_per_request * 0.7)
-    avg_output_tokens = int(params.avg_tokens_per_request * 0.3)
+    # Calculate input/output tokens (70/30 split by default)
+    avg_input_tokens = int(params.avg_tokens_per_request * params.input_token_share)
+    avg_output_tokens = int(params.avg_tokens_per_request * (1 - params.input_token_share))
 
     total_input_tokens = total_queries * avg_input_tokens
     total_output_tokens = total_queries * avg_output_tokens
@@ -1176,3 +1800,15 @@ async def calculate_agent_cost_endpoint(params: AgentCostRequest):
         llm_model=params.llm_model,
         deployment_type=params.deployment_type
     )
+
+@router.post("/calculate-agent", response_model=AgentCostResponse)
+async def calculate_agent_cost_endpoint(params: AgentCostRequest):
+    """Calculate LLM costs for a single agent (no infrastructure costs)"""
+    return calculate_agent_cost(params)
+
+@router.post("/calculate-agent/batch", response_model=List[AgentCostResponse])
+def calculate_agent_cost_batch_endpoint(items: List[AgentCostRequest]):
+    """Calculate many single-agent requests in one call (responses in request order)"""
+    if len(items) > MAX_BATCH_CALCULATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_CALCULATIONS} calculations per batch")
+    return [calculate_agent_cost(params) for params in items]
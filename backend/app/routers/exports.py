@@ -0,0 +1,341 @@
+import itertools
+import math
+from datetime import date
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    CostCalculatorResponse,
+    apply_service_tier_config,
+    calculate_costs,
+    get_tenant_pricing,
+    llm_pricing_as_of,
+    plan_on_premise_gpus,
+    route_batch_queries,
+    validate_agent_type,
+)
+
+# Rows per Arrow record batch / Parquet row group
+EXPORT_BATCH_ROWS = 65536
+
+# Upper bound on scenarios in one export
+MAX_EXPORT_SCENARIOS = 100_000
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+EXPORT_LEVELS = ("breakdown", "totals")
+
+# Response fields holding CostBreakdown lists, in report order
+BREAKDOWN_FIELDS = tuple(name for name in CostCalculatorResponse.model_fields if name.endswith("_breakdown"))
+
+# CostBreakdown (or BreakdownRecord) attributes exported at the "breakdown" level
+BREAKDOWN_COLUMNS = ("category", "subcategory", "unit", "monthly_cost", "annual_cost", "quantity", "notes", "calculation_formula")
+
+# Per-scenario totals exported at the "totals" level
+TOTAL_FIELDS = (
+    "total_monthly_cost",
+    "total_annual_cost",
+    "llm_costs",
+    "infrastructure_costs",
+    "data_source_costs",
+    "monitoring_costs",
+    "memory_system_costs",
+    "retrieval_costs",
+    "security_costs",
+    "prompt_tuning_costs",
+    "mcp_tools_costs",
+    "savings_from_caching",
+    "savings_from_reserved_instances",
+)
+
+# Request fields that can make a calculation fail (tenant, pricing date, agent, tier,
+# GPU placement fit, batch routing); a sweep is checked once per combination of these
+CHECKED_FIELDS = (
+    "tenant", "as_of", "agent_type", "service_tier", "deployment_type", "gpu_placement", "gpu_precision",
+    "concurrent_sequences", "num_users", "avg_input_tokens", "avg_output_tokens",
+    "use_batch_processing", "max_batch_turnaround_hours",
+)
+
+DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+
+# Arrow types of request fields that can be swept (as_of sweeps the pricing history)
+_SWEEP_TYPES = {int: pa.int64(), float: pa.float64(), bool: pa.bool_(), str: DICTIONARY_STRING, Optional[date]: pa.date32()}
+
+# ===========================
+# MODELS
+# ===========================
+
+class ExportRequest(BaseModel):
+    base: CostCalculatorRequest = Field(default=CostCalculatorRequest())
+    sweep: Dict[str, List[Any]] = Field(
+        default={},
+        description="Request fields to sweep (e.g. {\"num_users\": [100, 500], \"service_tier\": [\"basic\", \"premium\"]}); "
+                    "every combination is calculated from base"
+    )
+    scenarios: List[CostCalculatorRequest] = Field(
+        default=[],
+        description="Explicit batch of calculations (used instead of base/sweep when given)"
+    )
+    level: str = Field(default="breakdown", description="breakdown (one row per CostBreakdown) or totals (one row per scenario)")
+    format: str = Field(default="arrow", description="arrow (IPC stream) or parquet")
+
+# ===========================
+# ARROW ENCODING
+# ===========================
+
+class DictionaryEncoder:
+    """
+    Append-only string dictionary shared by every batch of a column, so the
+    IPC stream only sends dictionary deltas after the first batch.
+    """
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, items: List[str]) -> pa.DictionaryArray:
+        indices = []
+        for item in items:
+            code = self.codes.get(item)
+            if code is None:
+                code = self.codes[item] = len(self.values)
+                self.values.append(item)
+            indices.append(code)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(self.values, pa.string()))
+
+class ChunkSink:
+    """Write-only file object collecting bytes until they are drained into the response"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def export_schema(level: str, sweep_fields: List[str]) -> pa.Schema:
+    """Typed columns of an export; category-like strings are dictionary-encoded"""
+    fields = [pa.field("scenario", pa.int64(), nullable=False)]
+    for name in sweep_fields:
+        if name == "deployment_type":
+            continue  # always exported below
+        fields.append(pa.field(name, _SWEEP_TYPES[CostCalculatorRequest.model_fields[name].annotation]))
+    fields += [
+        pa.field("tier", DICTIONARY_STRING),
+        pa.field("deployment_type", DICTIONARY_STRING),
+    ]
+    if level == "breakdown":
+        fields += [
+            pa.field("category", DICTIONARY_STRING),
+            pa.field("subcategory", DICTIONARY_STRING),
+            pa.field("unit", DICTIONARY_STRING),
+            pa.field("monthly_cost", pa.float64()),
+            pa.field("annual_cost", pa.float64()),
+            pa.field("quantity", pa.float64()),
+            pa.field("notes", pa.string()),
+            pa.field("calculation_formula", pa.string()),
+        ]
+    else:
+        fields += [pa.field(name, pa.float64()) for name in TOTAL_FIELDS]
+        fields += [
+            pa.field("queries_per_month", pa.int64()),
+            pa.field("input_tokens_per_month", pa.int64()),
+            pa.field("output_tokens_per_month", pa.int64()),
+        ]
+    return pa.schema(fields)
+
+# ===========================
+# SCENARIOS & STREAMING
+# ===========================
+
+def check_scenario(scenario: CostCalculatorRequest):
+    """
+    The checks calculate_costs makes before pricing anything (400 when the tenant
+    has no overlay, as_of precedes the pricing history, the agent is unknown,
+    the GPU plan does not fit or batch shares exceed 100%)
+    """
+    tenant_pricing = get_tenant_pricing(scenario.tenant)
+    llm_pricing_as_of(scenario.as_of, tenant_pricing)
+    params = apply_service_tier_config(scenario.model_copy(deep=True), tenant_pricing)
+    validate_agent_type(params.agent_type)
+    if params.deployment_type == "on_premise" and params.gpu_placement:
+        plan_on_premise_gpus(params, tenant_pricing)
+    if params.use_batch_processing and params.agent_latency_tolerances:
+        route_batch_queries(
+            params.llm_mix, params.agent_latency_tolerances, params.max_batch_turnaround_hours, params.as_of, tenant_pricing
+        )
+
+def _check(scenario: CostCalculatorRequest, label: str):
+    try:
+        check_scenario(scenario)
+    except HTTPException as e:
+        raise HTTPException(status_code=e.status_code, detail=f"{label}: {e.detail}")
+
+def validate_sweep(params: ExportRequest) -> List[str]:
+    """
+    Check sweep fields and values, then every distinct combination of CHECKED_FIELDS,
+    up front, so a streaming export cannot fail part-way on bad input
+    """
+    if params.level not in EXPORT_LEVELS or params.format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported level/format. Available: {list(EXPORT_LEVELS)} / {list(EXPORT_FORMATS)}"
+        )
+    if params.scenarios:
+        if len(params.scenarios) > MAX_EXPORT_SCENARIOS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_EXPORT_SCENARIOS} scenarios per export")
+        for index, scenario in enumerate(params.scenarios):
+            _check(scenario, f"Scenario {index}")
+        return []
+
+    base = params.base.model_dump()
+    for name, values in params.sweep.items():
+        field = CostCalculatorRequest.model_fields.get(name)
+        if field is None or field.annotation not in _SWEEP_TYPES:
+            raise HTTPException(status_code=400, detail=f"Field '{name}' cannot be swept (scalar request fields only)")
+        if not values:
+            raise HTTPException(status_code=400, detail=f"Sweep values for '{name}' are empty")
+        for value in values:
+            try:
+                CostCalculatorRequest(**{**base, name: value})
+            except ValidationError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid sweep value {name}={value!r}: {e.errors()[0]['msg']}")
+
+    count = math.prod(len(values) for values in params.sweep.values())
+    if count > MAX_EXPORT_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"Sweep has {count} scenarios; at most {MAX_EXPORT_SCENARIOS} per export")
+
+    # Other swept fields cannot fail a calculation, so each checked combination stands for all of its scenarios
+    checked = [name for name in params.sweep if name in CHECKED_FIELDS]
+    for combo in itertools.product(*(params.sweep[name] for name in checked)):
+        values = dict(zip(checked, combo))
+        label = ", ".join(f"{name}={value!r}" for name, value in values.items()) or "Base scenario"
+        _check(CostCalculatorRequest(**{**base, **values}), label)
+    return list(params.sweep)
+
+def iter_scenarios(params: ExportRequest, sweep_fields: List[str]) -> Iterator[Tuple[CostCalculatorRequest, Dict[str, Any]]]:
+    """Scenarios with their swept values, generated lazily"""
+    if params.scenarios:
+        for scenario in params.scenarios:
+            yield scenario.model_copy(deep=True), {}
+        return
+
+    base = params.base.model_dump()
+    for combo in itertools.product(*(params.sweep[name] for name in sweep_fields)):
+        scenario = CostCalculatorRequest(**{**base, **dict(zip(sweep_fields, combo))})
+        # Swept values as validated (e.g. as_of strings parsed to dates)
+        yield scenario, {name: getattr(scenario, name) for name in sweep_fields}
+
+class ExportBatchBuilder:
+    """Accumulates rows column-wise and emits typed record batches"""
+
+    def __init__(self, schema: pa.Schema):
+        self.schema = schema
+        self.encoders = {f.name: DictionaryEncoder() for f in schema if f.type == DICTIONARY_STRING}
+        self.columns: Dict[str, list] = {f.name: [] for f in schema}
+        self.rows = 0
+
+    def add(self, row: Dict[str, Any]):
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+        self.rows += 1
+
+    def build(self) -> pa.RecordBatch:
+        arrays = []
+        for f in self.schema:
+            values = self.columns[f.name]
+            arrays.append(self.encoders[f.name].encode(values) if f.name in self.encoders else pa.array(values, f.type))
+            values.clear()
+        self.rows = 0
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+def _scenario_rows(index: int, swept: Dict[str, Any], scenario: CostCalculatorRequest,
+                   response: CostCalculatorResponse, level: str) -> Iterator[Dict[str, Any]]:
+    common = {"scenario": index, **swept, "tier": scenario.service_tier.lower(), "deployment_type": scenario.deployment_type}
+    if level == "totals":
+        yield {**common, **{name: getattr(response, name) for name in TOTAL_FIELDS},
+               "queries_per_month": response.queries_per_month,
+               "input_tokens_per_month": response.input_tokens_per_month,
+               "output_tokens_per_month": response.output_tokens_per_month}
+        return
+    for field in BREAKDOWN_FIELDS:
+        for item in getattr(response, field):
+            yield {**common, **{name: getattr(item, name) for name in BREAKDOWN_COLUMNS}}
+
+class ExportAborted(RuntimeError):
+    """A scenario failed after the export response started"""
+
+async def stream_export(params: ExportRequest, sweep_fields: List[str]):
+    """
+    Calculate every scenario and stream the rows as Arrow IPC or Parquet,
+    one record batch (row group) at a time, so memory stays bounded by
+    EXPORT_BATCH_ROWS regardless of export size.
+    """
+    schema = export_schema(params.level, sweep_fields)
+    sink = ChunkSink()
+    if params.format == "arrow":
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+    else:
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    builder = ExportBatchBuilder(schema)
+    for index, (scenario, swept) in enumerate(iter_scenarios(params, sweep_fields)):
+        try:
+            response = await calculate_costs(scenario)
+        except HTTPException as e:
+            # Headers are sent: abort the stream (no end-of-stream marker or Parquet footer) instead of ending it cleanly
+            raise ExportAborted(f"Export aborted at scenario {index}: {e.detail}") from e
+        for row in _scenario_rows(index, swept, scenario, response, params.level):
+            builder.add(row)
+        if builder.rows >= EXPORT_BATCH_ROWS:
+            writer.write_batch(builder.build())
+            yield sink.drain()
+
+    if builder.rows or params.format == "arrow":
+        writer.write_batch(builder.build())
+    writer.close()
+    yield sink.drain()
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/export/calculations")
+async def export_calculations(params: ExportRequest):
+    """Stream a sweep or batch of calculations as an Arrow IPC stream or Parquet file"""
+    sweep_fields = validate_sweep(params)
+    media_type, extension = EXPORT_FORMATS[params.format]
+    return StreamingResponse(
+        stream_export(params, sweep_fields),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="cost_{params.level}.{extension}"'},
+    )
@@ -0,0 +1,89 @@
+from typing import List, Dict
+
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    apply_service_tier_config,
+    calculate_llm_costs,
+    get_tenant_pricing,
+    plan_on_premise_gpus,
+)
+
+# ===========================
+# MODELS
+# ===========================
+
+class ModelPlacementInfo(BaseModel):
+    model: str
+    gpu_type: str
+    gpus_per_replica: int
+    nodes_per_replica: int = Field(default=1, description="Nodes of 8 GPUs a replica spans as pipeline stages")
+    replicas: int
+    sequences_per_replica: int
+    memory_gb: float
+    shared_gpu: bool = Field(description="Last replica shares its GPU with other models")
+
+class SharedGpu(BaseModel):
+    gpu_type: str
+    models: List[str]
+    used_gb: float
+
+class GpuPlacementResponse(BaseModel):
+    service_tier: str
+    gpu_precision: str
+    gpus: Dict[str, int]
+    placements: List[ModelPlacementInfo]
+    shared_gpus: List[SharedGpu]
+    monthly_cost: float
+    tier_allocation_monthly_cost: float
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/gpu/placement", response_model=GpuPlacementResponse)
+def gpu_placement_endpoint(params: CostCalculatorRequest):
+    """
+    Memory-fit GPU fleet for the on-premise models of a calculation, next to
+    the cost of the tier GPU allocation /calculate uses without gpu_placement
+    """
+    tenant_pricing = get_tenant_pricing(params.tenant)
+    params = apply_service_tier_config(params.model_copy(update={"deployment_type": "on_premise"}), tenant_pricing)
+    plan = plan_on_premise_gpus(params, tenant_pricing)
+
+    llm_args = (params.llm_mix, 0, 0, 0, params.cache_hit_rate, params.use_prompt_caching)
+    monthly_cost, _ = calculate_llm_costs(
+        *llm_args, deployment_type="on_premise", service_tier=params.service_tier, gpu_plan=plan,
+        tenant_pricing=tenant_pricing
+    )
+    tier_cost, _ = calculate_llm_costs(
+        *llm_args, deployment_type="on_premise", service_tier=params.service_tier, tenant_pricing=tenant_pricing
+    )
+
+    return GpuPlacementResponse(
+        service_tier=params.service_tier,
+        gpu_precision=params.gpu_precision,
+        gpus=plan.gpus,
+        placements=[
+            ModelPlacementInfo(
+                model=p.model,
+                gpu_type=p.gpu_type,
+                gpus_per_replica=p.gpus_per_replica,
+                nodes_per_replica=p.nodes_per_replica,
+                replicas=p.replicas,
+                sequences_per_replica=p.sequences_per_replica,
+                memory_gb=p.memory_gb,
+                shared_gpu=p.shared,
+            )
+            for p in plan.placements
+        ],
+        shared_gpus=[
+            SharedGpu(gpu_type=gpu_type, models=models, used_gb=used) for gpu_type, models, used in plan.shared_gpus
+        ],
+        monthly_cost=monthly_cost,
+        tier_allocation_monthly_cost=tier_cost,
+    )
@@ -0,0 +1,192 @@
+import math
+from typing import Callable, List, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.routers.cost_calculator_v2 import calculate_mcp_tools_costs, get_tenant_pricing, request_pricing_version
+from app.routers.tier_comparison import (
+    TierComparisonRequest,
+    validate_comparison,
+    tier_fixed_costs,
+    tier_llm_rates,
+)
+
+# Bounds of num_users / queries_per_user_per_month in CostCalculatorRequest
+MAX_USERS = 10000
+MIN_QUERIES = 10
+MAX_QUERIES = 10000
+
+# ===========================
+# MODELS
+# ===========================
+
+class ProfitabilityRequest(TierComparisonRequest):
+    """
+    Usage profile to solve for: minimum users at queries_per_user_per_month,
+    and maximum queries per user at num_users
+    """
+    user_counts: Optional[List[int]] = Field(
+        default=None,
+        description="User counts for the margin curves (default: geometric grid from 1 to the num_users bound)"
+    )
+    curve_points: int = Field(default=41, ge=2, le=500)
+
+class MarginCurve(BaseModel):
+    cost_per_user_monthly: List[float]
+    margin_per_user_monthly: List[float]
+    margin_percent: List[float]
+
+class TierProfitability(BaseModel):
+    service_tier: str
+    deployment_type: str
+    target_price_per_user_monthly: float
+    fixed_monthly_cost: float
+    cost_per_query: float
+    break_even_users: Optional[float]
+    min_viable_users: Optional[int]
+    max_queries_per_user_per_month: Optional[int]
+    tier_query_limit: Optional[int]
+    notes: str
+    margin_curve: MarginCurve
+
+class ProfitabilityResponse(BaseModel):
+    pricing_version: str
+    queries_per_user_per_month: int
+    num_users: int
+    user_counts: List[int]
+    tiers: List[TierProfitability]
+
+# ===========================
+# SOLVER
+# ===========================
+
+def cost_per_user(fixed: np.ndarray, input_rate: np.ndarray, output_rate: np.ndarray,
+                  users: np.ndarray, queries: np.ndarray, params: ProfitabilityRequest) -> np.ndarray:
+    """Per-user monthly cost (the compare_tiers cost model) for every cell and user count"""
+    total_queries = users * queries
+    llm = total_queries * params.avg_input_tokens * input_rate + total_queries * params.avg_output_tokens * output_rate
+    return (fixed + llm) / users
+
+def _nudge(solution: np.ndarray, viable: Callable[[np.ndarray], np.ndarray], step: int,
+           lower: int, upper: int) -> np.ndarray:
+    """
+    Correct a closed-form integer solution against exact evaluation: move by
+    step until viable, then back while the previous value is still viable.
+    Float rounding can only put the closed form off by one.
+    """
+    for _ in range(2):
+        nxt = solution + step
+        solution = np.where(~viable(solution) & (nxt >= lower) & (nxt <= upper), nxt, solution)
+    for _ in range(2):
+        back = solution - step
+        solution = np.where((back >= lower) & (back <= upper) & viable(back), back, solution)
+    return solution
+
+def solve_profitability(params: ProfitabilityRequest) -> ProfitabilityResponse:
+    """
+    Per-user cost of a cell is fixed / users + queries × cost_per_query, with
+    fixed costs (infrastructure, tier services, tools, on-premise GPUs)
+    dominating at low user counts. Solves, for all tiers × deployment types
+    at once, the minimum users and maximum queries per user at which the
+    per-user cost is at or below the tier's target price.
+    """
+    tenant_pricing = get_tenant_pricing(params.tenant)
+    cells = [(tier, d) for tier in validate_comparison(params, tenant_pricing) for d in params.deployment_types]
+
+    custom = tuple(sorted(params.custom_infrastructure.items())) if params.custom_infrastructure else None
+    agents = tuple(
+        (a.agent, a.query_share, a.latency_tolerance_hours) for a in params.agent_latency_tolerances or ()
+    )
+    tools_total, _ = calculate_mcp_tools_costs(params.mcp_tools, 0)
+    fixed, input_rate, output_rate, price, query_limit = (np.empty(len(cells)) for _ in range(5))
+    for i, (tier, deployment_type) in enumerate(cells):
+        tier_input, tier_output, llm_fixed = tier_llm_rates(
+            tier, deployment_type, params.as_of, tenant_pricing, agents, params.max_batch_turnaround_hours
+        )
+        fixed[i] = sum(tier_fixed_costs(
+            tier, params.agent_type, params.memory_type, params.infrastructure_scale, custom, tenant_pricing
+        )) + tools_total + llm_fixed
+        input_rate[i], output_rate[i] = tier_input, tier_output
+        tier_config = tenant_pricing.tiers[tier]
+        price[i] = tier_config["target_price_per_user_monthly"]
+        query_limit[i] = tier_config.get("limits", {}).get("max_queries_per_user_per_month", np.nan)
+
+    per_query = params.avg_input_tokens * input_rate + params.avg_output_tokens * output_rate
+    q = params.queries_per_user_per_month
+
+    # Minimum users: fixed / N + q·c <= price  =>  N >= fixed / (price - q·c)
+    headroom = price - q * per_query
+    with np.errstate(divide="ignore", invalid="ignore"):
+        break_even = np.where(headroom > 0, np.maximum(fixed, 0.0) / headroom, np.inf)
+    users = np.clip(np.ceil(np.where(np.isfinite(break_even), break_even, MAX_USERS + 1)), 1, MAX_USERS + 1)
+    def viable_users(n):
+        return cost_per_user(fixed, input_rate, output_rate, n, q, params) <= price
+    users = _nudge(users, viable_users, 1, 1, MAX_USERS)
+    users_found = np.isfinite(break_even) & (users <= MAX_USERS) & viable_users(np.minimum(users, MAX_USERS))
+
+    # Maximum queries at num_users: q <= (price - fixed / N) / c
+    n = params.num_users
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sustained = np.where(per_query > 0, (price - fixed / n) / per_query, np.inf)
+    queries = np.clip(np.floor(np.where(np.isfinite(sustained), sustained, MAX_QUERIES)), MIN_QUERIES - 1, MAX_QUERIES)
+    def viable_queries(qs):
+        return cost_per_user(fixed, input_rate, output_rate, n, qs, params) <= price
+    queries = _nudge(queries, viable_queries, -1, MIN_QUERIES, MAX_QUERIES)
+    queries_found = (queries >= MIN_QUERIES) & viable_queries(np.maximum(queries, MIN_QUERIES))
+
+    # Margin curves (cells × user counts)
+    if params.user_counts:
+        user_counts = np.array(sorted(set(params.user_counts)), dtype=np.int64)
+        if user_counts[0] < 1:
+            raise HTTPException(status_code=400, detail="user_counts must be positive")
+    else:
+        user_counts = np.unique(np.geomspace(1, MAX_USERS, params.curve_points).round().astype(np.int64))
+    curve_cost = cost_per_user(fixed[:, None], input_rate[:, None], output_rate[:, None], user_counts[None, :], q, params)
+    curve_margin = price[:, None] - curve_cost
+
+    tiers = []
+    for i, (tier, deployment_type) in enumerate(cells):
+        if users_found[i]:
+            notes = f"Per-user cost reaches ${price[i]:,.2f} at {int(users[i]):,} users"
+        elif headroom[i] <= 0:
+            notes = f"Variable cost alone (${q * per_query[i]:,.2f}/user) exceeds the target price"
+        else:
+            notes = f"Break-even needs {math.ceil(break_even[i]):,} users (above the {MAX_USERS:,} user limit)"
+        tiers.append(TierProfitability(
+            service_tier=tier,
+            deployment_type=deployment_type,
+            target_price_per_user_monthly=price[i],
+            fixed_monthly_cost=fixed[i],
+            cost_per_query=per_query[i],
+            break_even_users=break_even[i] if np.isfinite(break_even[i]) else None,
+            min_viable_users=int(users[i]) if users_found[i] else None,
+            max_queries_per_user_per_month=int(queries[i]) if queries_found[i] else None,
+            tier_query_limit=int(query_limit[i]) if np.isfinite(query_limit[i]) else None,
+            notes=notes,
+            margin_curve=MarginCurve(
+                cost_per_user_monthly=curve_cost[i].tolist(),
+                margin_per_user_monthly=curve_margin[i].tolist(),
+                margin_percent=(curve_margin[i] / price[i] * 100).tolist(),
+            ),
+        ))
+
+    return ProfitabilityResponse(
+        pricing_version=request_pricing_version(params),
+        queries_per_user_per_month=q,
+        num_users=n,
+        user_counts=user_counts.tolist(),
+        tiers=tiers,
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/tiers/profitability", response_model=ProfitabilityResponse)
+def profitability_endpoint(params: ProfitabilityRequest):
+    """Minimum viable users, maximum sustainable queries per user and margin curves for every tier"""
+    return solve_profitability(params)
@@ -0,0 +1,73 @@
+from datetime import date, datetime, time, timezone
+from typing import List, Dict, Optional, Any
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from app.storage.quote_store import get_quote_store
+
+# ===========================
+# MODELS
+# ===========================
+
+class QuoteSummary(BaseModel):
+    quote_id: str
+    pricing_version: str
+    service_tier: str
+    deployment_type: str
+    customer: Optional[str]
+    tenant: Optional[str] = None
+    created_at: float
+    last_quoted_at: float
+    times_quoted: int
+    total_monthly_cost: float
+
+class QuoteDetail(QuoteSummary):
+    request: Dict[str, Any]
+    response: Dict[str, Any]
+
+class QuoteListResponse(BaseModel):
+    quotes: List[QuoteSummary]
+    next_cursor: Optional[str]
+
+def _epoch(day: Optional[date]) -> Optional[float]:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc).timestamp() if day else None
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.get("/quotes", response_model=QuoteListResponse)
+def list_quotes(
+    service_tier: Optional[str] = None,
+    deployment_type: Optional[str] = None,
+    customer: Optional[str] = None,
+    tenant: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """List stored quotes, newest first; pass next_cursor to fetch the following page"""
+    filters = {
+        "service_tier": service_tier.lower() if service_tier else None,
+        "deployment_type": deployment_type,
+        "customer": customer,
+        "tenant": tenant,
+    }
+    until = _epoch(end_date) + 86400 if end_date else None
+    try:
+        quotes, next_cursor = get_quote_store().list_quotes(filters, _epoch(start_date), until, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+    return QuoteListResponse(quotes=quotes, next_cursor=next_cursor)
+
+@router.get("/quotes/{quote_id}", response_model=QuoteDetail)
+def get_quote(quote_id: str):
+    """Get a stored quote (request and full calculation) by its content hash"""
+    quote = get_quote_store().get(quote_id)
+    if quote is None:
+        raise HTTPException(status_code=404, detail=f"Quote {quote_id} not found")
+    return quote
@@ -0,0 +1,299 @@
+from datetime import date, timedelta
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.config.service_tiers import LLM_CATEGORIES
+from app.pricing.history import get_pricing_history
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    DEFAULT_LLM_PRICING_USD,
+    AUD_TO_USD,
+    apply_service_tier_config,
+    get_tenant_pricing,
+    llm_pricing_as_of,
+)
+from app.storage.usage_store import get_usage_store, UsageStore
+
+# Average days per month, used to scale monthly forecasts to the reconciled period
+DAYS_PER_MONTH = 365 / 12
+
+# Variance components in the order they are attributed
+VARIANCE_COMPONENTS = ("volume", "token_size", "cache_hit", "price")
+
+# ===========================
+# MODELS
+# ===========================
+
+class ReconciliationRequest(BaseModel):
+    """A saved quote reconciled against ingested usage for a period"""
+    quote: CostCalculatorRequest
+    start_date: date
+    end_date: date
+
+    # Usage filters identifying the customer's traffic (empty = all usage)
+    service_tiers: List[str] = Field(default=[])
+    agents: List[str] = Field(default=[])
+    user_ids: List[str] = Field(default=[])
+
+class BatchReconciliationRequest(BaseModel):
+    items: List[ReconciliationRequest]
+
+class VarianceBreakdown(BaseModel):
+    """Actual minus forecast LLM cost (AUD), attributed to each wrong assumption"""
+    forecast_cost: float
+    actual_cost: float
+    total_variance: float
+    volume_variance: float
+    token_size_variance: float
+    cache_hit_variance: float
+    price_variance: float
+
+class ModelReconciliation(BaseModel):
+    model: str
+    llm_category: str
+    forecast_queries: float
+    actual_queries: int
+    forecast_avg_input_tokens: float
+    actual_avg_input_tokens: float
+    forecast_avg_output_tokens: float
+    actual_avg_output_tokens: float
+    forecast_cache_hit_rate: float
+    actual_cache_hit_rate: float
+    variance: VarianceBreakdown
+
+class CategoryReconciliation(BaseModel):
+    llm_category: str
+    variance: VarianceBreakdown
+
+class ReconciliationResponse(BaseModel):
+    start_date: date
+    end_date: date
+    period_months: float
+    service_tier: str
+    deployment_type: str
+    total: VarianceBreakdown
+    largest_variance_driver: str
+    by_category: List[CategoryReconciliation]
+    by_model: List[ModelReconciliation]
+
+# ===========================
+# RECONCILIATION FUNCTIONS
+# ===========================
+
+def get_llm_category(model: str) -> str:
+    """Find the LLM_CATEGORIES bucket (cheap, mid_range, expensive) of a cloud API model"""
+    for category, deployments in LLM_CATEGORIES.items():
+        if any(m["id"] == model for m in deployments.get("cloud_api", [])):
+            return category
+    return "uncategorized"
+
+def _token_cost(queries, input_tokens, output_tokens, cache_hit, rates) -> np.ndarray:
+    """Vectorized calculate_llm_costs formula (AUD): fresh + cached input plus output tokens"""
+    input_rate = (1 - cache_hit) * rates[0] + cache_hit * rates[1]
+    return queries * (input_tokens * input_rate + output_tokens * rates[2]) / 1_000_000 / AUD_TO_USD
+
+def _usage_cost(input_tokens, cached_input_tokens, output_tokens, rates) -> np.ndarray:
+    """Cost (AUD) of token totals: fresh and cached input plus output tokens"""
+    fresh = input_tokens - cached_input_tokens
+    return (fresh * rates[0] + cached_input_tokens * rates[1] + output_tokens * rates[2]) / 1_000_000 / AUD_TO_USD
+
+def rate_periods(start_date: date, end_date: date) -> List[Tuple[date, date, Optional[date]]]:
+    """
+    Split a period where the LLM pricing history changes rates: (start, end, date
+    whose rates apply) per part; days before the history use its first rates
+    """
+    dates = get_pricing_history().dates
+    changes = [d for d in dates if start_date < d <= end_date]
+    starts = [start_date] + changes
+    ends = [d - timedelta(days=1) for d in changes] + [end_date]
+    return [(start, end, max(start, dates[0]) if dates else None) for start, end in zip(starts, ends)]
+
+def _rate_matrix(models: List[str], pricing: Dict[str, Dict[str, float]]) -> np.ndarray:
+    rates = [pricing.get(model, DEFAULT_LLM_PRICING_USD) for model in models]
+    return np.array([
+        [r["input"] for r in rates],
+        [r.get("cache_read", 0.0) for r in rates],
+        [r["output"] for r in rates],
+    ], dtype=np.float64)
+
+def _variance(forecast: float, components: np.ndarray) -> VarianceBreakdown:
+    actual = forecast + float(components.sum())
+    return VarianceBreakdown(
+        forecast_cost=forecast,
+        actual_cost=actual,
+        total_variance=actual - forecast,
+        volume_variance=float(components[0]),
+        token_size_variance=float(components[1]),
+        cache_hit_variance=float(components[2]),
+        price_variance=float(components[3]),
+    )
+
+def reconcile_quote(
+    item: ReconciliationRequest,
+    store: UsageStore,
+    actuals: List[Tuple[Optional[date], Dict[str, np.ndarray]]],
+    pricing: Optional[Dict[str, Dict[str, float]]] = None,
+) -> ReconciliationResponse:
+    """
+    Compare a quote's LLM forecast with actual usage for the period.
+
+    actuals holds the usage aggregate of each part of the period with constant
+    rates (see rate_periods), next to the date whose rates apply to it. Actual
+    usage is priced with the tenant's rates in force on those dates, so the
+    price variance is the rate changes since the quote, not the tenant's
+    discount against the catalog.
+
+    The variance is decomposed by swapping forecast assumptions for actuals
+    one at a time (volume, then token sizes, then cache hits, then prices),
+    so the components always sum to actual minus forecast.
+    """
+    # The forecast is priced as quoted: with the tenant's rates in force on the quote's as_of
+    tenant_pricing = get_tenant_pricing(item.quote.tenant)
+    pricing = llm_pricing_as_of(item.quote.as_of, tenant_pricing)[0] if pricing is None else pricing
+    params = apply_service_tier_config(item.quote.model_copy(deep=True), tenant_pricing)
+    if params.deployment_type == "on_premise":
+        raise HTTPException(
+            status_code=400,
+            detail="Reconciliation only applies to token-priced deployments (on_premise LLM cost is GPU-based)"
+        )
+
+    period_months = ((item.end_date - item.start_date).days + 1) / DAYS_PER_MONTH
+
+    # Select this quote's traffic from the shared aggregates and sum it per model and rate period
+    store_models = store.dictionary("model")
+    period_usage = []
+    for rates_date, aggregate in actuals:
+        mask = np.ones(len(aggregate["queries"]), dtype=bool)
+        for column, values in (("tier", [t.lower() for t in item.service_tiers]), ("agent", item.agents), ("user", item.user_ids)):
+            if values:
+                mask &= np.isin(aggregate[column], store.codes(column, values))
+        model_codes = aggregate["model"][mask]
+        period_usage.append((rates_date, {
+            metric: np.bincount(model_codes, weights=aggregate[metric][mask], minlength=len(store_models))
+            for metric in ("queries", "input_tokens", "cached_input_tokens", "output_tokens")
+        }))
+    per_model = {
+        metric: sum(usage[metric] for _, usage in period_usage)
+        for metric in ("queries", "input_tokens", "cached_input_tokens", "output_tokens")
+    }
+    used = [store_models[code] for code in np.flatnonzero(per_model["queries"])]
+
+    mix = {model: pct for model, pct in params.llm_mix.items() if pct > 0}
+    models = list(mix) + [model for model in used if model not in mix]
+    store_index = np.array([store_models.index(m) if m in store_models else -1 for m in models])
+    observed = store_index >= 0
+
+    def actual(metric: str, usage: Dict[str, np.ndarray] = per_model) -> np.ndarray:
+        values = np.zeros(len(models))
+        values[observed] = usage[metric][store_index[observed]]
+        return values
+
+    # Forecast assumptions (period-scaled)
+    total_queries = params.num_users * params.queries_per_user_per_month * period_months
+    forecast_queries = np.array([total_queries * mix.get(m, 0.0) / 100 for m in models])
+    forecast_input = np.full(len(models), float(params.avg_input_tokens))
+    forecast_output = np.full(len(models), float(params.avg_output_tokens))
+    cache_hit_rates = params.cache_hit_rates or {}
+    forecast_hit = np.array([
+        cache_hit_rates.get(m, params.cache_hit_rate) if params.use_prompt_caching else 0.0 for m in models
+    ])
+    forecast_rates = _rate_matrix(models, pricing)
+
+    # Actuals (models with no traffic keep the forecast per-query assumptions)
+    actual_queries = actual("queries")
+    served = actual_queries > 0
+    safe_queries = np.where(served, actual_queries, 1)
+    actual_input = np.where(served, actual("input_tokens") / safe_queries, forecast_input)
+    actual_output = np.where(served, actual("output_tokens") / safe_queries, forecast_output)
+    input_totals = actual("input_tokens")
+    actual_hit = np.where(input_totals > 0, actual("cached_input_tokens") / np.where(input_totals > 0, input_totals, 1), forecast_hit)
+    # Actual usage at the tenant's rates in force when it happened
+    actual_cost = sum(
+        _usage_cost(actual("input_tokens", usage), actual("cached_input_tokens", usage), actual("output_tokens", usage),
+                    _rate_matrix(models, llm_pricing_as_of(rates_date, tenant_pricing)[0]))
+        for rates_date, usage in period_usage
+    )
+
+    # Chained substitution: forecast -> volume -> token size -> cache hit -> actual
+    steps = np.stack([
+        _token_cost(forecast_queries, forecast_input, forecast_output, forecast_hit, forecast_rates),
+        _token_cost(actual_queries, forecast_input, forecast_output, forecast_hit, forecast_rates),
+        _token_cost(actual_queries, actual_input, actual_output, forecast_hit, forecast_rates),
+        _token_cost(actual_queries, actual_input, actual_output, actual_hit, forecast_rates),
+        actual_cost,
+    ])
+    components = np.diff(steps, axis=0)  # shape: (4 components, models)
+
+    categories = [get_llm_category(m) for m in models]
+    by_model = [
+        ModelReconciliation(
+            model=model,
+            llm_category=categories[i],
+            forecast_queries=float(forecast_queries[i]),
+            actual_queries=int(actual_queries[i]),
+            forecast_avg_input_tokens=float(forecast_input[i]),
+            actual_avg_input_tokens=float(actual_input[i]),
+            forecast_avg_output_tokens=float(forecast_output[i]),
+            actual_avg_output_tokens=float(actual_output[i]),
+            forecast_cache_hit_rate=float(forecast_hit[i]),
+            actual_cache_hit_rate=float(actual_hit[i]),
+            variance=_variance(float(steps[0, i]), components[:, i]),
+        )
+        for i, model in enumerate(models)
+    ]
+
+    by_category = []
+    for category in dict.fromkeys(categories):
+        selected = np.array([c == category for c in categories])
+        by_category.append(CategoryReconciliation(
+            llm_category=category,
+            variance=_variance(float(steps[0, selected].sum()), components[:, selected].sum(axis=1)),
+        ))
+
+    totals = components.sum(axis=1)
+    return ReconciliationResponse(
+        start_date=item.start_date,
+        end_date=item.end_date,
+        period_months=period_months,
+        service_tier=params.service_tier,
+        deployment_type=params.deployment_type,
+        total=_variance(float(steps[0].sum()), totals),
+        largest_variance_driver=VARIANCE_COMPONENTS[int(np.argmax(np.abs(totals)))],
+        by_category=by_category,
+        by_model=by_model,
+    )
+
+def reconcile_quotes(items: List[ReconciliationRequest]) -> List[ReconciliationResponse]:
+    """Reconcile many quotes with one aggregation pass over stored usage per distinct period (and rate change)"""
+    store = get_usage_store()
+    aggregates: Dict[Tuple[date, date], List[Tuple[Optional[date], Dict[str, np.ndarray]]]] = {}
+    for item in items:
+        if item.end_date < item.start_date:
+            raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+        period = (item.start_date, item.end_date)
+        if period not in aggregates:
+            aggregates[period] = [
+                (rates_date, store.aggregate(start, end, ("model", "tier", "agent", "user")))
+                for start, end, rates_date in rate_periods(item.start_date, item.end_date)
+            ]
+
+    return [reconcile_quote(item, store, aggregates[(item.start_date, item.end_date)]) for item in items]
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/reconcile", response_model=ReconciliationResponse)
+def reconcile_endpoint(item: ReconciliationRequest):
+    """Compare a saved quote's LLM forecast with actual ingested usage"""
+    return reconcile_quotes([item])[0]
+
+@router.post("/reconcile/batch", response_model=List[ReconciliationResponse])
+def reconcile_batch_endpoint(payload: BatchReconciliationRequest):
+    """Reconcile many saved quotes in one pass over stored usage"""
+    return reconcile_quotes(payload.items)
@@ -0,0 +1,75 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Body, HTTPException
+from pydantic import BaseModel
+
+from app.pricing.tenants import TenantPricing, materialize
+from app.storage.tenant_store import get_tenant_store
+
+# ===========================
+# MODELS
+# ===========================
+
+class TenantOverlay(BaseModel):
+    tenant_id: str
+    version: str
+    overlay: Dict[str, Any]
+
+class TenantList(BaseModel):
+    tenants: List[str]
+
+def _tenant(tenant_id: str) -> TenantPricing:
+    """Resolved pricing of a tenant (400 on an invalid ID, 404 without an overlay)"""
+    try:
+        pricing = get_tenant_store().get(tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if pricing is None:
+        raise HTTPException(status_code=404, detail=f"Tenant '{tenant_id}' has no pricing overlay")
+    return pricing
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.get("/tenants", response_model=TenantList)
+async def list_tenants():
+    """Tenants with a pricing overlay"""
+    return TenantList(tenants=get_tenant_store().tenant_ids())
+
+@router.put("/tenants/{tenant_id}/overlay", response_model=TenantOverlay)
+async def put_tenant_overlay(tenant_id: str, overlay: Dict[str, Any] = Body(...)):
+    """
+    Set a tenant's pricing overlay: sparse "tiers" (SERVICE_TIERS) and "rates"
+    (llm, llm_default, azure, gpu) overrides; calculations with this tenant use it
+    """
+    try:
+        pricing = get_tenant_store().put(tenant_id, overlay)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TenantOverlay(tenant_id=tenant_id, version=pricing.version, overlay=pricing.document)
+
+@router.get("/tenants/{tenant_id}/overlay", response_model=TenantOverlay)
+async def get_tenant_overlay(tenant_id: str):
+    pricing = _tenant(tenant_id)
+    return TenantOverlay(tenant_id=tenant_id, version=pricing.version, overlay=pricing.document)
+
+@router.delete("/tenants/{tenant_id}/overlay")
+async def delete_tenant_overlay(tenant_id: str):
+    try:
+        deleted = get_tenant_store().delete(tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Tenant '{tenant_id}' has no pricing overlay")
+    return {"tenant_id": tenant_id, "deleted": True}
+
+@router.get("/tenants/{tenant_id}/tiers/{tier_id}")
+async def get_tenant_tier(tenant_id: str, tier_id: str):
+    """A tier's configuration as the tenant sees it (overlay resolved over the shared tier)"""
+    pricing = _tenant(tenant_id)
+    if tier_id.lower() not in pricing.tiers:
+        raise HTTPException(status_code=404, detail=f"Tier '{tier_id}' not found")
+    return {"tenant_id": tenant_id, "tier_id": tier_id.lower(), **materialize(pricing.tiers[tier_id.lower()])}
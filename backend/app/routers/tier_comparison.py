@@ -0,0 +1,282 @@
+from datetime import date
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.config.service_tiers import SERVICE_TIERS
+from app.pricing.tenants import TenantPricing
+from app.routers.cost_calculator_v2 import (
+    AI_AGENTS,
+    BASE_PRICING,
+    DEFAULT_LLM_PRICING_USD,
+    AgentLatencyTolerance,
+    CostCalculatorRequest,
+    apply_service_tier_config,
+    get_tenant_pricing,
+    llm_pricing_as_of,
+    request_pricing_version,
+    route_batch_queries,
+    get_agent_infrastructure,
+    calculate_llm_costs,
+    calculate_infrastructure_costs,
+    calculate_data_source_costs,
+    calculate_monitoring_costs,
+    calculate_memory_system_costs,
+    calculate_retrieval_costs,
+    calculate_security_costs,
+    calculate_prompt_tuning_costs,
+    calculate_mcp_tools_costs,
+)
+
+DEPLOYMENT_TYPES = ("cloud_api", "on_premise")
+
+# Usage-independent category totals, in CostCalculatorResponse order
+FIXED_CATEGORIES = (
+    "infrastructure_costs",
+    "data_source_costs",
+    "monitoring_costs",
+    "memory_system_costs",
+    "retrieval_costs",
+    "security_costs",
+    "prompt_tuning_costs",
+)
+
+# ===========================
+# MODELS
+# ===========================
+
+class TierComparisonRequest(BaseModel):
+    """One usage profile, priced on every tier and deployment type"""
+    agent_type: str = Field(default="sales-coach")
+    num_users: int = Field(default=100, ge=1, le=10000)
+    queries_per_user_per_month: int = Field(default=1000, ge=10, le=10000)
+    avg_input_tokens: int = Field(default=10000, ge=1000, le=100000)
+    avg_output_tokens: int = Field(default=1000, ge=100, le=10000)
+    infrastructure_scale: float = Field(default=1.0, ge=0.1, le=5.0)
+    custom_infrastructure: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Overrides for tier infrastructure (e.g. aks_nodes), given at scale 1.0"
+    )
+    memory_type: str = Field(default="redis")
+    mcp_tools: List[str] = Field(default=[])
+    service_tiers: List[str] = Field(default=list(SERVICE_TIERS), description="Tiers to compare (default: all)")
+    deployment_types: List[str] = Field(default=list(DEPLOYMENT_TYPES))
+
+    # Batch routing, effective-dated and tenant pricing, as in CostCalculatorRequest
+    agent_latency_tolerances: Optional[List[AgentLatencyTolerance]] = Field(default=None)
+    max_batch_turnaround_hours: float = Field(default=24.0, gt=0.0)
+    as_of: Optional[date] = Field(default=None)
+    tenant: Optional[str] = Field(default=None)
+
+class TierComparisonCell(BaseModel):
+    service_tier: str
+    deployment_type: str
+    total_monthly_cost: float
+    llm_costs: float
+    infrastructure_costs: float
+    data_source_costs: float
+    monitoring_costs: float
+    memory_system_costs: float
+    retrieval_costs: float
+    security_costs: float
+    prompt_tuning_costs: float
+    mcp_tools_costs: float
+    cost_per_user_monthly: float
+    target_price_per_user_monthly: float
+    margin_per_user_monthly: float
+    margin_percent: float
+
+class TierComparisonResponse(BaseModel):
+    pricing_version: str
+    num_users: int
+    queries_per_month: int
+    input_tokens_per_month: int
+    output_tokens_per_month: int
+    matrix: List[TierComparisonCell]
+
+# ===========================
+# PRECOMPUTED TIER TABLES
+# ===========================
+
+@lru_cache(maxsize=256)
+def tier_llm_rates(tier: str, deployment_type: str, as_of: Optional[date] = None,
+                   tenant_pricing: TenantPricing = BASE_PRICING,
+                   agents: Tuple[Tuple[str, float, float], ...] = (),
+                   max_turnaround_hours: float = 24.0) -> Tuple[float, float, float]:
+    """
+    LLM cost of a tier as (AUD per input token, AUD per output token, fixed AUD/month):
+    the gradients of the tier's compiled llm_api lines with respect to token counts,
+    so rates, caching and batch discounts are exactly those calculate_llm_costs uses.
+    agents are (agent, query_share, latency_tolerance_hours). On-premise GPUs are a
+    fixed monthly cost.
+    """
+    calc = apply_service_tier_config(
+        CostCalculatorRequest(service_tier=tier, deployment_type=deployment_type), tenant_pricing
+    )
+    if deployment_type == "on_premise":
+        fixed, _ = calculate_llm_costs(calc.llm_mix, 0, 0, 0, calc.cache_hit_rate, calc.use_prompt_caching,
+                                       deployment_type=deployment_type, service_tier=tier,
+                                       tenant_pricing=tenant_pricing)
+        return 0.0, 0.0, fixed
+
+    llm_pricing, llm_key = llm_pricing_as_of(as_of, tenant_pricing)
+    batch_shares = route_batch_queries(
+        calc.llm_mix,
+        [AgentLatencyTolerance(agent=a, query_share=s, latency_tolerance_hours=h) for a, s, h in agents],
+        max_turnaround_hours, as_of, tenant_pricing
+    ) if calc.use_batch_processing and agents else {}
+
+    input_rate = output_rate = 0.0
+    for model, percentage in calc.llm_mix.items():
+        if percentage <= 0:
+            continue
+        cached = calc.use_prompt_caching and "cache_read" in llm_pricing.get(model, DEFAULT_LLM_PRICING_USD)
+        pricing_key = (*llm_key, model) if model in llm_pricing else ("llm_default",)
+        batch_share = batch_shares.get(model, 0.0)
+        line = tenant_pricing.compiled("llm_api", cached, batch_share > 0, *pricing_key)
+        # Cost per query per token: the line is linear in each token count
+        values = {
+            "total_queries": 1,
+            "percentage": percentage,
+            "avg_input_tokens": 0,
+            "avg_output_tokens": 0,
+            "cache_hit_rate": calc.cache_hit_rate,
+            "batch_share": batch_share,
+        }
+        gradient = line.gradient(*(values[name] for name in line.inputs))
+        input_rate += gradient["avg_input_tokens"]
+        output_rate += gradient["avg_output_tokens"]
+    return input_rate, output_rate, 0.0
+
+@lru_cache(maxsize=1024)
+def tier_fixed_costs(tier: str, agent_type: str, memory_type: str, scale: float,
+                     custom: Optional[Tuple[Tuple[str, float], ...]],
+                     tenant_pricing: TenantPricing = BASE_PRICING) -> Tuple[float, ...]:
+    """Usage-independent category totals of a tier (FIXED_CATEGORIES order)"""
+    use_reserved = tenant_pricing.tiers[tier]["features"].get("use_reserved_instances", False)
+    infra = get_agent_infrastructure(agent_type, tier, scale, dict(custom) if custom else None, tenant_pricing)
+    return (
+        calculate_infrastructure_costs(infra, use_reserved, tenant_pricing)[0],
+        calculate_data_source_costs(agent_type, tier, tenant_pricing)[0],
+        calculate_monitoring_costs(0.0, tier, tenant_pricing)[0],
+        calculate_memory_system_costs(memory_type, infra, tier, tenant_pricing)[0],
+        calculate_retrieval_costs(tier, tenant_pricing)[0],
+        calculate_security_costs(tier, tenant_pricing)[0],
+        calculate_prompt_tuning_costs(tier, tenant_pricing)[0],
+    )
+
+# ===========================
+# COMPARISON
+# ===========================
+
+def validate_comparison(params: TierComparisonRequest, tenant_pricing: TenantPricing = BASE_PRICING) -> List[str]:
+    """Check agent, tiers (the tenant's) and deployment types; returns the normalized tier names"""
+    if params.agent_type not in AI_AGENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Agent type '{params.agent_type}' not supported. Available: {list(AI_AGENTS.keys())}"
+        )
+    tiers = [tier.lower() for tier in params.service_tiers]
+    unknown = [tier for tier in tiers if tier not in tenant_pricing.tiers] + \
+              [d for d in params.deployment_types if d not in DEPLOYMENT_TYPES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown tiers/deployment types {unknown}. Available: {list(tenant_pricing.tiers)} / {list(DEPLOYMENT_TYPES)}"
+        )
+    return tiers
+
+def compare_tiers(params: TierComparisonRequest) -> TierComparisonResponse:
+    """
+    Category totals for every requested tier × deployment type, matching what
+    /calculate returns for the same usage profile on each tier.
+    """
+    tenant_pricing = get_tenant_pricing(params.tenant)
+    tiers = validate_comparison(params, tenant_pricing)
+
+    # Shared usage quantities
+    total_queries = params.num_users * params.queries_per_user_per_month
+    input_tokens = total_queries * params.avg_input_tokens
+    output_tokens = total_queries * params.avg_output_tokens
+    tools_total, _ = calculate_mcp_tools_costs(params.mcp_tools, total_queries)
+    custom = tuple(sorted(params.custom_infrastructure.items())) if params.custom_infrastructure else None
+    agents = tuple(
+        (a.agent, a.query_share, a.latency_tolerance_hours) for a in params.agent_latency_tolerances or ()
+    )
+
+    matrix = []
+    for tier in tiers:
+        fixed = dict(zip(FIXED_CATEGORIES, tier_fixed_costs(
+            tier, params.agent_type, params.memory_type, params.infrastructure_scale, custom, tenant_pricing
+        )))
+        fixed_total = sum(fixed.values()) + tools_total
+        target_price = tenant_pricing.tiers[tier]["target_price_per_user_monthly"]
+
+        for deployment_type in params.deployment_types:
+            input_rate, output_rate, llm_fixed = tier_llm_rates(
+                tier, deployment_type, params.as_of, tenant_pricing, agents, params.max_batch_turnaround_hours
+            )
+            llm_total = input_tokens * input_rate + output_tokens * output_rate + llm_fixed
+            total = fixed_total + llm_total
+            cost_per_user = total / params.num_users
+            margin = target_price - cost_per_user
+
+            matrix.append(TierComparisonCell(
+                service_tier=tier,
+                deployment_type=deployment_type,
+                total_monthly_cost=total,
+                llm_costs=llm_total,
+                mcp_tools_costs=tools_total,
+                cost_per_user_monthly=cost_per_user,
+                target_price_per_user_monthly=target_price,
+                margin_per_user_monthly=margin,
+                margin_percent=margin / target_price * 100 if target_price else 0.0,
+                **fixed,
+            ))
+
+    return TierComparisonResponse(
+        pricing_version=request_pricing_version(params),
+        num_users=params.num_users,
+        queries_per_month=total_queries,
+        input_tokens_per_month=input_tokens,
+        output_tokens_per_month=output_tokens,
+        matrix=matrix,
+    )
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/tiers/compare", response_model=TierComparisonResponse)
+def compare_tiers_endpoint(params: TierComparisonRequest):
+    """Category totals, per-user cost and margin of one usage profile on every tier and deployment type"""
+    return compare_tiers(params)
+
+@router.get("/tiers/compare", response_model=TierComparisonResponse)
+def compare_tiers_get(
+    agent_type: str = "sales-coach",
+    num_users: int = Query(default=100, ge=1, le=10000),
+    queries_per_user_per_month: int = Query(default=1000, ge=10, le=10000),
+    avg_input_tokens: int = Query(default=10000, ge=1000, le=100000),
+    avg_output_tokens: int = Query(default=1000, ge=100, le=10000),
+    memory_type: str = "redis",
+    deployment_type: Optional[str] = None,
+    as_of: Optional[date] = None,
+    tenant: Optional[str] = None
+):
+    """Tier comparison for a usage profile given as query parameters"""
+    return compare_tiers(TierComparisonRequest(
+        agent_type=agent_type,
+        num_users=num_users,
+        queries_per_user_per_month=queries_per_user_per_month,
+        avg_input_tokens=avg_input_tokens,
+        avg_output_tokens=avg_output_tokens,
+        memory_type=memory_type,
+        deployment_types=[deployment_type] if deployment_type else list(DEPLOYMENT_TYPES),
+        as_of=as_of,
+        tenant=tenant,
+    ))
@@ -0,0 +1,122 @@
+from datetime import date, datetime
+from typing import List, Dict, Optional, Any
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.routers.cost_calculator_v2 import llm_pricing_as_of
+from app.storage.usage_store import get_usage_store, GROUP_BY_KEYS, MAX_TOKENS_PER_RECORD
+
+# ===========================
+# MODELS
+# ===========================
+
+class UsageRecord(BaseModel):
+    """A single ingested LLM call"""
+    timestamp: datetime
+    model: str = Field(..., description="LLM model ID (as in LLM_Pricing.json)")
+    agent: str = Field(default="unknown", description="Agent that issued the call")
+    user_id: str = Field(default="unknown")
+    service_tier: str = Field(default="standard", description="Service tier of the user")
+    input_tokens: int = Field(default=0, ge=0, le=MAX_TOKENS_PER_RECORD)
+    cached_input_tokens: int = Field(default=0, ge=0, le=MAX_TOKENS_PER_RECORD)
+    output_tokens: int = Field(default=0, ge=0, le=MAX_TOKENS_PER_RECORD)
+
+class UsageIngestRequest(BaseModel):
+    records: List[UsageRecord]
+
+class UsageCostQuery(BaseModel):
+    """Cost rollup over a date range (inclusive)"""
+    start_date: date
+    end_date: date
+    group_by: List[str] = Field(
+        default=["model"],
+        description=f"Any of: {', '.join(GROUP_BY_KEYS)}"
+    )
+
+    # Filters (empty = no filter)
+    service_tiers: List[str] = Field(default=[])
+    models: List[str] = Field(default=[])
+    agents: List[str] = Field(default=[])
+    user_ids: List[str] = Field(default=[])
+
+    as_of: Optional[date] = Field(
+        default=None,
+        description="Price the usage with the LLM rates in force on this date (pricing history); current rates when omitted"
+    )
+
+class UsageCostRow(BaseModel):
+    group: Dict[str, Any]
+    queries: int
+    input_tokens: int
+    cached_input_tokens: int
+    output_tokens: int
+    cost_aud: float
+
+class UsageCostResponse(BaseModel):
+    start_date: date
+    end_date: date
+    group_by: List[str]
+    total_cost_aud: float
+    total_queries: int
+    rows: List[UsageCostRow]
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/usage/ingest")
+def ingest_usage(payload: UsageIngestRequest):
+    """Append usage records to the columnar usage store"""
+    store = get_usage_store()
+    if any(r.cached_input_tokens > r.input_tokens for r in payload.records):
+        raise HTTPException(status_code=400, detail="cached_input_tokens cannot exceed input_tokens")
+
+    rows = store.append([r.model_dump() for r in payload.records])
+    return {"rows_written": rows}
+
+@router.get("/usage/partitions")
+def list_usage_partitions():
+    """List day partitions in the usage store (time index)"""
+    return {"partitions": get_usage_store().partitions()}
+
+@router.post("/usage/costs", response_model=UsageCostResponse)
+def query_usage_costs(query: UsageCostQuery):
+    """Roll up actual LLM cost over a date range, grouped by model/agent/user/tier/day/week"""
+    if query.end_date < query.start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+
+    filters = {
+        "tier": [t.lower() for t in query.service_tiers],
+        "model": query.models,
+        "agent": query.agents,
+        "user": query.user_ids,
+    }
+    try:
+        results = get_usage_store().rollup(
+            query.start_date, query.end_date, query.group_by, filters, llm_pricing_as_of(query.as_of)[0]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = [
+        UsageCostRow(
+            group={key: r[key] for key in query.group_by},
+            queries=r["queries"],
+            input_tokens=r["input_tokens"],
+            cached_input_tokens=r["cached_input_tokens"],
+            output_tokens=r["output_tokens"],
+            cost_aud=r["cost_aud"],
+        )
+        for r in results
+    ]
+    return UsageCostResponse(
+        start_date=query.start_date,
+        end_date=query.end_date,
+        group_by=query.group_by,
+        total_cost_aud=sum(r.cost_aud for r in rows),
+        total_queries=sum(r.queries for r in rows),
+        rows=rows
+    )
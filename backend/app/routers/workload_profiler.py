@@ -0,0 +1,339 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Any
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+from app.config.service_tiers import get_model_provider
+from app.routers.cost_calculator_v2 import CostCalculatorRequest, AgentCostRequest
+
+# ===========================
+# APPROXIMATE TOKENIZERS
+# ===========================
+
+# Per model-family calibration of the approximate tokenizer
+# - chars_per_token: average characters per token inside a word
+# - message_overhead: tokens added per chat message (role markers, separators)
+TOKENIZER_FAMILIES = {
+    "openai": {"chars_per_token": 4.2, "message_overhead": 4},
+    "anthropic": {"chars_per_token": 3.6, "message_overhead": 5},
+    "google": {"chars_per_token": 4.0, "message_overhead": 4},
+    "meta": {"chars_per_token": 4.0, "message_overhead": 5},
+    "mistral": {"chars_per_token": 3.5, "message_overhead": 3},
+    "default": {"chars_per_token": 4.0, "message_overhead": 4},
+}
+
+# Byte classes for the approximate tokenizer
+_SEPARATOR, _LETTER, _DIGIT, _SYMBOL, _NEWLINE = 0, 1, 2, 3, 4
+_BYTE_CLASSES = np.full(256, _SYMBOL, dtype=np.uint8)
+_BYTE_CLASSES[[0, 9, 13, 32]] = _SEPARATOR
+_BYTE_CLASSES[10] = _NEWLINE
+_BYTE_CLASSES[ord("0"):ord("9") + 1] = _DIGIT
+_BYTE_CLASSES[ord("a"):ord("z") + 1] = _LETTER
+_BYTE_CLASSES[ord("A"):ord("Z") + 1] = _LETTER
+_BYTE_CLASSES[128:] = _LETTER  # UTF-8 multi-byte text counts as letters (one char per byte)
+
+# Digits are grouped up to this many per token
+DIGITS_PER_TOKEN = 3
+
+# Corpora smaller than this are profiled in-process (no worker start-up cost)
+PARALLEL_MIN_TRANSCRIPTS = 2000
+
+# Transcripts per work unit sent to a worker process
+PROFILE_CHUNK_SIZE = 500
+
+def _runs(mask: np.ndarray, text_starts: np.ndarray, text_ends: np.ndarray) -> tuple:
+    """Start offsets and lengths of the runs of True in a boolean array (no run spans two texts)"""
+    first = mask.copy()
+    first[1:] &= ~mask[:-1]
+    first[text_starts] = mask[text_starts]
+    last = mask.copy()
+    last[:-1] &= ~mask[1:]
+    last[text_ends] = mask[text_ends]
+    starts = np.flatnonzero(first)
+    return starts, np.flatnonzero(last) - starts + 1
+
+def approximate_token_counts(texts: List[str], families: List[str]) -> np.ndarray:
+    """
+    Approximate token counts for a batch of texts under each tokenizer family.
+    Each text is encoded on its own and the encodings are laid end to end, so
+    the whole batch is classified byte-by-byte in one pass while runs still
+    end at text boundaries: letter runs split every chars_per_token
+    characters, digit runs every DIGITS_PER_TOKEN, and each symbol or newline
+    is one token.
+    Returns an array of shape (len(families), len(texts)).
+    """
+    chars_per_token = np.array([TOKENIZER_FAMILIES[f]["chars_per_token"] for f in families])[:, None]
+    if not texts:
+        return np.zeros((len(families), 0))
+
+    encoded = [text.encode("utf-8") for text in texts]
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    classes = _BYTE_CLASSES[data]
+    text_ids = np.repeat(np.arange(len(texts)), lengths)
+    nonempty = lengths > 0
+    text_ends = np.cumsum(lengths)[nonempty] - 1
+    text_starts = text_ends - lengths[nonempty] + 1
+
+    letter_starts, letter_lengths = _runs(classes == _LETTER, text_starts, text_ends)
+    digit_starts, digit_lengths = _runs(classes == _DIGIT, text_starts, text_ends)
+    single_positions = np.flatnonzero((classes == _SYMBOL) | (classes == _NEWLINE))
+
+    fixed = (
+        np.bincount(text_ids[digit_starts], weights=np.ceil(digit_lengths / DIGITS_PER_TOKEN), minlength=len(texts))
+        + np.bincount(text_ids[single_positions], minlength=len(texts))
+    )
+    word_tokens = np.ceil(letter_lengths[None, :] / chars_per_token)
+    letter_ids = text_ids[letter_starts]
+    counts = np.stack([np.bincount(letter_ids, weights=row, minlength=len(texts)) for row in word_tokens])
+    return counts + fixed[None, :]
+
+# ===========================
+# MODELS
+# ===========================
+
+class TranscriptMessage(BaseModel):
+    role: str = Field(..., description="system, user, assistant or tool")
+    content: str
+
+class Transcript(BaseModel):
+    """One sample conversation; every assistant message is one LLM request"""
+    messages: List[TranscriptMessage]
+
+class WorkloadProfileRequest(BaseModel):
+    agents: Dict[str, List[Transcript]] = Field(..., description="Sample conversations keyed by agent")
+    families: List[str] = Field(
+        default=["openai", "anthropic", "google"],
+        description=f"Tokenizer families to profile: {', '.join(TOKENIZER_FAMILIES)}"
+    )
+    agent_models: Dict[str, str] = Field(
+        default={},
+        description="Optional model per agent; selects the family used for suggested request parameters"
+    )
+
+class TokenDistribution(BaseModel):
+    """Token counts per LLM request"""
+    mean: float
+    std: float
+    p50: float
+    p90: float
+    p95: float
+    max: float
+    # Log-normal fit: ln(tokens) ~ N(lognormal_mu, lognormal_sigma)
+    lognormal_mu: float
+    lognormal_sigma: float
+
+class FamilyProfile(BaseModel):
+    family: str
+    requests: int
+    input_tokens: TokenDistribution
+    output_tokens: TokenDistribution
+    input_token_share: float
+
+class AgentProfile(BaseModel):
+    agent: str
+    transcripts: int
+    requests_per_transcript: float
+    families: List[FamilyProfile]
+    suggested_family: str
+    # Ready-to-use parameters for /calculate and /calculate-agent
+    suggested_calculation_params: Dict[str, Any]
+    suggested_agent_params: Dict[str, Any]
+    # Measured values of suggested parameters that were clamped into the request bounds
+    clamped_params: Dict[str, float] = Field(default={})
+
+class WorkloadProfileResponse(BaseModel):
+    agents: List[AgentProfile]
+    total_transcripts: int
+    total_requests: int
+
+# ===========================
+# PROFILING FUNCTIONS
+# ===========================
+
+def _profile_transcripts(transcripts: List[List[Dict[str, str]]], families: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Token counts of every LLM request in a batch of transcripts.
+    A request's input is the whole conversation before an assistant message
+    (chat APIs resend history); its output is the assistant message.
+    Returns {"input": (families, requests), "output": (families, requests)}.
+    """
+    texts = [message["content"] for messages in transcripts for message in messages]
+    counts = approximate_token_counts(texts, families)
+    overhead = np.array([TOKENIZER_FAMILIES[f]["message_overhead"] for f in families])[:, None]
+    counts += overhead
+
+    input_tokens, output_indices = [], []
+    offset = 0
+    for messages in transcripts:
+        n = len(messages)
+        message_counts = counts[:, offset:offset + n]
+        # Conversation size before each message
+        context = np.cumsum(message_counts, axis=1) - message_counts
+        for j, message in enumerate(messages):
+            if message["role"] == "assistant" and j > 0:
+                input_tokens.append(context[:, j])
+                output_indices.append(offset + j)
+        offset += n
+
+    if not output_indices:
+        empty = np.zeros((len(families), 0))
+        return {"input": empty, "output": empty}
+    return {
+        "input": np.stack(input_tokens, axis=1),
+        "output": counts[:, output_indices],
+    }
+
+def _profile_in_process(chunks: List[List[List[Dict[str, str]]]], families: List[str]) -> List[Dict[str, np.ndarray]]:
+    return [_profile_transcripts(chunk, families) for chunk in chunks]
+
+async def _profile_chunks(transcripts: List[List[Dict[str, str]]], families: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Profile transcripts in chunks, off the event loop: in the threadpool for
+    small corpora, fanned out to the worker processes for large ones
+    """
+    chunks = [transcripts[i:i + PROFILE_CHUNK_SIZE] for i in range(0, len(transcripts), PROFILE_CHUNK_SIZE)]
+    if len(transcripts) < PARALLEL_MIN_TRANSCRIPTS:
+        results = await run_in_threadpool(_profile_in_process, chunks, families)
+    else:
+        loop = asyncio.get_running_loop()
+        pool = get_profiler_pool()
+        results = await asyncio.gather(*(loop.run_in_executor(pool, _profile_transcripts, chunk, families) for chunk in chunks))
+
+    return {
+        key: np.concatenate([r[key] for r in results], axis=1) if results else np.zeros((len(families), 0))
+        for key in ("input", "output")
+    }
+
+def _distribution(values: np.ndarray) -> TokenDistribution:
+    if len(values) == 0:
+        return TokenDistribution(mean=0, std=0, p50=0, p90=0, p95=0, max=0, lognormal_mu=0, lognormal_sigma=0)
+    p50, p90, p95 = np.percentile(values, [50, 90, 95])
+    logs = np.log(np.maximum(values, 1))
+    return TokenDistribution(
+        mean=float(values.mean()),
+        std=float(values.std()),
+        p50=float(p50),
+        p90=float(p90),
+        p95=float(p95),
+        max=float(values.max()),
+        lognormal_mu=float(logs.mean()),
+        lognormal_sigma=float(logs.std()),
+    )
+
+def _clamp_to_field(model: type, field: str, value: float) -> int:
+    """Clamp a value to the ge/le bounds declared on a request model field"""
+    lower, upper = value, value
+    for constraint in model.model_fields[field].metadata:
+        lower = getattr(constraint, "ge", lower)
+        upper = getattr(constraint, "le", upper)
+    return int(round(min(max(value, lower), upper)))
+
+async def profile_workload(params: WorkloadProfileRequest) -> WorkloadProfileResponse:
+    """Estimate per-request input/output token distributions per agent and tokenizer family"""
+    unknown = [f for f in params.families if f not in TOKENIZER_FAMILIES]
+    if unknown or not params.families:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown tokenizer families {unknown}. Available: {list(TOKENIZER_FAMILIES)}"
+        )
+
+    agent_profiles = []
+    total_requests = 0
+    for agent, transcripts in params.agents.items():
+        # Suggested parameters use the family of the agent's model when known
+        model = params.agent_models.get(agent)
+        families = list(params.families)
+        suggested_family = get_model_provider(model) if model else families[0]
+        if suggested_family not in TOKENIZER_FAMILIES:
+            suggested_family = "default"
+        if suggested_family not in families:
+            families.append(suggested_family)
+
+        raw = [[m.model_dump() for m in t.messages] for t in transcripts]
+        tokens = await _profile_chunks(raw, families)
+        requests = tokens["output"].shape[1]
+        total_requests += requests
+
+        family_profiles = []
+        for i, family in enumerate(families):
+            input_total = float(tokens["input"][i].sum())
+            output_total = float(tokens["output"][i].sum())
+            family_profiles.append(FamilyProfile(
+                family=family,
+                requests=requests,
+                input_tokens=_distribution(tokens["input"][i]),
+                output_tokens=_distribution(tokens["output"][i]),
+                input_token_share=input_total / (input_total + output_total) if input_total + output_total > 0 else 0.0,
+            ))
+
+        suggested = family_profiles[families.index(suggested_family)]
+        measured = {
+            "avg_input_tokens": (CostCalculatorRequest, suggested.input_tokens.mean),
+            "avg_output_tokens": (CostCalculatorRequest, suggested.output_tokens.mean),
+            "avg_tokens_per_request": (AgentCostRequest, suggested.input_tokens.mean + suggested.output_tokens.mean),
+        }
+        suggestions = {name: _clamp_to_field(model, name, value) for name, (model, value) in measured.items()}
+        agent_profiles.append(AgentProfile(
+            agent=agent,
+            transcripts=len(transcripts),
+            requests_per_transcript=requests / len(transcripts) if transcripts else 0.0,
+            families=[f for f in family_profiles if f.family in params.families],
+            suggested_family=suggested_family,
+            suggested_calculation_params={
+                "avg_input_tokens": suggestions["avg_input_tokens"],
+                "avg_output_tokens": suggestions["avg_output_tokens"],
+            },
+            suggested_agent_params={
+                **({"llm_model": model} if model else {}),
+                "avg_tokens_per_request": suggestions["avg_tokens_per_request"],
+                "input_token_share": round(suggested.input_token_share, 4),
+            },
+            clamped_params={
+                name: value for name, (_, value) in measured.items() if suggestions[name] != int(round(value))
+            },
+        ))
+
+    return WorkloadProfileResponse(
+        agents=agent_profiles,
+        total_transcripts=sum(p.transcripts for p in agent_profiles),
+        total_requests=total_requests,
+    )
+
+# Shared worker pool (started with the app; workers are spawned, never forked
+# from the threaded server process)
+_profiler_pool: Optional[ProcessPoolExecutor] = None
+
+def get_profiler_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for large corpora (PROFILER_WORKERS, default: CPU count)"""
+    global _profiler_pool
+    if _profiler_pool is None:
+        _profiler_pool = ProcessPoolExecutor(
+            max_workers=int(os.environ.get("PROFILER_WORKERS", os.cpu_count() or 1)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _profiler_pool
+
+def shutdown_profiler_pool():
+    """Stop the worker processes (on app shutdown)"""
+    global _profiler_pool
+    if _profiler_pool is not None:
+        _profiler_pool.shutdown(cancel_futures=True)
+        _profiler_pool = None
+
+# ===========================
+# API ROUTES
+# ===========================
+
+router = APIRouter()
+
+@router.post("/workload/profile", response_model=WorkloadProfileResponse)
+async def profile_workload_endpoint(params: WorkloadProfileRequest):
+    """Derive token statistics for calculation requests from sample transcripts"""
+    return await profile_workload(params)
@@ -0,0 +1,274 @@
+"""
+Content-Addressed Quote Store (SQLite)
+
+Keeps every calculated quote in an embedded SQLite database:
+- Quotes are keyed by calculation_key (a hash of the canonical request plus
+  the pricing version), so identical quotes deduplicate (a repeat bumps times_quoted)
+- The full CostCalculatorResponse is stored zlib-compressed
+- Indexes on tier, deployment, customer, tenant and date serve keyset-paginated listing
+
+Writes are queued and committed in batches by a background thread, so
+recording a quote never blocks the request that produced it.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.routers.cost_calculator_v2 import (
+    CostCalculatorRequest,
+    CostCalculatorResponse,
+    canonical_request,
+    calculation_key,
+    request_pricing_version,
+)
+
+DEFAULT_QUOTE_DB = os.path.join(os.path.dirname(__file__), "..", "..", "data", "quotes.sqlite3")
+
+# Background writer: commit after this many quotes or this many seconds, whichever first
+WRITE_BATCH_SIZE = 256
+WRITE_FLUSH_SECONDS = 0.05
+
+# Columns that can be used to filter quote listings
+LIST_FILTERS = ("service_tier", "deployment_type", "customer", "tenant")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    quote_id TEXT PRIMARY KEY,
+    pricing_version TEXT NOT NULL,
+    service_tier TEXT NOT NULL,
+    deployment_type TEXT NOT NULL,
+    customer TEXT,
+    tenant TEXT,
+    created_at REAL NOT NULL,
+    last_quoted_at REAL NOT NULL,
+    times_quoted INTEGER NOT NULL DEFAULT 1,
+    total_monthly_cost REAL NOT NULL,
+    request TEXT NOT NULL,
+    response BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_quotes_created ON quotes (created_at, quote_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_tier ON quotes (service_tier, created_at, quote_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_deployment ON quotes (deployment_type, created_at, quote_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_customer ON quotes (customer, created_at, quote_id);
+"""
+
+# Columns added after the first schema: (column, definition), applied to older databases on open
+_ADDED_COLUMNS = (("tenant", "TEXT"),)
+
+_ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_quotes_tenant ON quotes (tenant, created_at, quote_id);
+"""
+
+_UPSERT = """
+INSERT INTO quotes (quote_id, pricing_version, service_tier, deployment_type, customer, tenant,
+                    created_at, last_quoted_at, times_quoted, total_monthly_cost, request, response)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT (quote_id) DO UPDATE SET
+    last_quoted_at = MAX(last_quoted_at, excluded.last_quoted_at),
+    times_quoted = times_quoted + 1
+"""
+
+_SUMMARY_COLUMNS = (
+    "quote_id, pricing_version, service_tier, deployment_type, customer, tenant, "
+    "created_at, last_quoted_at, times_quoted, total_monthly_cost"
+)
+
+
+def encode_cursor(created_at: float, quote_id: str) -> str:
+    return f"{created_at!r}:{quote_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    created_at, _, quote_id = cursor.partition(":")
+    return float(created_at), quote_id
+
+
+class QuoteStore:
+    """SQLite quote store with a batched background writer"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(quotes)")}
+            for column, definition in _ADDED_COLUMNS:
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE quotes ADD COLUMN {column} {definition}")
+            conn.executescript(_ADDED_INDEXES)
+
+        self._local = threading.local()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        # Quotes queued but not yet committed, so lookups see them immediately
+        self._pending: Dict[str, tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="quote-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Per-thread read connection (WAL readers never wait for the writer)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+
+    def submit(self, params: CostCalculatorRequest, response: CostCalculatorResponse, canonical: Optional[str] = None) -> str:
+        """
+        Queue a quote for storage and return its quote_id; serialization happens
+        on the writer thread. Pass canonical when params were modified after the
+        request arrived (calculate_costs applies tier overrides in place).
+        """
+        canonical = canonical or canonical_request(params)
+        pricing_version = request_pricing_version(params)
+        quote_id = calculation_key(canonical, pricing_version)
+        item = (quote_id, params, canonical, response, time.time(), pricing_version)
+        with self._pending_lock:
+            self._pending[quote_id] = item
+        self._queue.put(item)
+        return quote_id
+
+    def _row(self, item: tuple) -> tuple:
+        quote_id, params, canonical, response, quoted_at, pricing_version = item
+        payload = response.model_dump_json().encode("utf-8")
+        return (
+            quote_id,
+            pricing_version,
+            params.service_tier.lower(),
+            params.deployment_type,
+            params.customer,
+            params.tenant,
+            quoted_at,
+            quoted_at,
+            response.total_monthly_cost,
+            canonical,
+            zlib.compress(payload, 6),
+        )
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + WRITE_FLUSH_SECONDS
+            while len(batch) < WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                with conn:
+                    conn.executemany(_UPSERT, [self._row(i) for i in batch])
+            except sqlite3.Error as e:
+                print(f"Error writing {len(batch)} quotes: {e}")
+            finally:
+                with self._pending_lock:
+                    for i in batch:
+                        if self._pending.get(i[0]) is i:
+                            del self._pending[i[0]]
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued quote is committed"""
+        self._queue.join()
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+
+    def get(self, quote_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a quote by its content hash, including the decompressed response"""
+        found = self._reader().execute(
+            f"SELECT {_SUMMARY_COLUMNS}, request, response FROM quotes WHERE quote_id = ?", (quote_id,)
+        ).fetchone()
+        if found is None:
+            # Not committed yet: serve it from the write queue
+            with self._pending_lock:
+                pending = self._pending.get(quote_id)
+            if pending is None:
+                return None
+            row = self._row(pending)
+            found = row[:8] + (1,) + row[8:]
+
+        return {
+            **dict(zip(_SUMMARY_COLUMNS.split(", "), found[:-2])),
+            "request": json.loads(found[-2]),
+            "response": json.loads(zlib.decompress(found[-1])),
+        }
+
+    def list_quotes(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Quote summaries, newest first, with keyset pagination: pass the
+        returned cursor to continue after the last row of the previous page.
+        """
+        clauses, args = [], []
+        for column, value in (filters or {}).items():
+            if column not in LIST_FILTERS:
+                raise ValueError(f"Unsupported filter '{column}'. Available: {list(LIST_FILTERS)}")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            args.append(until)
+        if cursor:
+            clauses.append("(created_at, quote_id) < (?, ?)")
+            args.extend(decode_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM quotes {where} "
+            f"ORDER BY created_at DESC, quote_id DESC LIMIT ?",
+            args + [limit + 1],
+        ).fetchall()
+
+        quotes = [dict(zip(_SUMMARY_COLUMNS.split(", "), row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = quotes[-1]
+            next_cursor = encode_cursor(last["created_at"], last["quote_id"])
+        return quotes, next_cursor
+
+
+# Shared store instance (lazily opened)
+_quote_store: Optional[QuoteStore] = None
+_quote_store_lock = threading.Lock()
+
+
+def get_quote_store() -> QuoteStore:
+    """Get the process-wide quote store at QUOTE_STORE_PATH"""
+    global _quote_store
+    with _quote_store_lock:
+        if _quote_store is None:
+            _quote_store = QuoteStore(os.environ.get("QUOTE_STORE_PATH", DEFAULT_QUOTE_DB))
+    return _quote_store
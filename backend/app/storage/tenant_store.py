@@ -0,0 +1,105 @@
+"""
+Tenant Overlay Store
+
+One JSON overlay document per tenant in TENANT_OVERLAY_DIR
+(<tenant_id>.json), written atomically (temporary file renamed over the
+old one), so every worker process reads the same overlays. Resolved
+TenantPricing objects are cached per tenant and reused until the file
+changes: after the first calculation for a tenant, resolving its pricing
+is a dictionary lookup plus a stat of its file.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.pricing.tenants import TenantPricing
+
+DEFAULT_OVERLAY_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "tenants")
+
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+class TenantOverlayStore:
+    """Tenant overlay documents on disk and their resolved pricing"""
+
+    def __init__(self, directory: str, base: TenantPricing):
+        self.directory = directory
+        self.base = base
+        os.makedirs(directory, exist_ok=True)
+        # tenant ID -> (file mtime_ns, size, resolved pricing)
+        self._resolved: Dict[str, Tuple[int, int, TenantPricing]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, tenant_id: str) -> str:
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            raise ValueError(f"Invalid tenant ID '{tenant_id}' (letters, digits, '_', '.', '-'; at most 64)")
+        return os.path.join(self.directory, f"{tenant_id}.json")
+
+    def get(self, tenant_id: str) -> Optional[TenantPricing]:
+        """Resolved pricing of a tenant (None when it has no overlay)"""
+        path = self._path(tenant_id)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._resolved.pop(tenant_id, None)
+            return None
+        cached = self._resolved.get(tenant_id)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with self._lock:
+            with open(path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+            pricing = self.base.overlay(tenant_id, document)
+            self._resolved[tenant_id] = (stat.st_mtime_ns, stat.st_size, pricing)
+        return pricing
+
+    def document(self, tenant_id: str) -> Optional[Dict[str, Any]]:
+        pricing = self.get(tenant_id)
+        return pricing.document if pricing is not None else None
+
+    def put(self, tenant_id: str, document: Dict[str, Any]) -> TenantPricing:
+        """Validate and store a tenant's overlay (ValueError when it does not fit the base catalog)"""
+        path = self._path(tenant_id)
+        pricing = self.base.overlay(tenant_id, document)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(document, f, sort_keys=True, indent=2)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            stat = os.stat(path)
+            self._resolved[tenant_id] = (stat.st_mtime_ns, stat.st_size, pricing)
+        return pricing
+
+    def delete(self, tenant_id: str) -> bool:
+        path = self._path(tenant_id)
+        with self._lock:
+            self._resolved.pop(tenant_id, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                return False
+        return True
+
+    def tenant_ids(self) -> List[str]:
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+
+# Shared store instance (lazily opened)
+_tenant_store: Optional[TenantOverlayStore] = None
+
+
+def get_tenant_store() -> TenantOverlayStore:
+    """Get the process-wide tenant overlay store at TENANT_OVERLAY_DIR"""
+    global _tenant_store
+    if _tenant_store is None:
+        from app.routers.cost_calculator_v2 import BASE_PRICING
+
+        _tenant_store = TenantOverlayStore(os.environ.get("TENANT_OVERLAY_DIR", DEFAULT_OVERLAY_DIR), BASE_PRICING)
+    return _tenant_store
@@ -0,0 +1,496 @@
+"""
+Columnar Usage Store for ingested LLM usage records
+
+Stores usage records on local disk as per-column memory-mapped arrays:
+- One partition directory per UTC day (rows sorted by timestamp)
+- Dictionary-encoded model / agent / user / tier IDs (int32 codes)
+- A small time index (day -> row count, min/max timestamp)
+
+Cost rollups scan only the partitions overlapping the requested date range,
+in fixed-size chunks, so whole partitions are never loaded into RAM.
+
+Several processes (uvicorn workers) may share a store: ingestion holds an
+exclusive lock on the store root and first reloads the dictionaries and
+index if another process changed them; readers reload them when the files
+change. Column files are appended before the index records the new rows,
+so rows beyond the index (left by a crash) are truncated before the next
+append.
+"""
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.routers.cost_calculator_v2 import (
+    LLM_PRICING_USD,
+    DEFAULT_LLM_PRICING_USD,
+    AUD_TO_USD,
+)
+
+# ===========================
+# STORE LAYOUT
+# ===========================
+
+# Column name -> on-disk dtype (little-endian, fixed width)
+USAGE_COLUMNS = {
+    "ts": "<i8",                   # epoch seconds (UTC)
+    "model": "<i4",                # dictionary code
+    "agent": "<i4",                # dictionary code
+    "user": "<i4",                 # dictionary code
+    "tier": "<i4",                 # dictionary code
+    "input_tokens": "<i4",
+    "cached_input_tokens": "<i4",
+    "output_tokens": "<i4",
+}
+
+# Largest token count of one record (token columns are int32)
+MAX_TOKENS_PER_RECORD = 2**31 - 1
+
+# Columns stored as dictionary codes
+DICTIONARY_COLUMNS = ("model", "agent", "user", "tier")
+
+# Supported group-by keys for rollups
+GROUP_BY_KEYS = ("model", "agent", "user", "tier", "day", "week", "hour_of_week")
+
+# Metrics produced by UsageStore.aggregate
+AGGREGATE_METRICS = ("queries", "input_tokens", "cached_input_tokens", "output_tokens", "cost_usd")
+
+# Rows processed per vectorized chunk during scans
+SCAN_CHUNK_ROWS = 1 << 20
+
+SECONDS_PER_DAY = 86400
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(__file__), '../../data/usage_store')
+
+
+def _day_number(day: date) -> int:
+    """Days since the Unix epoch for a date"""
+    return (day - date(1970, 1, 1)).days
+
+
+def _day_from_number(day_number: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=int(day_number))
+
+
+def _to_epoch_seconds(value: Any) -> int:
+    """Convert a datetime / ISO string / epoch number to epoch seconds (UTC)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class UsageStore:
+    """Day-partitioned, memory-mapped columnar store of LLM usage records"""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "partitions"), exist_ok=True)
+        with self._locked():
+            self._load_metadata()
+            self._truncate_columns()
+
+    # ---------------------------
+    # Metadata
+    # ---------------------------
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive store lock: this process's writers, then other processes"""
+        with self._lock, open(os.path.join(self.root, ".lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stamp(self) -> tuple:
+        """Modification stamps of the metadata files (changes when another process writes them)"""
+        stamp = []
+        for name in ("index.json", "dictionaries.json"):
+            try:
+                stat = os.stat(os.path.join(self.root, name))
+                stamp.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _load_metadata(self) -> None:
+        # Index before dictionaries: writers replace dictionaries first, so every loaded code is known
+        stamp = self._stamp()
+        index = self._load_json("index.json", {})
+        dictionaries = self._load_json("dictionaries.json", {column: [] for column in DICTIONARY_COLUMNS})
+        self._codes: Dict[str, Dict[str, int]] = {
+            column: {value: code for code, value in enumerate(values)}
+            for column, values in dictionaries.items()
+        }
+        self._dictionaries: Dict[str, List[str]] = dictionaries
+        # Time index: "YYYY-MM-DD" -> {"rows", "ts_min", "ts_max"}
+        self._index: Dict[str, Dict[str, int]] = index
+        self._metadata_stamp = stamp
+
+    def _refresh(self) -> None:
+        """Reload the dictionaries and index if another process has changed them"""
+        if self._stamp() != self._metadata_stamp:
+            with self._lock:
+                if self._stamp() != self._metadata_stamp:
+                    self._load_metadata()
+
+    def _truncate_columns(self, day_keys: Optional[Sequence[str]] = None) -> None:
+        """Drop column rows beyond the index (appended by a write that crashed before updating it)"""
+        for day_key in (self._index if day_keys is None else day_keys):
+            entry = self._index.get(day_key)
+            rows = entry["rows"] if entry else 0
+            for name, dtype in USAGE_COLUMNS.items():
+                path = os.path.join(self._partition_dir(day_key), f"{name}.col")
+                size = rows * np.dtype(dtype).itemsize
+                if os.path.exists(path) and os.path.getsize(path) > size:
+                    os.truncate(path, size)
+
+    def _load_json(self, name: str, default: Any) -> Any:
+        path = os.path.join(self.root, name)
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _partition_dir(self, day_key: str) -> str:
+        return os.path.join(self.root, "partitions", day_key)
+
+    def _snapshot(self) -> Tuple[Dict[str, Dict[str, int]], Dict[str, List[str]]]:
+        """
+        Copies of the time index and dictionaries taken under the lock, so a
+        concurrent append cannot add partitions or codes while they are read
+        """
+        with self._lock:
+            return dict(self._index), {column: list(values) for column, values in self._dictionaries.items()}
+
+    def dictionary(self, column: str) -> List[str]:
+        """Decoded values for a dictionary-encoded column, indexed by code (a snapshot)"""
+        self._refresh()
+        with self._lock:
+            return list(self._dictionaries[column])
+
+    def codes(self, column: str, values: Sequence[str]) -> np.ndarray:
+        """Dictionary codes for known values of a column (unknown values are dropped)"""
+        codes = self._codes[column]
+        return np.array([codes[v] for v in values if v in codes], dtype=USAGE_COLUMNS[column])
+
+    def partitions(self) -> List[Dict[str, Any]]:
+        """Time index entries sorted by day"""
+        self._refresh()
+        index, _ = self._snapshot()
+        return [
+            {"day": day_key, **entry}
+            for day_key, entry in sorted(index.items())
+        ]
+
+    def _encode(self, column: str, values: Sequence[str]) -> np.ndarray:
+        codes = self._codes[column]
+        dictionary = self._dictionaries[column]
+        encoded = np.empty(len(values), dtype=USAGE_COLUMNS[column])
+        for i, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = len(dictionary)
+                codes[value] = code
+                dictionary.append(value)
+            encoded[i] = code
+        return encoded
+
+    # ---------------------------
+    # Ingestion
+    # ---------------------------
+
+    def append(self, records: Sequence[Dict[str, Any]]) -> int:
+        """
+        Append usage records. Each record needs: timestamp, model, agent,
+        user_id, service_tier, input_tokens, output_tokens and optionally
+        cached_input_tokens. Returns the number of rows written.
+        """
+        if not records:
+            return 0
+
+        with self._locked():
+            if self._stamp() != self._metadata_stamp:
+                self._load_metadata()
+            columns = {
+                "ts": np.array([_to_epoch_seconds(r["timestamp"]) for r in records], dtype="<i8"),
+                "model": self._encode("model", [r["model"] for r in records]),
+                "agent": self._encode("agent", [r.get("agent", "unknown") for r in records]),
+                "user": self._encode("user", [str(r.get("user_id", "unknown")) for r in records]),
+                "tier": self._encode("tier", [r.get("service_tier", "standard").lower() for r in records]),
+                "input_tokens": np.array([r.get("input_tokens", 0) for r in records], dtype="<i4"),
+                "cached_input_tokens": np.array([r.get("cached_input_tokens", 0) for r in records], dtype="<i4"),
+                "output_tokens": np.array([r.get("output_tokens", 0) for r in records], dtype="<i4"),
+            }
+
+            order = np.argsort(columns["ts"], kind="stable")
+            columns = {name: values[order] for name, values in columns.items()}
+
+            # Split the sorted batch into day partitions
+            day_numbers = columns["ts"] // SECONDS_PER_DAY
+            boundaries = np.flatnonzero(np.diff(day_numbers)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(day_numbers)]))
+
+            for start, end in zip(starts, ends):
+                day_key = _day_from_number(day_numbers[start]).isoformat()
+                self._append_partition(day_key, {name: values[start:end] for name, values in columns.items()})
+
+            _write_json_atomic(os.path.join(self.root, "dictionaries.json"), self._dictionaries)
+            _write_json_atomic(os.path.join(self.root, "index.json"), self._index)
+            self._metadata_stamp = self._stamp()
+
+        return len(records)
+
+    def _append_partition(self, day_key: str, batch: Dict[str, np.ndarray]) -> None:
+        """Append a sorted batch to one day partition, keeping rows sorted by timestamp"""
+        partition_dir = self._partition_dir(day_key)
+        os.makedirs(partition_dir, exist_ok=True)
+        entry = self._index.get(day_key)
+
+        if entry is None or entry["rows"] == 0 or int(batch["ts"][0]) >= entry["ts_max"]:
+            # Fast path: in-order data is appended to the column files directly
+            self._truncate_columns([day_key])
+            for name, values in batch.items():
+                with open(os.path.join(partition_dir, f"{name}.col"), 'ab') as f:
+                    f.write(values.tobytes())
+        else:
+            # Late data: merge with the existing partition and rewrite it
+            existing = self._read_partition(day_key)
+            merged = {name: np.concatenate((existing[name], batch[name])) for name in USAGE_COLUMNS}
+            order = np.argsort(merged["ts"], kind="stable")
+            for name in USAGE_COLUMNS:
+                path = os.path.join(partition_dir, f"{name}.col")
+                with open(f"{path}.tmp", 'wb') as f:
+                    f.write(merged[name][order].tobytes())
+                os.replace(f"{path}.tmp", path)
+
+        rows = (entry["rows"] if entry else 0) + len(batch["ts"])
+        ts_min = int(batch["ts"][0]) if entry is None else min(entry["ts_min"], int(batch["ts"][0]))
+        ts_max = int(batch["ts"][-1]) if entry is None else max(entry["ts_max"], int(batch["ts"][-1]))
+        self._index[day_key] = {"rows": rows, "ts_min": ts_min, "ts_max": ts_max}
+
+    def _open_column(self, day_key: str, name: str, rows: Optional[int] = None) -> np.ndarray:
+        rows = self._index[day_key]["rows"] if rows is None else rows
+        path = os.path.join(self._partition_dir(day_key), f"{name}.col")
+        return np.memmap(path, dtype=USAGE_COLUMNS[name], mode='r', shape=(rows,))
+
+    def _read_partition(self, day_key: str) -> Dict[str, np.ndarray]:
+        return {name: np.array(self._open_column(day_key, name)) for name in USAGE_COLUMNS}
+
+    # ---------------------------
+    # Scanning
+    # ---------------------------
+
+    def scan(
+        self,
+        start: date,
+        end: date,
+        columns: Sequence[str] = tuple(USAGE_COLUMNS),
+        filters: Optional[Dict[str, Sequence[str]]] = None,
+        index: Optional[Dict[str, Dict[str, int]]] = None,
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Yield chunks of column arrays for rows with start <= day <= end.
+        Filters map a dictionary column to the values to keep.
+        Only the partitions in range are mapped, and each is read in chunks.
+        Pass index to scan a snapshot of the time index taken by the caller.
+        """
+        if index is None:
+            self._refresh()
+            index, _ = self._snapshot()
+        filter_codes = {}
+        for column, values in (filters or {}).items():
+            if not values:
+                continue
+            filter_codes[column] = self.codes(column, values)
+            if len(filter_codes[column]) == 0:
+                return
+
+        needed = list(dict.fromkeys(list(columns) + list(filter_codes)))
+        start_key, end_key = start.isoformat(), end.isoformat()
+
+        for day_key in sorted(index):
+            if day_key < start_key or day_key > end_key or index[day_key]["rows"] == 0:
+                continue
+
+            rows = index[day_key]["rows"]
+            mapped = {name: self._open_column(day_key, name, rows) for name in needed}
+
+            for chunk_start in range(0, rows, SCAN_CHUNK_ROWS):
+                chunk = {name: np.asarray(values[chunk_start:chunk_start + SCAN_CHUNK_ROWS]) for name, values in mapped.items()}
+                if filter_codes:
+                    mask = np.ones(len(next(iter(chunk.values()))), dtype=bool)
+                    for column, codes in filter_codes.items():
+                        mask &= np.isin(chunk[column], codes)
+                    if not mask.any():
+                        continue
+                    chunk = {name: values[mask] for name, values in chunk.items()}
+                yield {name: chunk[name] for name in columns}
+
+    # ---------------------------
+    # Cost rollups
+    # ---------------------------
+
+    def price_vectors(self, pricing: Optional[Dict[str, Dict[str, float]]] = None,
+                      models: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """USD per 1M token rates aligned with the model dictionary codes (of a snapshot when given)"""
+        pricing = LLM_PRICING_USD if pricing is None else pricing
+        models = self.dictionary("model") if models is None else models
+        rates = [pricing.get(model, DEFAULT_LLM_PRICING_USD) for model in models]
+        return {
+            "input": np.array([r["input"] for r in rates], dtype=np.float64),
+            "cache_read": np.array([r.get("cache_read", 0.0) for r in rates], dtype=np.float64),
+            "output": np.array([r["output"] for r in rates], dtype=np.float64),
+        }
+
+    def aggregate(
+        self,
+        start: date,
+        end: date,
+        group_by: Sequence[str] = ("model",),
+        filters: Optional[Dict[str, Sequence[str]]] = None,
+        pricing: Optional[Dict[str, Dict[str, float]]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Aggregate queries, tokens and cost (USD) over a date range in one
+        vectorized pass, grouped by any combination of GROUP_BY_KEYS.
+        Returns one array per group key (dictionary codes, day/week numbers or
+        hour of week) plus one array per metric in AGGREGATE_METRICS.
+        Cached input tokens are priced at the model's cache_read rate, like
+        calculate_llm_costs.
+        """
+        for key in group_by:
+            if key not in GROUP_BY_KEYS:
+                raise ValueError(f"Unsupported group_by key '{key}'. Available: {list(GROUP_BY_KEYS)}")
+
+        self._refresh()
+        # One consistent snapshot: every code in the indexed rows is in its dictionaries
+        index, dictionaries = self._snapshot()
+        rates = self.price_vectors(pricing, dictionaries["model"])
+        first_day = _day_number(start)
+        radices = []
+        for key in group_by:
+            if key in DICTIONARY_COLUMNS:
+                radices.append(max(len(dictionaries[key]), 1))
+            elif key == "day":
+                radices.append(_day_number(end) - first_day + 1)
+            elif key == "week":
+                radices.append((_day_number(end) + 3) // 7 - (first_day + 3) // 7 + 1)
+            else:
+                radices.append(168)
+
+        columns = ["ts", "model", "input_tokens", "cached_input_tokens", "output_tokens"]
+        columns += [key for key in group_by if key in DICTIONARY_COLUMNS and key not in columns]
+
+        totals: Dict[int, np.ndarray] = {}
+        for chunk in self.scan(start, end, columns, filters, index):
+            group_key = np.zeros(len(chunk["ts"]), dtype=np.int64)
+            for key, radix in zip(group_by, radices):
+                if key in DICTIONARY_COLUMNS:
+                    component = chunk[key].astype(np.int64)
+                elif key == "day":
+                    component = chunk["ts"] // SECONDS_PER_DAY - first_day
+                elif key == "week":
+                    component = (chunk["ts"] // SECONDS_PER_DAY + 3) // 7 - (first_day + 3) // 7
+                else:
+                    # Monday 00:00 UTC = hour 0 (epoch day 0 was a Thursday)
+                    component = (chunk["ts"] // 3600 + 72) % 168
+                group_key = group_key * radix + component
+
+            cached = chunk["cached_input_tokens"].astype(np.float64)
+            fresh = chunk["input_tokens"] - cached
+            output = chunk["output_tokens"].astype(np.float64)
+            model = chunk["model"]
+            cost_usd = (fresh * rates["input"][model] + cached * rates["cache_read"][model] + output * rates["output"][model]) / 1_000_000
+
+            keys, inverse = np.unique(group_key, return_inverse=True)
+            sums = np.stack([
+                np.bincount(inverse, minlength=len(keys)).astype(np.float64),
+                np.bincount(inverse, weights=chunk["input_tokens"], minlength=len(keys)),
+                np.bincount(inverse, weights=cached, minlength=len(keys)),
+                np.bincount(inverse, weights=output, minlength=len(keys)),
+                np.bincount(inverse, weights=cost_usd, minlength=len(keys)),
+            ], axis=1)
+            for key, row in zip(keys.tolist(), sums):
+                if key in totals:
+                    totals[key] += row
+                else:
+                    totals[key] = row.copy()
+
+        keys = np.array(sorted(totals), dtype=np.int64)
+        sums = np.array([totals[key] for key in keys.tolist()], dtype=np.float64).reshape(len(keys), len(AGGREGATE_METRICS))
+
+        result = {metric: sums[:, i] for i, metric in enumerate(AGGREGATE_METRICS)}
+        remainder = keys
+        for key, radix in reversed(list(zip(group_by, radices))):
+            remainder, result[key] = np.divmod(remainder, radix)
+        return result
+
+    def rollup(
+        self,
+        start: date,
+        end: date,
+        group_by: Sequence[str] = ("model",),
+        filters: Optional[Dict[str, Sequence[str]]] = None,
+        pricing: Optional[Dict[str, Dict[str, float]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Aggregate over a date range and decode group labels; cost is reported in AUD"""
+        aggregated = self.aggregate(start, end, group_by, filters, pricing)
+        first_day = _day_number(start)
+        # Dictionaries only grow, so a snapshot taken after the rollup decodes all of its codes
+        dictionaries = {group: self.dictionary(group) for group in group_by if group in DICTIONARY_COLUMNS}
+
+        results = []
+        for i in range(len(aggregated["queries"])):
+            labels = {}
+            for group in group_by:
+                component = int(aggregated[group][i])
+                if group in DICTIONARY_COLUMNS:
+                    labels[group] = dictionaries[group][component]
+                elif group == "day":
+                    labels[group] = _day_from_number(first_day + component).isoformat()
+                elif group == "week":
+                    labels[group] = _day_from_number(((first_day + 3) // 7 + component) * 7 - 3).isoformat()
+                else:
+                    labels[group] = component
+            results.append({
+                **labels,
+                "queries": int(aggregated["queries"][i]),
+                "input_tokens": int(aggregated["input_tokens"][i]),
+                "cached_input_tokens": int(aggregated["cached_input_tokens"][i]),
+                "output_tokens": int(aggregated["output_tokens"][i]),
+                "cost_aud": float(aggregated["cost_usd"][i]) / AUD_TO_USD,
+            })
+        return results
+
+
+# Shared store instance (lazily opened)
+_usage_store: Optional[UsageStore] = None
+
+
+def get_usage_store() -> UsageStore:
+    """Get the process-wide usage store rooted at USAGE_STORE_DIR"""
+    global _usage_store
+    if _usage_store is None:
+        _usage_store = UsageStore(os.environ.get("USAGE_STORE_DIR", DEFAULT_STORE_DIR))
+    return _usage_store
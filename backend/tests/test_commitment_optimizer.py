@@ -0,0 +1,22 @@
+import pytest
+
+from app.routers.commitment_optimizer import NodeDemandProfile, demand_matrix, optimize_commitments
+
+
+def test_reservation_covers_different_layers_over_time():
+    # Two staggered 1-year reservations each cover the first node part of the time and the
+    # second node the rest; planning each layer alone buys one reservation plus pay-as-you-go
+    demand = demand_matrix(NodeDemandProfile(monthly_demand=[1] * 6 + [2] * 6 + [1] * 6), 18)
+    plan = optimize_commitments("aks_nodes", demand)
+
+    assert plan.optimized_cost == pytest.approx(12614.40)
+    assert [(p.month, p.term, p.nodes) for p in plan.purchases] == [(0, "reserved_1yr", 1), (6, "reserved_1yr", 1)]
+    assert sum(month.cost for month in plan.coverage) == pytest.approx(plan.optimized_cost)
+
+
+def test_never_worse_than_pay_as_you_go():
+    demand = demand_matrix(NodeDemandProfile(hourly_demand=[0] * 100 + [3] * 68), 24)
+    plan = optimize_commitments("gpu_nodes", demand)
+
+    assert plan.optimized_cost <= plan.payg_only_cost
+    assert plan.optimized_savings_vs_payg == pytest.approx(plan.payg_only_cost - plan.optimized_cost)
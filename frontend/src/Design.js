@@ -403,34 +403,25 @@ const Design = () => {
         // Get actual LLM cost from agents
         const actualLLMCost = getActualLLMCost().total;
 
-        // Calculate cost for each tier in parallel
-        const promises = tiers.map(async (tier) => {
-          const response = await axios.post('/api/cost/calculate', {
-            agent_type: 'sales-coach',
-            service_tier: tier,
-            deployment_type: 'cloud_api',
-            num_users: globalParams.num_users,
-            queries_per_user_per_month: globalParams.assessments_per_user_per_month
-          });
+        // Category totals for every tier in one request
+        const response = await axios.post('/api/cost/tiers/compare', {
+          agent_type: 'sales-coach',
+          deployment_types: ['cloud_api'],
+          service_tiers: tiers,
+          num_users: globalParams.num_users,
+          queries_per_user_per_month: globalParams.assessments_per_user_per_month
+        });
 
-          if (response.data) {
+        if (response.data && response.data.matrix) {
+          response.data.matrix.forEach(cell => {
             // Replace backend's LLM cost with actual agent costs
-            const actualTotalCost = response.data.infrastructure_costs +
-                                   actualLLMCost +
-                                   response.data.memory_system_costs +
-                                   response.data.data_source_costs +
-                                   response.data.monitoring_costs +
-                                   response.data.retrieval_costs +
-                                   response.data.security_costs +
-                                   response.data.prompt_tuning_costs +
-                                   (response.data.mcp_tools_costs || 0);
+            const actualTotalCost = cell.total_monthly_cost - cell.llm_costs + actualLLMCost;
 
             // Calculate per-user cost for this tier
-            costs[tier] = Math.round(actualTotalCost / globalParams.num_users);
-          }
-        });
+            costs[cell.service_tier] = Math.round(actualTotalCost / globalParams.num_users);
+          });
+        }
 
-        await Promise.all(promises);
         setTierCosts(costs);
       } catch (error) {
         console.error('Error calculating tier costs:', error);